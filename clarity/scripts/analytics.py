@@ -0,0 +1,193 @@
+# clarity/scripts/analytics.py
+import numpy as np
+import pandas as pd
+
+import goal_tracker
+import snapshots
+from day_keys import to_day
+from suggestion_engine import generate_suggestions_batch
+
+# =====================
+# COLUMNAR ANALYTICS
+# =====================
+# Everything here works on one frame loaded once per view:
+#   daily = load_daily_frame()  ->  DatetimeIndex (every calendar day) x one column per pillar
+# and computes for all pillars at once with pandas/NumPy ops (no per-row Python loops).
+# Long-format outputs (date/pillar/value columns) can be handed straight to plotly.
+
+# Read logs and the daily rollup from the memory-mapped Arrow snapshot (snapshots.py),
+# synced incrementally on each load; False reads SQLite directly
+USE_SNAPSHOTS = True
+
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+def _pillars(extra=(), user=None):
+    """Configured pillars first, then any other pillar seen in the data."""
+    pillars = list(goal_tracker.get_config(user).pillars)
+    return pillars + sorted(set(extra) - set(pillars))
+
+def target_frame(daily, user=None):
+    """
+    Daily target per pillar (same shape as `daily`) as configured on each day,
+    so history is judged against the target that was active at the time.
+    """
+    config = goal_tracker.get_config(user)
+    days = daily.index.strftime("%Y-%m-%d").to_numpy(dtype=str)
+    cols = {}
+    for pillar in daily.columns:
+        starts, values = config.target_history(pillar)
+        # index of the last change on or before each day; 0 = before the first one
+        idx = np.searchsorted(np.asarray(starts, dtype=str), days, side="right")
+        cols[pillar] = np.concatenate(([0.0], values))[idx]
+    return pd.DataFrame(cols, index=daily.index, columns=daily.columns)
+
+def _targets(daily, targets, user):
+    """Explicit {pillar: target} override broadcast over `daily`, else the per-day configured targets."""
+    if targets is None:
+        return target_frame(daily, user)
+    row = pd.Series(targets, dtype="float64").reindex(daily.columns)
+    return pd.DataFrame(np.broadcast_to(row.to_numpy(), daily.shape), index=daily.index, columns=daily.columns)
+
+def load_log_frame(user=None):
+    """Raw log entries as a columnar frame: id, date (datetime64), pillar (categorical), hours."""
+    if USE_SNAPSHOTS:
+        df = snapshots.read_logs(user, columns=["id", "date", "pillar", "hours"]).to_pandas()
+    else:
+        df = pd.read_sql_query("SELECT id, date, pillar, hours FROM pillar_logs", goal_tracker._conn(user))
+    df["date"] = pd.to_datetime(df["date"])
+    df["pillar"] = pd.Categorical(df["pillar"], categories=_pillars(df["pillar"].dropna().unique(), user))
+    df["hours"] = df["hours"].fillna(0.0).astype("float64")
+    return df
+
+def load_daily_frame(days=None, end=None, user=None):
+    """
+    Per-day hours per pillar from daily_pillar_rollup, zero-filled for every
+    calendar day up to `end` (default: the user's today). `days` limits to the
+    last N days (an integer range scan on the rollup's day key); otherwise
+    history starts at the first logged day.
+    """
+    last = to_day(end) if end is not None else goal_tracker.get_config(user).today()
+    end = pd.Timestamp(last, unit="D")
+    start = end - pd.Timedelta(days=days - 1) if days else None
+    first = last - days + 1 if days else None
+    if USE_SNAPSHOTS:
+        df = snapshots.read_daily(user, first, last).select(["day", "pillar", "total_hours"]).to_pandas()
+    else:
+        sql = "SELECT day, pillar, total_hours FROM daily_pillar_rollup"
+        params = ()
+        if days:
+            sql += " WHERE day BETWEEN ? AND ?"
+            params = (first, last)
+        df = pd.read_sql_query(sql, goal_tracker._conn(user), params=params)
+
+    df["date"] = pd.to_datetime(df["day"], unit="D")  # epoch-day -> datetime64, vectorized
+    wide = df.pivot_table(index="date", columns="pillar", values="total_hours", aggfunc="sum")
+    if start is None:
+        start = wide.index.min() if len(wide) else end
+    wide = wide.reindex(index=pd.date_range(start, end, freq="D"), columns=_pillars(df["pillar"].unique(), user))
+    wide = wide.fillna(0.0)
+    wide.index.name = "date"
+    wide.columns = pd.CategoricalIndex(wide.columns, ordered=True, name="pillar")
+    return wide
+
+def to_long(wide, value_name):
+    """Wide (date x pillar) frame -> long frame with date, pillar (categorical), value_name."""
+    long = wide.stack().rename(value_name).reset_index()
+    long["pillar"] = pd.Categorical(long["pillar"], categories=list(wide.columns), ordered=True)
+    return long
+
+def rolling_averages(daily, windows=(7, 30)):
+    """
+    Rolling average hours/day for each window, long format: date, pillar, window, avg_hours.
+    Days before the first log count as 0 (same rule as get_weekly_avg), so the
+    last 7-day value equals get_weekly_avg() once history is loaded.
+    """
+    frames = []
+    for w in windows:
+        avg = daily.rolling(w, min_periods=1).sum() / w
+        long = to_long(avg.round(2), "avg_hours")
+        long["window"] = f"{w}d"
+        frames.append(long)
+    return pd.concat(frames, ignore_index=True)
+
+def streaks(daily, targets=None, user=None):
+    """
+    Per pillar: current and longest run of consecutive days meeting the daily
+    target, plus how many days met it. Today only breaks the current streak
+    once it is over (an unfinished today does not reset it to 0).
+    """
+    met = (daily.to_numpy() >= _targets(daily, targets, user).to_numpy()).astype(np.int64)  # days x pillars
+    if len(met) == 0:
+        return pd.DataFrame(columns=["current_streak", "longest_streak", "days_met", "pct_days_met"])
+
+    # run length ending at each day: cumulative count minus the count at the last miss
+    count = np.cumsum(met, axis=0)
+    at_last_miss = np.maximum.accumulate(np.where(met == 0, count, 0), axis=0)
+    run = count - at_last_miss
+
+    current = run[-1] if len(run) == 1 else np.where(met[-1] == 1, run[-1], run[-2])
+    return pd.DataFrame({
+        "current_streak": current,
+        "longest_streak": run.max(axis=0),
+        "days_met": met.sum(axis=0),
+        "pct_days_met": np.round(met.mean(axis=0) * 100, 1),
+    }, index=pd.Index(list(daily.columns), name="pillar"))
+
+def weekday_distribution(daily):
+    """Average hours per weekday per pillar, long format: weekday (Mon..Sun), pillar, avg_hours."""
+    by_day = daily.groupby(daily.index.dayofweek).mean().round(2)
+    by_day = by_day.reindex(range(7), fill_value=0.0)
+    by_day.index = pd.CategoricalIndex(WEEKDAYS, categories=WEEKDAYS, ordered=True, name="weekday")
+    long = by_day.stack().rename("avg_hours").reset_index()
+    long["pillar"] = pd.Categorical(long["pillar"], categories=list(daily.columns), ordered=True)
+    return long
+
+def calendar_heatmap(daily, pillar):
+    """
+    One pillar's hours as a calendar grid: rows Mon..Sun, one column per week
+    (labelled by its Monday). Days outside `daily` are NaN, so they render blank.
+    """
+    idx = daily.index
+    weeks = (idx - pd.to_timedelta(idx.dayofweek, unit="D")).strftime("%Y-%m-%d")
+    grid = pd.DataFrame({"week": weeks, "weekday": idx.dayofweek, "hours": daily[pillar].to_numpy()})
+    grid = grid.pivot(index="weekday", columns="week", values="hours").reindex(range(7))
+    grid.index = pd.Index(WEEKDAYS, name="weekday")
+    return grid
+
+def target_attainment(daily, window=7, targets=None, cap=150, user=None):
+    """Rolling `window`-day average as % of that day's target (capped), long format: date, pillar, pct."""
+    targets = _targets(daily, targets, user)
+    avg = daily.rolling(window, min_periods=1).sum() / window
+    pct = (avg / targets.replace(0, np.nan) * 100).clip(upper=cap).fillna(0.0).round(1)
+    return to_long(pct, "pct")
+
+def progress_frame(status, cap=150):
+    """check_targets() dict -> frame with Pillar, Avg hrs/day, Target hrs/day, Status, PercentOfDailyTarget."""
+    df = pd.DataFrame.from_dict(status, orient="index")
+    df.index.name = "Pillar"
+    avg = df["avg"].astype(float).to_numpy()
+    target = df["target"].astype(float).to_numpy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pct = np.where(target > 0, np.minimum(cap, np.round(avg / target * 100, 1)), 0.0)
+    return pd.DataFrame({
+        "Pillar": df.index,
+        "Avg hrs/day": avg,
+        "Target hrs/day": target,
+        "Status": df["status"].to_numpy(),
+        "PercentOfDailyTarget": pct,
+    })
+
+def historical_suggestions(daily, window=7, user=None):
+    """
+    What generate_suggestions() would have said on every day of `daily`, from
+    the rolling `window`-day averages and that day's targets.
+    Returns a SuggestionBatch; row i is daily.index[i].
+    """
+    avg = (daily.rolling(window, min_periods=1).sum() / window).round(2)
+    return generate_suggestions_batch(list(daily.columns), avg.to_numpy(), target_frame(daily, user).to_numpy(),
+                                      goal_tracker.get_config(user))
+
+def top_focus_history(daily, window=7, user=None):
+    """Series date -> top-focus pillar for every day in `daily`."""
+    batch = historical_suggestions(daily, window, user)
+    return pd.Series(np.asarray(batch.pillars, dtype=object)[batch.top_focus_index], index=daily.index, name="top_focus")
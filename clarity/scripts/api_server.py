@@ -0,0 +1,409 @@
+# clarity/scripts/api_server.py
+"""
+JSON-over-HTTP API for the goal tracker, on plain asyncio (no web framework).
+
+    python clarity/scripts/api_server.py --port 8765
+
+    POST /logs            {"pillar": "Dev", "hours": 1.5, "at": ts, "activity_type": "research"}
+                          -> log for the user's day of `at` (UTC s, default now, not in the future);
+                             type defaults to execution
+    POST /logs/batch      {"records": [{"date", "pillar", "hours", "activity_type"?}, ...], "dedupe": false}
+    GET  /logs            ?page_size=50&cursor=...&pillar=&from=&to=  -> newest first, keyset paged
+    GET  /status          ?days=7                                      -> check_targets()
+    GET  /report          ?days=365&bucket=month                       -> get_bucketed_sums() + range status
+    GET  /suggestions     ?days=7                                      -> generate_suggestions() (7 days: precomputed)
+    GET  /metrics         ?format=prometheus                           -> latency histograms + query spans
+
+Every endpoint takes ?user=<id> for per-user DBs (see goal_tracker.db_path_for).
+SQLite work runs on a thread pool so the event loop only parses and writes
+HTTP; identical report requests in flight at the same time share one query.
+With --group-commit, POST /logs rows go through one GroupCommitWriter
+(write_queue.py): concurrent clients share commits instead of queueing on the
+write lock.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import math
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import urlsplit, parse_qs
+
+from goal_tracker import (
+    insert_log, bulk_log_hours, get_logs_page, get_window_sums, check_targets, get_config, db_path_for,
+    get_bucketed_sums, check_range_targets, auto_bucket, BUCKETS, LOG_PAGE_SIZE, STATUS_WINDOW_DAYS, ACTIVITY_TYPES,
+)
+from report_cache import cached
+from precompute import PrecomputeScheduler, get_daily_results
+from write_queue import GroupCommitWriter
+from day_keys import day_to_date
+import instrumentation
+from instrumentation import LatencyHistogram
+
+MAX_BODY_BYTES = 10 * 1024 * 1024
+MAX_PAGE_SIZE = 1000
+DEFAULT_WORKERS = 4
+MAX_REJECTED_REPORTED = 20
+MAX_CLOCK_SKEW_SECONDS = 300
+
+log = logging.getLogger("clarity.api")
+
+# =====================
+# REQUEST HELPERS
+# =====================
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+def _param(query, name, default=None):
+    values = query.get(name)
+    return values[0] if values else default
+
+def _int_param(query, name, default, lo=1, hi=None):
+    raw = _param(query, name)
+    if raw is None:
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"{name} must be an integer")
+    if hi is None and value < lo:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"{name} must be at least {lo}")
+    if hi is not None and not lo <= value <= hi:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"{name} must be between {lo} and {hi}")
+    return value
+
+def _user(query):
+    user = _param(query, "user") or None
+    try:
+        db_path_for(user)
+    except ValueError as e:
+        raise ApiError(HTTPStatus.BAD_REQUEST, str(e))
+    return user
+
+def encode_cursor(cursor):
+    return None if cursor is None else f"{cursor[0]}:{cursor[1]}"
+
+def decode_cursor(text):
+    if not text:
+        return None
+    date, _, log_id = text.rpartition(":")
+    try:
+        return date, int(log_id)
+    except ValueError:
+        raise ApiError(HTTPStatus.BAD_REQUEST, "malformed cursor")
+
+def _json_body(body):
+    try:
+        data = json.loads(body or b"null")
+    except (ValueError, UnicodeDecodeError):
+        raise ApiError(HTTPStatus.BAD_REQUEST, "body must be JSON")
+    if not isinstance(data, dict):
+        raise ApiError(HTTPStatus.BAD_REQUEST, "body must be a JSON object")
+    return data
+
+# Report reads go through the shared report cache (invalidated on any write)
+cached_window_sums = cached(get_window_sums)
+cached_logs_page = cached(get_logs_page)
+cached_bucketed_sums = cached(get_bucketed_sums)
+
+def _status(days, user):
+    """check_targets() over `days`; the default window comes from memory (no DB query)."""
+    if days == STATUS_WINDOW_DAYS:
+        return check_targets(user=user)
+    return check_targets(cached_window_sums(days, user=user), user=user)
+
+# =====================
+# SERVER
+# =====================
+class ApiServer:
+    def __init__(self, workers=DEFAULT_WORKERS, precompute=True, group_commit=False):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="clarity-db")
+        self.scheduler = PrecomputeScheduler() if precompute else None
+        self.writer = GroupCommitWriter() if group_commit else None
+        self.histograms = {}   # endpoint -> LatencyHistogram
+        self.coalesced = 0     # requests answered by another request's in-flight query
+        self._inflight = {}    # key -> future of the query computing it
+        self._server = None
+        self.routes = {
+            ("POST", "/logs"): self.post_log,
+            ("POST", "/logs/batch"): self.post_log_batch,
+            ("GET", "/logs"): self.get_logs,
+            ("GET", "/status"): self.get_status,
+            ("GET", "/report"): self.get_report,
+            ("GET", "/suggestions"): self.get_suggestions,
+            ("GET", "/metrics"): self.get_metrics,
+        }
+
+    # --- DB access off the loop ---
+    async def run_db(self, fn, *args, **kwargs):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, lambda: fn(*args, **kwargs))
+
+    async def coalesce(self, key, fn):
+        """Run fn() on the pool, or join the identical query already in flight for `key`."""
+        fut = self._inflight.get(key)
+        if fut is not None:
+            self.coalesced += 1
+        else:
+            fut = asyncio.get_running_loop().run_in_executor(self.executor, fn)
+            self._inflight[key] = fut
+            fut.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # one client hanging up must not cancel the query for everyone sharing it
+        return await asyncio.shield(fut)
+
+    # --- endpoints ---
+    async def post_log(self, query, body):
+        user = _user(query)
+        data = _json_body(body)
+        pillar, hours, at = data.get("pillar"), data.get("hours"), data.get("at")
+        activity_type = data.get("activity_type", "execution")
+
+        if activity_type not in ACTIVITY_TYPES:
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"activity_type must be one of {', '.join(ACTIVITY_TYPES)}")
+        if at is not None and (isinstance(at, bool) or not isinstance(at, (int, float)) or not math.isfinite(at)):
+            raise ApiError(HTTPStatus.BAD_REQUEST, "at must be a UTC unix timestamp")
+        now = time.time()
+        if at is not None and at > now + MAX_CLOCK_SKEW_SECONDS:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "at must not be in the future")
+        at = now if at is None else at
+
+        def validate():
+            if pillar not in get_config(user).pillars:
+                raise ApiError(HTTPStatus.BAD_REQUEST, f"unknown pillar {pillar!r}")
+            try:
+                value = float(hours)
+            except (TypeError, ValueError):
+                raise ApiError(HTTPStatus.BAD_REQUEST, "hours must be a number")
+            if not math.isfinite(value):
+                raise ApiError(HTTPStatus.BAD_REQUEST, "hours must be a finite number")
+            if value < 0:
+                raise ApiError(HTTPStatus.BAD_REQUEST, "hours must not be negative")
+            return {"pillar": pillar, "hours": value, "activity_type": activity_type,
+                    "date": day_to_date(get_config(user).day_of(at))}
+
+        def write():
+            logged = validate()
+            insert_log(pillar, logged["hours"], user=user, at=at, activity_type=activity_type)
+            return logged
+
+        if self.writer is None:
+            return HTTPStatus.CREATED, {"logged": await self.run_db(write)}
+        logged = await self.run_db(validate)
+        # submit() blocks while the writer's queue is full: keep that off the loop too
+        await asyncio.wrap_future(await self.run_db(self.writer.submit, pillar, logged["hours"], user=user, at=at,
+                                                  activity_type=activity_type))
+        return HTTPStatus.CREATED, {"logged": logged}
+
+    async def post_log_batch(self, query, body):
+        user = _user(query)
+        data = _json_body(body)
+        records = data.get("records")
+        if not isinstance(records, list):
+            raise ApiError(HTTPStatus.BAD_REQUEST, "records must be a list")
+        rejected = []
+
+        def on_error(rec, exc):
+            if len(rejected) < MAX_REJECTED_REPORTED:
+                rejected.append({"record": rec, "error": str(exc)})
+
+        stats = await self.run_db(bulk_log_hours, records, dedupe=bool(data.get("dedupe", False)),
+                                  on_error=on_error, user=user)
+        return HTTPStatus.OK, {**stats, "rejected_examples": rejected}
+
+    async def get_logs(self, query, body):
+        user = _user(query)
+        page_size = _int_param(query, "page_size", LOG_PAGE_SIZE, hi=MAX_PAGE_SIZE)
+        after = decode_cursor(_param(query, "cursor"))
+        filters = {"pillar": _param(query, "pillar"), "date_from": _param(query, "from"), "date_to": _param(query, "to")}
+        key = ("logs", user, page_size, after, tuple(filters.items()))
+        rows, cursor = await self.coalesce(key, lambda: cached_logs_page(page_size, after=after, user=user, **filters))
+        return HTTPStatus.OK, {
+            "logs": [{"id": i, "date": d, "pillar": p, "hours": h} for i, d, p, h in rows],
+            "next_cursor": encode_cursor(cursor),
+        }
+
+    async def get_status(self, query, body):
+        user = _user(query)
+        days = _int_param(query, "days", 7, hi=3660)
+        status = await self.coalesce(("status", user, days),
+                                     lambda: _status(days, user))
+        return HTTPStatus.OK, {"days": days, "status": status}
+
+    async def get_report(self, query, body):
+        user = _user(query)
+        days = _int_param(query, "days", 30, hi=3660)
+        bucket = _param(query, "bucket") or auto_bucket(days)
+        if bucket not in BUCKETS:
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"bucket must be one of {', '.join(BUCKETS)}")
+
+        def build():
+            report = cached_bucketed_sums(days, bucket, user=user)
+            return {"report": report, "status": check_range_targets(report, user=user)}
+
+        return HTTPStatus.OK, await self.coalesce(("report", user, days, bucket), build)
+
+    async def get_suggestions(self, query, body):
+        from suggestion_engine import generate_suggestions  # numpy; only loaded if this endpoint is used
+        from loop_detector import get_alerts
+        from opportunities import upcoming
+
+        user = _user(query)
+        days = _int_param(query, "days", 7, hi=3660)
+        if days == STATUS_WINDOW_DAYS:
+            return HTTPStatus.OK, await self.coalesce(("suggestions", user, days),
+                                                      lambda: get_daily_results(user)["suggestions"])
+        out = await self.coalesce(
+            ("suggestions", user, days),
+            lambda: generate_suggestions(_status(days, user), get_config(user), get_alerts(user),
+                                         upcoming(user=user)),
+        )
+        return HTTPStatus.OK, out
+
+    async def get_metrics(self, query, body):
+        fmt = _param(query, "format", "json")
+        if fmt == "prometheus":
+            return HTTPStatus.OK, self.prometheus_text()
+        if fmt != "json":
+            raise ApiError(HTTPStatus.BAD_REQUEST, "format must be json or prometheus")
+        return HTTPStatus.OK, {
+            "endpoints": {name: h.snapshot() for name, h in sorted(self.histograms.items())},
+            "coalesced": self.coalesced,
+            "inflight": len(self._inflight),
+            "write_queue": None if self.writer is None else dict(self.writer.stats),
+            "instrumentation": instrumentation.snapshot(),
+        }
+
+    def prometheus_text(self):
+        lines = [
+            "# HELP clarity_api_request_duration_ms Request latency per endpoint in milliseconds.",
+            "# TYPE clarity_api_request_duration_ms histogram",
+        ]
+        for name, h in sorted(self.histograms.items()):
+            cumulative = 0
+            for bound, n in zip(list(h.buckets) + ["+Inf"], h.counts):
+                cumulative += n
+                le = bound if isinstance(bound, str) else f"{bound:g}"
+                lines.append(f'clarity_api_request_duration_ms_bucket{{endpoint="{name}",le="{le}"}} {cumulative}')
+            lines.append(f'clarity_api_request_duration_ms_sum{{endpoint="{name}"}} {h.total_ms:g}')
+            lines.append(f'clarity_api_request_duration_ms_count{{endpoint="{name}"}} {h.count}')
+        lines += [
+            "# HELP clarity_api_coalesced_total Requests answered by another request's in-flight query.",
+            "# TYPE clarity_api_coalesced_total counter",
+            f"clarity_api_coalesced_total {self.coalesced}",
+        ]
+        return "\n".join(lines) + "\n" + instrumentation.prometheus_text()
+
+    # --- HTTP plumbing ---
+    async def dispatch(self, method, target, body):
+        """(status, payload) for one request; records latency under "METHOD /path"."""
+        t0 = time.perf_counter()
+        url = urlsplit(target)
+        name = f"{method} {url.path}"
+        handler = self.routes.get((method, url.path))
+        try:
+            if handler is None:
+                if any(path == url.path for _, path in self.routes):
+                    raise ApiError(HTTPStatus.METHOD_NOT_ALLOWED, f"{method} not allowed on {url.path}")
+                name = "unmatched"
+                raise ApiError(HTTPStatus.NOT_FOUND, f"no route for {url.path}")
+            status, payload = await handler(parse_qs(url.query), body)
+        except ApiError as e:
+            status, payload = e.status, {"error": str(e)}
+        except Exception:  # noqa: BLE001 - one bad request must not kill the connection loop
+            log.exception("%s %s failed", method, url.path)  # details stay in the server log
+            status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "internal server error"}
+        self.histograms.setdefault(name, LatencyHistogram()).observe((time.perf_counter() - t0) * 1000)
+        return status, payload
+
+    async def handle_connection(self, reader, writer):
+        """HTTP/1.1 with keep-alive; one request at a time per connection."""
+        try:
+            while True:
+                line = await reader.readline()
+                if not line.strip():
+                    break
+                method, target, version = line.decode("latin-1").split()
+                headers = {}
+                while True:
+                    header = await reader.readline()
+                    if header in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = header.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get("content-length", 0))
+                if length > MAX_BODY_BYTES:
+                    await self._respond(writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "body too large"}, False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                status, payload = await self.dispatch(method.upper(), target, body)
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass  # malformed request line / client went away
+        finally:
+            writer.close()
+
+    async def _respond(self, writer, status, payload, keep_alive):
+        if isinstance(payload, str):  # plain-text bodies (Prometheus exposition)
+            data, content_type = payload.encode(), "text/plain; version=0.0.4; charset=utf-8"
+        else:
+            data, content_type = json.dumps(payload, default=str).encode(), "application/json"
+        head = (
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + data)
+        await writer.drain()
+
+    async def start(self, host="127.0.0.1", port=8765):
+        self._server = await asyncio.start_server(self.handle_connection, host, port)
+        if self.scheduler is not None:
+            self.scheduler.start()
+        if self.writer is not None:
+            self.writer.start()
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self.writer is not None:
+            self.writer.close()  # commits every row already accepted
+        if self.scheduler is not None:
+            self.scheduler.stop()
+        self.executor.shutdown(wait=True)
+
+async def serve(host, port, workers, group_commit=False):
+    server = ApiServer(workers, group_commit=group_commit)
+    host, port = await server.start(host, port)
+    print(f"✅ Clarity API listening on http://{host}:{port}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the Clarity goal tracker as a JSON API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="DB thread pool size")
+    parser.add_argument("--group-commit", action="store_true", help="batch concurrent POST /logs into shared commits")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, args.group_commit))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+# clarity/scripts/bench_group_commit.py
+"""
+Contention benchmark: per-call log_hours() commits vs the GroupCommitWriter.
+
+    python clarity/scripts/bench_group_commit.py --threads 16 --writes 200
+    python clarity/scripts/bench_group_commit.py --synchronous NORMAL --out group_commit.json
+
+Each of --threads threads logs --writes rows as fast as it can into a fresh
+temp DB, once through goal_tracker.log_hours() and once through the writer
+(each call waits for its commit, so both paths give the same guarantee).
+Both paths run at the same --synchronous level.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+from tabulate import tabulate
+
+import db
+import goal_tracker
+from db import close_all
+from write_queue import GroupCommitWriter
+
+def _percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+def _contend(write, threads, writes):
+    """Run `write(i)` writes*threads times across `threads` threads; returns timing stats."""
+    latencies = [[] for _ in range(threads)]
+    start = threading.Barrier(threads + 1)
+
+    def worker(k):
+        start.wait()
+        for i in range(writes):
+            t0 = time.perf_counter()
+            write(i)
+            latencies[k].append((time.perf_counter() - t0) * 1000)
+
+    pool = [threading.Thread(target=worker, args=(k,)) for k in range(threads)]
+    for t in pool:
+        t.start()
+    start.wait()
+    t0 = time.perf_counter()
+    for t in pool:
+        t.join()
+    seconds = time.perf_counter() - t0
+    flat = [ms for per_thread in latencies for ms in per_thread]
+    return {
+        "seconds": round(seconds, 3),
+        "writes_per_sec": round(len(flat) / seconds),
+        "p50_ms": round(statistics.median(flat), 3),
+        "p99_ms": round(_percentile(flat, 99), 3),
+    }
+
+def run(threads=8, writes=200, synchronous="FULL", max_delay_ms=0.0):
+    """Both paths on a fresh DB each; restores goal_tracker.DB_PATH and db.PRAGMAS."""
+    saved_path, saved_sync = goal_tracker.DB_PATH, db.PRAGMAS["synchronous"]
+    db.PRAGMAS["synchronous"] = synchronous
+    results = {"meta": {"threads": threads, "writes_per_thread": writes, "synchronous": synchronous,
+                        "max_delay_ms": max_delay_ms}}
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            goal_tracker.DB_PATH = os.path.join(tmp, "direct.db")
+            goal_tracker.init_db()
+            with contextlib.redirect_stdout(io.StringIO()):  # log_hours() prints every row
+                results["per_call_commit"] = _contend(lambda i: goal_tracker.log_hours("Dev", 0.5), threads, writes)
+            close_all()
+
+            goal_tracker.DB_PATH = os.path.join(tmp, "grouped.db")
+            goal_tracker.init_db()
+            writer = GroupCommitWriter(max_delay_ms=max_delay_ms, synchronous=synchronous).start()
+            results["group_commit"] = _contend(lambda i: writer.log_hours("Dev", 0.5), threads, writes)
+            writer.close()
+            results["group_commit"]["transactions"] = writer.stats["transactions"]
+            results["group_commit"]["rows_per_transaction"] = round(writer.stats["rows"] / writer.stats["transactions"], 1)
+            rows = goal_tracker._conn().execute("SELECT COUNT(*) FROM pillar_logs").fetchone()[0]
+            assert rows == threads * writes, f"group commit wrote {rows} rows"
+            close_all()
+    finally:
+        goal_tracker.DB_PATH, db.PRAGMAS["synchronous"] = saved_path, saved_sync
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark per-call commits against group commit under contention.")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--writes", type=int, default=200, help="writes per thread")
+    parser.add_argument("--synchronous", choices=["OFF", "NORMAL", "FULL"], default="FULL")
+    parser.add_argument("--max-delay-ms", type=float, default=0.0)
+    parser.add_argument("--out", help="write JSON results here")
+    args = parser.parse_args(argv)
+
+    results = run(args.threads, args.writes, args.synchronous, args.max_delay_ms)
+    direct, grouped = results["per_call_commit"], results["group_commit"]
+    print(tabulate(
+        [[name, r["seconds"], r["writes_per_sec"], r["p50_ms"], r["p99_ms"]]
+         for name, r in (("per-call commit", direct), ("group commit", grouped))],
+        headers=["Path", "Seconds", "Writes/s", "p50 ms", "p99 ms"], tablefmt="fancy_grid",
+    ))
+    print(f"{grouped['rows_per_transaction']} rows per transaction, "
+          f"{grouped['writes_per_sec'] / direct['writes_per_sec']:.1f}x throughput")
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"✅ Results written to {args.out}")
+
+if __name__ == "__main__":
+    main()
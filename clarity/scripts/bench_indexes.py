@@ -0,0 +1,86 @@
+# clarity/scripts/bench_indexes.py
+"""
+Before/after benchmark for the schema v2 covering index.
+
+Builds a synthetic pillar_logs table at schema v1 (no indexes) in a temp DB,
+times the queries the app runs, migrates to the latest schema and times them again.
+
+Usage: python clarity/scripts/bench_indexes.py [rows]   (default 1,000,000)
+"""
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from tabulate import tabulate
+
+from db_migrations import migrate, get_schema_version
+
+PILLARS = ["Dev", "DSA", "GATE"]
+REPEATS = 5
+
+def build_db(path, rows, seed=42):
+    """Fill a schema-v1 DB with `rows` entries spread over ~rows/10 days."""
+    rng = random.Random(seed)
+    conn = sqlite3.connect(path)
+    migrate(conn, seed_pillars=PILLARS, target=1)
+    days = max(1, rows // 10)
+    start = datetime.now() - timedelta(days=days - 1)
+    dates = [(start + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(days)]
+    conn.executemany(
+        "INSERT INTO pillar_logs (date, pillar, hours) VALUES (?, ?, ?)",
+        ((rng.choice(dates), rng.choice(PILLARS), round(rng.uniform(0.25, 3.0), 2)) for _ in range(rows)),
+    )
+    conn.commit()
+    return conn
+
+def _queries():
+    today = datetime.now()
+    week_start = (today - timedelta(days=6)).strftime("%Y-%m-%d")
+    today_s = today.strftime("%Y-%m-%d")
+    return [
+        ("7-day grouped sums", """
+            SELECT date, pillar, SUM(hours) FROM pillar_logs
+            WHERE date BETWEEN ? AND ? AND pillar IN ('Dev', 'DSA', 'GATE')
+            GROUP BY date, pillar""", (week_start, today_s)),
+        ("single day+pillar sum", "SELECT SUM(hours) FROM pillar_logs WHERE date = ? AND pillar = ?", (today_s, "DSA")),
+        ("latest 50 logs (ORDER BY date DESC)", "SELECT * FROM pillar_logs ORDER BY date DESC LIMIT 50", ()),
+    ]
+
+def time_queries(conn):
+    results = {}
+    for name, sql, params in _queries():
+        best = float("inf")
+        for _ in range(REPEATS):
+            t0 = time.perf_counter()
+            conn.execute(sql, params).fetchall()
+            best = min(best, time.perf_counter() - t0)
+        plan = " | ".join(r[-1] for r in conn.execute("EXPLAIN QUERY PLAN " + sql, params))
+        results[name] = (best * 1000, plan)
+    return results
+
+def run(rows):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        t0 = time.perf_counter()
+        conn = build_db(path, rows)
+        print(f"Built {rows:,} rows in {time.perf_counter() - t0:.1f}s (schema v{get_schema_version(conn)})")
+
+        before = time_queries(conn)
+        t0 = time.perf_counter()
+        migrate(conn, seed_pillars=PILLARS)
+        print(f"Migrated to v{get_schema_version(conn)} in {time.perf_counter() - t0:.1f}s\n")
+        after = time_queries(conn)
+        conn.close()
+
+    table = []
+    for name in before:
+        b, a = before[name][0], after[name][0]
+        table.append([name, f"{b:.2f}", f"{a:.2f}", f"{b / a:.0f}x" if a > 0 else "-", after[name][1]])
+    print(tabulate(table, headers=["Query", "Before (ms)", "After (ms)", "Speedup", "Plan after"], tablefmt="fancy_grid"))
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
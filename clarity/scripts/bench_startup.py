@@ -0,0 +1,92 @@
+# clarity/scripts/bench_startup.py
+"""
+Cold-start budget check for the Streamlit app.
+
+Each page is opened in a fresh interpreter through streamlit's AppTest (no
+server, no browser), so every number includes that page's first imports:
+
+    python clarity/scripts/bench_startup.py --budget-ms 1500 --out startup.json
+    python clarity/scripts/bench_startup.py --db /tmp/bench.db     # keep the real DB untouched
+
+Opening a page initializes and writes the DB (migrations, precompute); with
+`db_path` the app runs on that file instead (CLARITY_DB, see goal_tracker.DB_PATH).
+
+Exits with status 1 if any page's first paint is over budget.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ui", "app.py")
+PAGES = ["Home", "Log Hours", "Weekly Report", "Reports", "Trends", "Suggestions", "Journal", "View Logs", "Diagnostics"]
+HEAVY_MODULES = ["pandas", "numpy", "plotly", "pyarrow"]
+DEFAULT_BUDGET_MS = 1500
+
+def _child(page, app_path):
+    """
+    Runs inside the fresh interpreter: open the app, switch to `page`, report
+    timings and the heavy modules the app itself loaded as JSON.
+    """
+    from streamlit.testing.v1 import AppTest
+
+    preloaded = set(sys.modules)  # the test harness itself pulls in some of plotly
+    t0 = time.perf_counter()
+    at = AppTest.from_file(app_path, default_timeout=120).run()
+    if page != PAGES[0]:
+        at.sidebar.selectbox[0].set_value(page).run()
+    wall_ms = (time.perf_counter() - t0) * 1000
+    if at.exception:
+        raise SystemExit(f"{page}: {at.exception[0].value}")
+
+    stats = next(json.loads(j.value) for j in at.sidebar.json if "first_paint_ms" in j.value)
+    print(json.dumps({
+        "page": page,
+        "wall_ms": round(wall_ms, 1),
+        "first_paint_ms": stats["first_paint_ms"].get(page),
+        "imports_ms": stats["imports_ms"],
+        "heavy_modules": [m for m in HEAVY_MODULES if m in sys.modules and m not in preloaded],
+    }))
+
+def measure(page, app_path=APP_PATH, db_path=None):
+    """Cold timings for one page, measured in a subprocess (on the DB at `db_path`, if given)."""
+    env = dict(os.environ, CLARITY_DB=os.path.abspath(db_path)) if db_path else None
+    out = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", page, "--app", app_path],
+        capture_output=True, text=True, check=True, env=env,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure cold first-paint time per page of the Clarity app.")
+    parser.add_argument("--pages", nargs="*", default=PAGES)
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--app", default=APP_PATH)
+    parser.add_argument("--db", help="run the app on this DB file instead of the shared one")
+    parser.add_argument("--out", help="write JSON results here")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        return _child(args.child, args.app)
+
+    results = [measure(page, args.app, args.db) for page in args.pages]
+    print(f"{'page':<16} {'first paint':>12} {'wall':>10}  lazy imports")
+    for r in results:
+        imports = ", ".join(f"{m} {ms:.0f}ms" for m, ms in r["imports_ms"].items()) or "-"
+        print(f"{r['page']:<16} {r['first_paint_ms']:>10.1f}ms {r['wall_ms']:>8.0f}ms  {imports}")
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"budget_ms": args.budget_ms, "pages": results}, f, indent=2)
+
+    over = [r["page"] for r in results if r["first_paint_ms"] > args.budget_ms]
+    if over:
+        print(f"⚠ Over the {args.budget_ms:.0f} ms first-paint budget: {', '.join(over)}")
+        return 1
+    print(f"✅ All pages within the {args.budget_ms:.0f} ms first-paint budget.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,188 @@
+# clarity/scripts/bench_suite.py
+"""
+Benchmark harness for the goal tracker stack.
+
+Generates seeded synthetic history into a temp DB, times each layer the app
+uses and writes JSON so runs can be compared across commits:
+
+    python clarity/scripts/bench_suite.py --years 3 --out before.json
+    git checkout <other commit>
+    python clarity/scripts/bench_suite.py --years 3 --out after.json --compare before.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import goal_tracker
+import synthetic_data
+from db import close_all
+from pillar_config import TARGETS_EPOCH
+
+def _timeit(fn, repeat):
+    """Run fn() `repeat` times; returns stats in ms."""
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1000)
+    return {"min_ms": round(min(times), 3), "median_ms": round(statistics.median(times), 3), "repeat": repeat}
+
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def _benchmarks(end):
+    """
+    name -> zero-arg callable; imported lazily so the list tracks whatever the tree provides.
+    Range reads end on `end`, the last day of the synthetic history.
+    """
+    from goal_tracker import (
+        get_window_sums, get_weekly_avg, check_targets, get_weekly_totals, get_logs_page, get_pillar_totals, get_config,
+    )
+    from suggestion_engine import generate_suggestions
+    benches = {
+        "window_sums_7d": lambda: get_window_sums(7, end=end),
+        "window_sums_365d": lambda: get_window_sums(365, end=end),
+        "weekly_avg": get_weekly_avg,
+        "check_targets": check_targets,
+        "generate_suggestions": lambda: generate_suggestions(check_targets(), get_config()),
+        "logs_first_page": lambda: get_logs_page(50),
+        "pillar_totals": get_pillar_totals,
+    }
+
+    def weekly_report_page():
+        window = get_window_sums(7, end=end)
+        status = check_targets(window)
+        get_weekly_totals(window)
+        return status
+
+    def suggestions_page():
+        return generate_suggestions(check_targets(), get_config())["summary_lines"]
+
+    benches["page_weekly_report"] = weekly_report_page
+    benches["page_suggestions"] = suggestions_page
+
+    try:
+        import analytics
+    except ImportError:  # pandas/numpy not installed
+        return benches
+
+    def trends_page():
+        daily = analytics.load_daily_frame(365, end=end)
+        analytics.rolling_averages(daily)
+        analytics.streaks(daily)
+        analytics.weekday_distribution(daily)
+
+    benches["page_weekly_report_frames"] = lambda: analytics.progress_frame(weekly_report_page())
+    benches["page_trends_365d"] = trends_page
+    benches["suggestions_backfill_all_days"] = lambda: analytics.historical_suggestions(analytics.load_daily_frame(end=end))
+    return benches
+
+def run(years=1.0, pillars=3, entries_per_day=3.0, skew=1.0, seed=42, repeat=20, single_logs=200,
+        end=synthetic_data.ANCHOR):
+    results = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "params": {"years": years, "pillars": pillars, "entries_per_day": entries_per_day,
+                       "skew": skew, "seed": seed, "repeat": repeat, "end": str(end)},
+        },
+        "benchmarks": {},
+    }
+    saved_path = goal_tracker.DB_PATH
+    with tempfile.TemporaryDirectory() as tmp:
+        goal_tracker.DB_PATH = os.path.join(tmp, "bench.db")
+        try:
+            goal_tracker.init_db()
+            config = goal_tracker.get_config()
+            for name in synthetic_data.pillar_names(pillars):  # synthetic pillars need a target too
+                if name not in config.pillars:
+                    goal_tracker.set_target(name, 1.0, effective_from=TARGETS_EPOCH)
+
+            rows = list(synthetic_data.generate_logs(years, pillars, entries_per_day, skew, seed, end=end))
+            t0 = time.perf_counter()
+            stats = goal_tracker.bulk_log_hours(rows, dedupe=False)
+            elapsed = time.perf_counter() - t0
+            results["meta"]["rows"] = stats["inserted"]
+            results["benchmarks"]["insert_bulk"] = {
+                "total_ms": round(elapsed * 1000, 3), "rows": stats["inserted"],
+                "rows_per_sec": round(stats["inserted"] / elapsed) if elapsed else None,
+            }
+
+            with contextlib.redirect_stdout(io.StringIO()):  # log_hours prints per call
+                t0 = time.perf_counter()
+                for _ in range(single_logs):
+                    goal_tracker.log_hours(synthetic_data.BASE_PILLARS[0], 0.25)
+                elapsed = time.perf_counter() - t0
+            results["benchmarks"]["insert_log_hours"] = {
+                "total_ms": round(elapsed * 1000, 3), "rows": single_logs,
+                "rows_per_sec": round(single_logs / elapsed) if elapsed else None,
+            }
+
+            for name, fn in _benchmarks(end).items():
+                fn()  # warm-up (statement cache, page cache)
+                results["benchmarks"][name] = _timeit(fn, repeat)
+        finally:
+            close_all()
+            goal_tracker.DB_PATH = saved_path
+    return results
+
+def _metric(entry):
+    return entry.get("median_ms", entry.get("total_ms"))
+
+def compare(current, baseline):
+    """Print per-benchmark change vs a baseline results dict."""
+    print(f"{'benchmark':<32} {'baseline':>12} {'current':>12} {'change':>9}")
+    for name, entry in current["benchmarks"].items():
+        base = baseline.get("benchmarks", {}).get(name)
+        now = _metric(entry)
+        if not base:
+            print(f"{name:<32} {'-':>12} {now:>12.3f} {'new':>9}")
+            continue
+        was = _metric(base)
+        change = f"{(now - was) / was * 100:+.1f}%" if was else "-"
+        flag = " ⚠" if was and now > was * 1.2 else ""
+        print(f"{name:<32} {was:>12.3f} {now:>12.3f} {change:>9}{flag}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Clarity goal tracker stack on synthetic data.")
+    parser.add_argument("--years", type=float, default=1.0)
+    parser.add_argument("--pillars", type=int, default=3)
+    parser.add_argument("--entries-per-day", type=float, default=3.0)
+    parser.add_argument("--skew", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--out", help="write JSON results here (default: stdout)")
+    parser.add_argument("--compare", help="baseline JSON from an earlier run")
+    args = parser.parse_args(argv)
+
+    results = run(args.years, args.pillars, args.entries_per_day, args.skew, args.seed, args.repeat)
+    text = json.dumps(results, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+        print(f"✅ Wrote {len(results['benchmarks'])} benchmarks ({results['meta']['rows']:,} rows) to {args.out}")
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+
+if __name__ == "__main__":
+    sys.exit(main())
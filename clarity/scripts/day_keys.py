@@ -0,0 +1,59 @@
+# clarity/scripts/day_keys.py
+import time
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+# =====================
+# DAY KEYS
+# =====================
+# Logs are bucketed by the user's local day, not the server's: a session at
+# 00:40 in Kolkata (or before a 4 a.m. rollover) belongs to the day it started
+# on. The bucket is an integer epoch-day (days since 1970-01-01), so window
+# queries are integer range scans and the only string formatting left is
+# for display. In SQL the same key comes from a YYYY-MM-DD column via SQL_DAY.
+
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+SQL_DAY = "CAST(julianday({}) - 2440587.5 AS INTEGER)"  # .format(column) -> epoch-day, NULL if invalid
+
+def get_zone(name):
+    """ZoneInfo for an IANA name ("Asia/Kolkata"); None/"" = the server's local time. Raises ValueError."""
+    if not name:
+        return None
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError) as e:
+        raise ValueError(f"unknown time zone {name!r}") from e
+
+def epoch_day(ts=None, zone=None, rollover_hour=0):
+    """Local day of UTC timestamp `ts` (default now) in `zone`; hours before `rollover_hour` count as the previous day."""
+    ts = time.time() if ts is None else ts
+    local = datetime.fromtimestamp(ts, zone) if zone is not None else datetime.fromtimestamp(ts)
+    return (local - timedelta(hours=rollover_hour)).date().toordinal() - EPOCH_ORDINAL
+
+def next_rollover(ts=None, zone=None, rollover_hour=0):
+    """UTC timestamp at which the local day containing `ts` (default now) ends."""
+    ts = time.time() if ts is None else ts
+    local = datetime.fromtimestamp(ts, zone) if zone is not None else datetime.fromtimestamp(ts)
+    nxt = (local - timedelta(hours=rollover_hour)).date() + timedelta(days=1)
+    # naive (zone None) datetimes are read as server local time by .timestamp()
+    return datetime(nxt.year, nxt.month, nxt.day, rollover_hour, tzinfo=zone).timestamp()
+
+def to_day(value):
+    """Epoch-day for an int (returned as is), a date/datetime (calendar day) or an ISO "YYYY-MM-DD..." string."""
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        return _parse_day(value[:10])
+    if isinstance(value, datetime):
+        value = value.date()
+    return value.toordinal() - EPOCH_ORDINAL
+
+@lru_cache(maxsize=4096)
+def _parse_day(text):
+    return date.fromisoformat(text).toordinal() - EPOCH_ORDINAL
+
+@lru_cache(maxsize=4096)
+def day_to_date(day):
+    """Epoch-day -> "YYYY-MM-DD" (cached; windows ask for the same few hundred days over and over)."""
+    return date.fromordinal(day + EPOCH_ORDINAL).isoformat()
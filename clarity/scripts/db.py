@@ -0,0 +1,135 @@
+# clarity/scripts/db.py
+import atexit
+import os
+import re
+import sqlite3
+import threading
+import weakref
+from collections import OrderedDict
+
+# =====================
+# CONNECTION MANAGER
+# =====================
+# One long-lived connection per (thread, db file) instead of a connect/close per
+# call. Connections run in WAL mode so readers never block on a writer, and
+# sqlite3's per-connection statement cache means repeated queries skip re-preparing.
+# A thread's connections are closed when the thread exits (Streamlit reruns,
+# server and writer workers are short-lived threads), so handles never pile up.
+
+PRAGMAS = {
+    "journal_mode": "WAL",      # concurrent readers + one writer, no "database is locked" on reads
+    "synchronous": "NORMAL",    # safe with WAL; fsync at checkpoints instead of every commit
+    "cache_size": -16000,       # ~16 MB page cache per connection
+    "mmap_size": 268435456,     # 256 MB memory-mapped reads
+    "temp_store": "MEMORY",
+    "busy_timeout": 5000,       # ms to wait for the write lock before failing
+}
+STATEMENT_CACHE_SIZE = 256
+MAX_OPEN_PER_THREAD = 32    # LRU bound on cached handles per thread (one per user DB file)
+OPEN_HOOKS = []             # callables(conn) run on every new handle (e.g. instrumentation.install)
+
+_local = threading.local()
+_registry_lock = threading.Lock()
+_registry = set()   # every open connection, so close_all() can reach other threads' handles
+_generation = 0     # bumped by close_all(); stale thread-local caches are dropped
+
+USER_ID_RE = re.compile(r"[A-Za-z0-9_-][A-Za-z0-9_.-]{0,63}")
+
+def _open(path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    conn = sqlite3.connect(
+        path,
+        timeout=PRAGMAS["busy_timeout"] / 1000,
+        cached_statements=STATEMENT_CACHE_SIZE,
+        check_same_thread=False,  # only the owning thread uses it; close_all() may run elsewhere
+    )
+    for name, value in PRAGMAS.items():
+        conn.execute(f"PRAGMA {name} = {value}")
+    for hook in OPEN_HOOKS:
+        hook(conn)
+    return conn
+
+class _ThreadConns:
+    """A thread's cached handles; lives only in that thread's locals, so it dies with the thread."""
+    __slots__ = ("conns", "generation", "__weakref__")
+
+    def __init__(self, generation):
+        self.conns = OrderedDict()
+        self.generation = generation
+        weakref.finalize(self, _close_conns, self.conns)
+
+def _close_conns(conns):
+    with _registry_lock:
+        for conn in conns.values():
+            _registry.discard(conn)
+    for conn in conns.values():
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+    conns.clear()
+
+def get_conn(path, init=None):
+    """
+    Return this thread's cached connection to `path`, opening it on first use.
+    `init(conn)` runs whenever a new handle is opened (e.g. schema migration).
+    Each thread keeps at most MAX_OPEN_PER_THREAD handles; the least recently
+    used one is closed when another file is opened, and all of them when the
+    thread exits.
+    """
+    pool = getattr(_local, "pool", None)
+    if pool is None or pool.generation != _generation:
+        pool = _local.pool = _ThreadConns(_generation)
+
+    key = os.path.abspath(path)
+    conns = pool.conns
+    conn = conns.get(key)
+    if conn is not None:
+        conns.move_to_end(key)
+        return conn
+
+    conn = _open(key)
+    if init is not None:
+        init(conn)
+    conns[key] = conn
+    with _registry_lock:
+        _registry.add(conn)
+    while len(conns) > MAX_OPEN_PER_THREAD:
+        _, evicted = conns.popitem(last=False)
+        with _registry_lock:
+            _registry.discard(evicted)
+        evicted.close()
+    return conn
+
+def user_db_path(root, user_id):
+    """Per-user DB file under `root`; rejects ids that could escape the directory."""
+    user_id = str(user_id)
+    if not USER_ID_RE.fullmatch(user_id):
+        raise ValueError(f"invalid user id {user_id!r} (letters, digits, '_', '-', '.'; max 64)")
+    return os.path.join(root, f"{user_id}.db")
+
+def close_all():
+    """Close every pooled connection (all threads). Call before deleting a DB file."""
+    global _generation
+    with _registry_lock:
+        for conn in _registry:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        _registry.clear()
+        _generation += 1
+
+def pool_generation():
+    """Changes whenever close_all() runs; in-process state derived from a DB file can key on it."""
+    return _generation
+
+def remove_db(path):
+    """Close pooled connections and delete a DB file along with its WAL/SHM sidecars."""
+    close_all()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+# Closing cleanly checkpoints the WAL back into the main file
+atexit.register(close_all)
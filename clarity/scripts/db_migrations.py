@@ -0,0 +1,623 @@
+# clarity/scripts/db_migrations.py
+import sqlite3
+from contextlib import contextmanager
+
+from day_keys import SQL_DAY
+
+# =====================
+# SCHEMA MIGRATIONS
+# =====================
+# Each entry upgrades the schema by exactly one version. The version a DB is
+# at lives in PRAGMA user_version, so existing clarity.db files are upgraded
+# in place by running only the migrations they have not seen yet.
+# Never edit a shipped migration — append a new one instead.
+
+def _v1_base_schema(c, seed_pillars):
+    """Original MVP table (what init_db() used to create)."""
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS pillar_logs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            date TEXT,
+            pillar TEXT,
+            hours REAL
+        )
+    ''')
+
+def _v2_indexes_and_pillars(c, seed_pillars):
+    """Normalize dates, add the pillar lookup table and the covering index."""
+    # Dates are compared as TEXT everywhere, so they must be canonical YYYY-MM-DD
+    c.execute("""
+        UPDATE pillar_logs SET date = date(date)
+        WHERE date(date) IS NOT NULL AND date <> date(date)
+    """)
+
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS pillars (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL UNIQUE
+        )
+    ''')
+    c.executemany("INSERT OR IGNORE INTO pillars (name) VALUES (?)", [(p,) for p in seed_pillars])
+    c.execute("""
+        INSERT OR IGNORE INTO pillars (name)
+        SELECT DISTINCT pillar FROM pillar_logs WHERE pillar IS NOT NULL
+    """)
+    # Keep the lookup table complete for every write path (log_hours, direct inserts)
+    c.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_pillar_logs_register_pillar
+        AFTER INSERT ON pillar_logs
+        BEGIN
+            INSERT OR IGNORE INTO pillars (name) VALUES (NEW.pillar);
+        END
+    ''')
+
+    # Covers every date/pillar filter and ORDER BY date (rowid/id is implicit in the index)
+    c.execute("""
+        CREATE INDEX IF NOT EXISTS idx_pillar_logs_date_pillar_hours
+        ON pillar_logs (date, pillar, hours)
+    """)
+
+def _fill_rollup_v3(c):
+    """Initial fill of the v3 (date-keyed) rollup; v7 re-keys it by day (see rebuild_rollup)."""
+    c.execute("DELETE FROM daily_pillar_rollup")
+    c.execute("""
+        INSERT INTO daily_pillar_rollup (date, pillar, total_hours, entry_count)
+        SELECT date, pillar, SUM(COALESCE(hours, 0)), COUNT(*)
+        FROM pillar_logs
+        WHERE date IS NOT NULL AND pillar IS NOT NULL
+        GROUP BY date, pillar
+    """)
+
+def _v3_daily_rollup(c, seed_pillars):
+    """Per-day, per-pillar totals maintained by triggers on every write path."""
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS daily_pillar_rollup (
+            date TEXT NOT NULL,
+            pillar TEXT NOT NULL,
+            total_hours REAL NOT NULL DEFAULT 0,
+            entry_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (date, pillar)
+        ) WITHOUT ROWID
+    ''')
+    c.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_pillar_logs_rollup_insert
+        AFTER INSERT ON pillar_logs
+        WHEN NEW.date IS NOT NULL AND NEW.pillar IS NOT NULL
+        BEGIN
+            INSERT INTO daily_pillar_rollup (date, pillar, total_hours, entry_count)
+            VALUES (NEW.date, NEW.pillar, COALESCE(NEW.hours, 0), 1)
+            ON CONFLICT (date, pillar) DO UPDATE SET
+                total_hours = total_hours + excluded.total_hours,
+                entry_count = entry_count + 1;
+        END
+    ''')
+    c.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_pillar_logs_rollup_delete
+        AFTER DELETE ON pillar_logs
+        WHEN OLD.date IS NOT NULL AND OLD.pillar IS NOT NULL
+        BEGIN
+            UPDATE daily_pillar_rollup
+            SET total_hours = total_hours - COALESCE(OLD.hours, 0), entry_count = entry_count - 1
+            WHERE date = OLD.date AND pillar = OLD.pillar;
+            DELETE FROM daily_pillar_rollup
+            WHERE date = OLD.date AND pillar = OLD.pillar AND entry_count <= 0;
+        END
+    ''')
+    # An UPDATE is a delete of the old row followed by an insert of the new one
+    c.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_pillar_logs_rollup_update
+        AFTER UPDATE OF date, pillar, hours ON pillar_logs
+        BEGIN
+            UPDATE daily_pillar_rollup
+            SET total_hours = total_hours - COALESCE(OLD.hours, 0), entry_count = entry_count - 1
+            WHERE date = OLD.date AND pillar = OLD.pillar;
+            DELETE FROM daily_pillar_rollup
+            WHERE date = OLD.date AND pillar = OLD.pillar AND entry_count <= 0;
+            INSERT INTO daily_pillar_rollup (date, pillar, total_hours, entry_count)
+            SELECT NEW.date, NEW.pillar, COALESCE(NEW.hours, 0), 1
+            WHERE NEW.date IS NOT NULL AND NEW.pillar IS NOT NULL
+            ON CONFLICT (date, pillar) DO UPDATE SET
+                total_hours = total_hours + excluded.total_hours,
+                entry_count = entry_count + 1;
+        END
+    ''')
+    _fill_rollup_v3(c)
+
+def _v4_log_page_indexes(c, seed_pillars):
+    """Indexes for keyset pagination of logs by (date, id), optionally per pillar."""
+    c.execute("CREATE INDEX IF NOT EXISTS idx_pillar_logs_date_id ON pillar_logs (date, id)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_pillar_logs_pillar_date_id ON pillar_logs (pillar, date, id)")
+
+def _v5_change_counter(c, seed_pillars):
+    """Single-row counter bumped on every pillar_logs write; caches key on it."""
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS db_changes (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            counter INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    c.execute("INSERT OR IGNORE INTO db_changes (id, counter) VALUES (1, 0)")
+    for event in ("INSERT", "UPDATE", "DELETE"):
+        c.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_pillar_logs_changes_{event.lower()}
+            AFTER {event} ON pillar_logs
+            BEGIN
+                UPDATE db_changes SET counter = counter + 1 WHERE id = 1;
+            END
+        ''')
+
+CONFIG_TABLES = ("pillar_targets", "pillar_actions", "priority_thresholds")
+
+def _v6_pillar_config(c, seed_pillars):
+    """Pillar targets (time-versioned), actions and priority thresholds, seeded from pillar_config defaults."""
+    from pillar_config import DEFAULT_TARGETS, DEFAULT_ACTIONS, DEFAULT_THRESHOLDS, TARGETS_EPOCH
+
+    # A target applies from effective_from until the pillar's next row, so
+    # changing a target never rewrites how past weeks are judged
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS pillar_targets (
+            pillar TEXT NOT NULL,
+            effective_from TEXT NOT NULL,
+            target REAL NOT NULL CHECK (target >= 0),
+            PRIMARY KEY (pillar, effective_from)
+        ) WITHOUT ROWID
+    ''')
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS pillar_actions (
+            pillar TEXT NOT NULL,
+            rank INTEGER NOT NULL,
+            action TEXT NOT NULL,
+            minutes INTEGER NOT NULL,
+            PRIMARY KEY (pillar, rank)
+        ) WITHOUT ROWID
+    ''')
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS priority_thresholds (
+            priority TEXT PRIMARY KEY,
+            min_pct_deficit REAL NOT NULL
+        ) WITHOUT ROWID
+    ''')
+
+    c.executemany("INSERT OR IGNORE INTO pillars (name) VALUES (?)", [(p,) for p in DEFAULT_TARGETS])
+    c.executemany("INSERT OR IGNORE INTO pillar_targets (pillar, effective_from, target) VALUES (?, ?, ?)",
+                  [(p, TARGETS_EPOCH, t) for p, t in DEFAULT_TARGETS.items()])
+    c.executemany("INSERT OR IGNORE INTO pillar_actions (pillar, rank, action, minutes) VALUES (?, ?, ?, ?)",
+                  [(p, rank, text, minutes)
+                   for p, actions in DEFAULT_ACTIONS.items()
+                   for rank, (text, minutes) in enumerate(actions)])
+    c.executemany("INSERT OR IGNORE INTO priority_thresholds (priority, min_pct_deficit) VALUES (?, ?)",
+                  DEFAULT_THRESHOLDS.items())
+
+    # Loaded configs are cached per process; this counter tells them to reload
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS config_changes (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            counter INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    c.execute("INSERT OR IGNORE INTO config_changes (id, counter) VALUES (1, 0)")
+    for table in CONFIG_TABLES:
+        for event in ("INSERT", "UPDATE", "DELETE"):
+            c.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_changes_{event.lower()}
+                AFTER {event} ON {table}
+                BEGIN
+                    UPDATE config_changes SET counter = counter + 1 WHERE id = 1;
+                END
+            ''')
+
+def _v7_day_keys(c, seed_pillars):
+    """UTC log timestamps, integer epoch-day keys, a day-keyed rollup and per-user day boundary settings."""
+    # `date` stays the user's local day as text (written by log_hours() from
+    # logged_at + day_settings); `day` is the same day as an integer key
+    c.execute("ALTER TABLE pillar_logs ADD COLUMN logged_at INTEGER")  # UTC unix seconds; NULL for imported rows
+    c.execute(f"ALTER TABLE pillar_logs ADD COLUMN day INTEGER GENERATED ALWAYS AS ({SQL_DAY.format('date')}) VIRTUAL")
+
+    # Re-key the rollup by day: window reads become integer range scans
+    for event in ("insert", "delete", "update"):
+        c.execute(f"DROP TRIGGER IF EXISTS trg_pillar_logs_rollup_{event}")
+    c.execute("DROP TABLE daily_pillar_rollup")
+    c.execute('''
+        CREATE TABLE daily_pillar_rollup (
+            day INTEGER NOT NULL,
+            pillar TEXT NOT NULL,
+            total_hours REAL NOT NULL DEFAULT 0,
+            entry_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, pillar)
+        ) WITHOUT ROWID
+    ''')
+    c.execute('''
+        CREATE TRIGGER trg_pillar_logs_rollup_insert
+        AFTER INSERT ON pillar_logs
+        WHEN NEW.day IS NOT NULL AND NEW.pillar IS NOT NULL
+        BEGIN
+            INSERT INTO daily_pillar_rollup (day, pillar, total_hours, entry_count)
+            VALUES (NEW.day, NEW.pillar, COALESCE(NEW.hours, 0), 1)
+            ON CONFLICT (day, pillar) DO UPDATE SET
+                total_hours = total_hours + excluded.total_hours,
+                entry_count = entry_count + 1;
+        END
+    ''')
+    c.execute('''
+        CREATE TRIGGER trg_pillar_logs_rollup_delete
+        AFTER DELETE ON pillar_logs
+        WHEN OLD.day IS NOT NULL AND OLD.pillar IS NOT NULL
+        BEGIN
+            UPDATE daily_pillar_rollup
+            SET total_hours = total_hours - COALESCE(OLD.hours, 0), entry_count = entry_count - 1
+            WHERE day = OLD.day AND pillar = OLD.pillar;
+            DELETE FROM daily_pillar_rollup
+            WHERE day = OLD.day AND pillar = OLD.pillar AND entry_count <= 0;
+        END
+    ''')
+    c.execute('''
+        CREATE TRIGGER trg_pillar_logs_rollup_update
+        AFTER UPDATE OF date, pillar, hours ON pillar_logs
+        BEGIN
+            UPDATE daily_pillar_rollup
+            SET total_hours = total_hours - COALESCE(OLD.hours, 0), entry_count = entry_count - 1
+            WHERE day = OLD.day AND pillar = OLD.pillar;
+            DELETE FROM daily_pillar_rollup
+            WHERE day = OLD.day AND pillar = OLD.pillar AND entry_count <= 0;
+            INSERT INTO daily_pillar_rollup (day, pillar, total_hours, entry_count)
+            SELECT NEW.day, NEW.pillar, COALESCE(NEW.hours, 0), 1
+            WHERE NEW.day IS NOT NULL AND NEW.pillar IS NOT NULL
+            ON CONFLICT (day, pillar) DO UPDATE SET
+                total_hours = total_hours + excluded.total_hours,
+                entry_count = entry_count + 1;
+        END
+    ''')
+    rebuild_rollup(c)
+
+    # Where a user's day starts: IANA time zone (NULL = server local) and rollover hour
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS day_settings (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            timezone TEXT,
+            rollover_hour INTEGER NOT NULL DEFAULT 0 CHECK (rollover_hour BETWEEN 0 AND 23)
+        )
+    ''')
+    c.execute("INSERT OR IGNORE INTO day_settings (id, timezone, rollover_hour) VALUES (1, NULL, 0)")
+    for event in ("INSERT", "UPDATE", "DELETE"):
+        c.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_day_settings_changes_{event.lower()}
+            AFTER {event} ON day_settings
+            BEGIN
+                UPDATE config_changes SET counter = counter + 1 WHERE id = 1;
+            END
+        ''')
+
+def _v8_log_edits(c, seed_pillars):
+    """Counter bumped only when existing pillar_logs rows change (UPDATE/DELETE); append-only exports key on it."""
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS log_edits (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            counter INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    c.execute("INSERT OR IGNORE INTO log_edits (id, counter) VALUES (1, 0)")
+    for event in ("UPDATE", "DELETE"):
+        c.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_pillar_logs_edits_{event.lower()}
+            AFTER {event} ON pillar_logs
+            BEGIN
+                UPDATE log_edits SET counter = counter + 1 WHERE id = 1;
+            END
+        ''')
+
+def _v9_precomputed_results(c, seed_pillars):
+    """Results the background precompute writes (status, suggestions, weekly frames), one row per kind."""
+    # Valid while day/changes/config_version still match the DB; readers check all three in one query
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS precomputed_results (
+            kind TEXT PRIMARY KEY,
+            day INTEGER NOT NULL,
+            changes INTEGER NOT NULL,
+            config_version INTEGER NOT NULL,
+            computed_at INTEGER NOT NULL,
+            payload TEXT NOT NULL
+        ) WITHOUT ROWID
+    ''')
+
+def _v10_journal(c, seed_pillars):
+    """Journal entries, their full-text index and the cached per-entry analysis (see journal.py)."""
+    c.execute(f'''
+        CREATE TABLE IF NOT EXISTS journal_entries (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            date TEXT NOT NULL,
+            day INTEGER GENERATED ALWAYS AS ({SQL_DAY.format("date")}) VIRTUAL,
+            text TEXT NOT NULL,
+            content_hash TEXT NOT NULL,
+            updated_at INTEGER NOT NULL
+        )
+    ''')
+    c.execute("CREATE INDEX IF NOT EXISTS idx_journal_entries_day ON journal_entries (day)")
+
+    # Analysis is keyed by the hash of what was analyzed: an entry is re-run
+    # only when its text/date (or the analyzer) changes
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS journal_analysis (
+            entry_id INTEGER PRIMARY KEY,
+            content_hash TEXT NOT NULL,
+            analyzer TEXT NOT NULL,
+            mood REAL NOT NULL,
+            analyzed_at INTEGER NOT NULL
+        ) WITHOUT ROWID
+    ''')
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS journal_themes (
+            day INTEGER NOT NULL,
+            theme TEXT NOT NULL,
+            entry_id INTEGER NOT NULL,
+            weight REAL NOT NULL,
+            PRIMARY KEY (day, theme, entry_id)
+        ) WITHOUT ROWID
+    ''')
+    c.execute("CREATE INDEX IF NOT EXISTS idx_journal_themes_theme ON journal_themes (theme, day)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_journal_themes_entry ON journal_themes (entry_id)")
+    c.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_journal_entries_analysis_delete
+        AFTER DELETE ON journal_entries
+        BEGIN
+            DELETE FROM journal_analysis WHERE entry_id = OLD.id;
+            DELETE FROM journal_themes WHERE entry_id = OLD.id;
+        END
+    ''')
+
+    # External-content FTS5 index kept in step by triggers. SQLite builds
+    # without FTS5 skip it; journal.search() then falls back to LIKE.
+    try:
+        c.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS journal_fts
+            USING fts5(text, content='journal_entries', content_rowid='id', tokenize='porter unicode61')
+        ''')
+    except sqlite3.OperationalError:
+        return
+    c.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_journal_fts_insert AFTER INSERT ON journal_entries
+        BEGIN
+            INSERT INTO journal_fts (rowid, text) VALUES (NEW.id, NEW.text);
+        END
+    ''')
+    c.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_journal_fts_delete AFTER DELETE ON journal_entries
+        BEGIN
+            INSERT INTO journal_fts (journal_fts, rowid, text) VALUES ('delete', OLD.id, OLD.text);
+        END
+    ''')
+    c.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_journal_fts_update AFTER UPDATE OF text ON journal_entries
+        BEGIN
+            INSERT INTO journal_fts (journal_fts, rowid, text) VALUES ('delete', OLD.id, OLD.text);
+            INSERT INTO journal_fts (rowid, text) VALUES (NEW.id, NEW.text);
+        END
+    ''')
+
+def _v11_activity_types(c, seed_pillars):
+    """Execution vs research time per log, and the perfection loop detector's saved state (see loop_detector.py)."""
+    # Existing rows were logged as plain work hours: they read as execution
+    c.execute("""
+        ALTER TABLE pillar_logs ADD COLUMN activity_type TEXT NOT NULL DEFAULT 'execution'
+            CHECK (activity_type IN ('execution', 'research'))
+    """)
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS loop_detector_state (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            last_id INTEGER NOT NULL,
+            edits INTEGER NOT NULL,
+            state TEXT NOT NULL
+        )
+    ''')
+
+def _v12_opportunities(c, seed_pillars):
+    """Opportunities found by opportunity_fetcher.py, and the HTTP cache validators of each fetched page."""
+    # `key` de-duplicates: the canonical link, or title + deadline for items without one
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS opportunities (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            key TEXT NOT NULL UNIQUE,
+            title TEXT NOT NULL,
+            url TEXT,
+            source TEXT NOT NULL,
+            deadline TEXT,
+            tags TEXT NOT NULL DEFAULT '',
+            description TEXT NOT NULL DEFAULT '',
+            content_hash TEXT NOT NULL,
+            first_seen INTEGER NOT NULL,
+            last_seen INTEGER NOT NULL
+        )
+    ''')
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS fetch_state (
+            url TEXT PRIMARY KEY,
+            etag TEXT,
+            last_modified TEXT,
+            body_hash TEXT,
+            bytes INTEGER NOT NULL DEFAULT 0,
+            status INTEGER,
+            fetched_at INTEGER NOT NULL
+        ) WITHOUT ROWID
+    ''')
+
+def _v13_opportunity_index(c, seed_pillars):
+    """Deadline index and tag inverted index for upcoming-deadline queries; change counter for cached results."""
+    c.execute("CREATE INDEX IF NOT EXISTS idx_opportunities_deadline ON opportunities (deadline, id)")
+    # One row per (tag, dated opportunity), written by opportunities.upsert_opportunities:
+    # "tag X due between A and B, soonest first" is a primary-key range scan
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS opportunity_tags (
+            tag TEXT NOT NULL,
+            deadline TEXT NOT NULL,
+            opportunity_id INTEGER NOT NULL,
+            PRIMARY KEY (tag, deadline, opportunity_id)
+        ) WITHOUT ROWID
+    ''')
+    c.execute("CREATE INDEX IF NOT EXISTS idx_opportunity_tags_opportunity ON opportunity_tags (opportunity_id)")
+    c.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_opportunities_tags_delete AFTER DELETE ON opportunities
+        BEGIN
+            DELETE FROM opportunity_tags WHERE opportunity_id = OLD.id;
+        END
+    ''')
+    rows = c.execute("SELECT id, deadline, tags FROM opportunities WHERE deadline IS NOT NULL").fetchall()
+    c.executemany("INSERT OR IGNORE INTO opportunity_tags (tag, deadline, opportunity_id) VALUES (?, ?, ?)",
+                  [(tag, deadline, oid) for oid, deadline, tags in rows for tag in tags.split(",") if tag])
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS opportunity_changes (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            counter INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    c.execute("INSERT OR IGNORE INTO opportunity_changes (id, counter) VALUES (1, 0)")
+    for event in ("INSERT", "UPDATE", "DELETE"):
+        c.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_opportunities_changes_{event.lower()}
+            AFTER {event} ON opportunities
+            BEGIN
+                UPDATE opportunity_changes SET counter = counter + 1 WHERE id = 1;
+            END
+        ''')
+    # cached suggestions list upcoming opportunities: they record the counter they saw
+    c.execute("ALTER TABLE precomputed_results ADD COLUMN opportunity_version INTEGER NOT NULL DEFAULT 0")
+
+def _v14_opportunity_content_trigger(c, seed_pillars):
+    """Only content updates bump opportunity_changes: refreshing last_seen leaves cached suggestions valid."""
+    c.execute("DROP TRIGGER IF EXISTS trg_opportunities_changes_update")
+    c.execute('''
+        CREATE TRIGGER trg_opportunities_changes_update
+        AFTER UPDATE OF title, url, source, deadline, tags, description, content_hash ON opportunities
+        BEGIN
+            UPDATE opportunity_changes SET counter = counter + 1 WHERE id = 1;
+        END
+    ''')
+
+def _v15_db_identity(c, seed_pillars):
+    """A random token per DB file: derived files (snapshots) can tell a replaced DB from the one they were built from."""
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS db_identity (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            token TEXT NOT NULL
+        )
+    ''')
+    c.execute("INSERT OR IGNORE INTO db_identity (id, token) VALUES (1, lower(hex(randomblob(16))))")
+
+def rebuild_rollup(c):
+    """Recompute daily_pillar_rollup from raw pillar_logs (repair / initial fill)."""
+    c.execute("DELETE FROM daily_pillar_rollup")
+    c.execute("""
+        INSERT INTO daily_pillar_rollup (day, pillar, total_hours, entry_count)
+        SELECT day, pillar, SUM(COALESCE(hours, 0)), COUNT(*)
+        FROM pillar_logs
+        WHERE day IS NOT NULL AND pillar IS NOT NULL
+        GROUP BY day, pillar
+    """)
+
+# =====================
+# BULK WRITE SUPPORT
+# =====================
+# Per-row AFTER INSERT triggers dominate bulk-import cost. Bulk writers may drop
+# them inside their own transaction, insert, then apply the same side effects
+# once per chunk with apply_insert_side_effects(). Keep both in sync with the
+# trigger definitions above.
+INSERT_TRIGGERS = (
+    "trg_pillar_logs_register_pillar",
+    "trg_pillar_logs_rollup_insert",
+    "trg_pillar_logs_changes_insert",
+)
+
+@contextmanager
+def insert_triggers_suspended(c):
+    """Drop the per-row insert triggers for the current transaction; recreate them on exit."""
+    saved = c.execute(f"""
+        SELECT name, sql FROM sqlite_master
+        WHERE type = 'trigger' AND name IN ({",".join("?" * len(INSERT_TRIGGERS))})
+    """, INSERT_TRIGGERS).fetchall()
+    for name, _ in saved:
+        c.execute(f"DROP TRIGGER {name}")
+    try:
+        yield
+    finally:
+        for _, sql in saved:
+            c.execute(sql)
+
+def apply_insert_side_effects(c, source):
+    """What the insert triggers would have done for every row of table `source` (date, pillar, hours)."""
+    c.execute(f"INSERT OR IGNORE INTO pillars (name) SELECT DISTINCT pillar FROM {source} WHERE pillar IS NOT NULL")
+    c.execute(f"""
+        INSERT INTO daily_pillar_rollup (day, pillar, total_hours, entry_count)
+        SELECT {SQL_DAY.format("date")} AS d, pillar, SUM(COALESCE(hours, 0)), COUNT(*)
+        FROM {source}
+        WHERE d IS NOT NULL AND pillar IS NOT NULL
+        GROUP BY d, pillar
+        ON CONFLICT (day, pillar) DO UPDATE SET
+            total_hours = total_hours + excluded.total_hours,
+            entry_count = entry_count + excluded.entry_count
+    """)
+    c.execute("UPDATE db_changes SET counter = counter + 1 WHERE id = 1")
+
+MIGRATIONS = [
+    _v1_base_schema,
+    _v2_indexes_and_pillars,
+    _v3_daily_rollup,
+    _v4_log_page_indexes,
+    _v5_change_counter,
+    _v6_pillar_config,
+    _v7_day_keys,
+    _v8_log_edits,
+    _v9_precomputed_results,
+    _v10_journal,
+    _v11_activity_types,
+    _v12_opportunities,
+    _v13_opportunity_index,
+    _v14_opportunity_content_trigger,
+    _v15_db_identity,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+def get_schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def migrate(conn, seed_pillars=(), target=SCHEMA_VERSION):
+    """
+    Apply pending migrations up to `target`, one transaction per version.
+    Returns the list of versions applied (empty if already up to date).
+    """
+    applied = []
+    if get_schema_version(conn) >= target:
+        return applied
+    for version in range(get_schema_version(conn) + 1, target + 1):
+        c = conn.cursor()
+        try:
+            # IMMEDIATE takes the write lock first; another process may have
+            # migrated while we waited, so re-check inside the transaction
+            c.execute("BEGIN IMMEDIATE")
+            if get_schema_version(conn) < version:
+                MIGRATIONS[version - 1](c, seed_pillars)
+                c.execute(f"PRAGMA user_version = {version}")
+                applied.append(version)
+            conn.commit()
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+    return applied
+
+if __name__ == "__main__":
+    # Usage: python clarity/scripts/db_migrations.py [db_path] [--rebuild-rollup]
+    import sys
+    from db import get_conn
+    from goal_tracker import DB_PATH
+    from pillar_config import DEFAULT_TARGETS
+
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    path = args[0] if args else DB_PATH
+    conn = get_conn(path)
+    before = get_schema_version(conn)
+    applied = migrate(conn, DEFAULT_TARGETS.keys())
+    print(f"✅ {path}: schema v{before} → v{get_schema_version(conn)} (applied: {applied or 'none'})")
+
+    if "--rebuild-rollup" in sys.argv:
+        with conn:
+            rebuild_rollup(conn.cursor())
+        n = conn.execute("SELECT COUNT(*) FROM daily_pillar_rollup").fetchone()[0]
+        print(f"✅ Rebuilt daily_pillar_rollup ({n} day/pillar rows).")
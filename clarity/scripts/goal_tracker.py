@@ -1,109 +1,610 @@
-import sqlite3
+import math
 import os
+import sqlite3
+import tempfile
+import threading
+from contextlib import contextmanager
+
+from db import get_conn, user_db_path, pool_generation, close_all
+from instrumentation import timed
+from db_migrations import (
+    migrate, rebuild_rollup as _rebuild_rollup, insert_triggers_suspended, apply_insert_side_effects,
+)
+from pillar_config import DEFAULT_TARGETS, load_config
+from day_keys import day_to_date, get_zone, to_day
+from rolling_window import RollingWindow
 
 # =====================
 # DB FUNCTIONS
 # =====================
-DB_PATH = "clarity/data/clarity.db"
+DB_PATH = os.environ.get("CLARITY_DB", "clarity/data/clarity.db")  # CLARITY_DB: run the app on another DB file
+
+# Multi-user hosting: each user's logs live in their own SQLite file under
+# <data>/users/, so one heavy history never slows another user's reports.
+# user=None everywhere means the classic single-user DB_PATH.
+def db_path_for(user=None):
+    """SQLite file holding `user`'s logs."""
+    if user is None:
+        return DB_PATH
+    return user_db_path(os.path.join(os.path.dirname(DB_PATH), "users"), user)
+
+def _init_schema(conn):
+    migrate(conn, seed_pillars=DEFAULT_TARGETS.keys())
+
+def _conn(user=None):
+    """Pooled connection for `user`'s DB; the schema is created/upgraded when a handle opens."""
+    return get_conn(db_path_for(user), init=_init_schema)
 
 # Make a DB init Script
-def init_db():
+@timed()
+def init_db(user=None):
     # Make sure /data exists
-    os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
-
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute('''
-        CREATE TABLE IF NOT EXISTS pillar_logs (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            date TEXT,
-            pillar TEXT,
-            hours REAL
-        )
-    ''')
-    conn.commit()
-    conn.close()
+    os.makedirs(os.path.dirname(db_path_for(user)), exist_ok=True)
 
-if __name__ == "__main__":
-    init_db()
-    print(f"Database initialized at {DB_PATH}")
+    # Create or upgrade the schema in place (see db_migrations.py)
+    migrate(_conn(user), seed_pillars=DEFAULT_TARGETS.keys())
 
+@contextmanager
+def temporary_db(name="clarity.db"):
+    """
+    Point DB_PATH at a fresh, initialized DB in a temporary directory (tests,
+    benchmarks) and yield its path. On exit pooled handles are closed, the
+    directory is removed and DB_PATH is restored.
+    """
+    global DB_PATH
+    saved = DB_PATH
+    with tempfile.TemporaryDirectory() as tmp:
+        DB_PATH = os.path.join(tmp, name)
+        try:
+            init_db()
+            yield DB_PATH
+        finally:
+            close_all()
+            DB_PATH = saved
 
 
 # LOGGING DAILY HOURS
-from datetime import datetime, timedelta
+import time
+from datetime import datetime
+
+# Callables(user) run after log_hours()/bulk_log_hours() commit (e.g. precompute.PrecomputeScheduler.notify)
+LOG_LISTENERS = []
 
-def log_hours(pillar, hours):
-    """Insert a new record into pillar_logs table."""
-    conn = sqlite3.connect(DB_PATH)
+def _notify_log_listeners(user):
+    for listener in list(LOG_LISTENERS):
+        listener(user)
+
+# What the hours were spent on: shipping work, or reading/tutorials/videos (see loop_detector.py)
+ACTIVITY_TYPES = ("execution", "research")
+
+def check_activity_type(activity_type):
+    if activity_type not in ACTIVITY_TYPES:
+        raise ValueError(f"unknown activity type {activity_type!r} (use {' or '.join(ACTIVITY_TYPES)})")
+    return activity_type
+
+@timed()
+def insert_log(pillar, hours, user=None, at=None, activity_type="execution"):
+    """
+    Insert a new record into pillar_logs table and return its id. `at` is the
+    UTC unix time it was logged (default now); it is bucketed into the user's
+    local day (day_settings: time zone + rollover hour). Prints nothing
+    (servers call this; log_hours() is the console-friendly wrapper).
+    """
+    check_activity_type(activity_type)
+    at = time.time() if at is None else at
+    day = get_config(user).day_of(at)
+    conn = _conn(user)
     c = conn.cursor()
     c.execute("""
-        INSERT INTO pillar_logs (date, pillar, hours)
-        VALUES (?, ?, ?)
-    """, (datetime.now().strftime("%Y-%m-%d"), pillar, hours))
+        INSERT INTO pillar_logs (date, pillar, hours, logged_at, activity_type)
+        VALUES (?, ?, ?, ?, ?)
+    """, (day_to_date(day), pillar, hours, int(at), activity_type))
     conn.commit()
-    conn.close()
+    _note_log(user, day, pillar, hours)
+    _notify_log_listeners(user)
+    return c.lastrowid
+
+def log_hours(pillar, hours, user=None, at=None, activity_type="execution"):
+    """insert_log() plus a confirmation line on stdout (CLI / app use)."""
+    row_id = insert_log(pillar, hours, user=user, at=at, activity_type=activity_type)
     print(f"✅ Logged {hours} hours for {pillar}.")
+    return row_id
 
-if __name__ == "__main__":
-    log_hours("Dev", 2.0)
+
+# BULK LOGGING (historical imports)
+from itertools import islice
+
+BULK_CHUNK_SIZE = 50_000
+
+_DATE_CACHE = {}  # imports repeat the same few thousand dates millions of times
+
+def _normalize_date(value):
+    """date/datetime or ISO string -> "YYYY-MM-DD"."""
+    if not isinstance(value, str):
+        return value.strftime("%Y-%m-%d")
+    day = _DATE_CACHE.get(value)
+    if day is None:
+        day = datetime.fromisoformat(value).strftime("%Y-%m-%d")
+        if len(_DATE_CACHE) < 100_000:
+            _DATE_CACHE[value] = day
+    return day
+
+def _normalize_record(rec, pillars):
+    """
+    (date, pillar, hours[, activity_type]) tuple or dict -> validated
+    ("YYYY-MM-DD", pillar, hours, activity_type). Raises ValueError.
+    """
+    if isinstance(rec, dict):
+        date, pillar, hours = rec.get("date"), rec.get("pillar"), rec.get("hours")
+        activity_type = rec.get("activity_type") or "execution"
+    else:
+        date, pillar, hours, *rest = rec
+        activity_type = (rest[0] if rest else None) or "execution"
+    if pillar not in pillars:
+        raise ValueError(f"unknown pillar {pillar!r}")
+    hours = float(hours)
+    if not math.isfinite(hours):
+        raise ValueError(f"hours must be finite, got {hours}")
+    if hours < 0:
+        raise ValueError(f"negative hours {hours}")
+    return _normalize_date(date), pillar, hours, check_activity_type(activity_type)
+
+@timed()
+def bulk_log_hours(records, chunk_size=BULK_CHUNK_SIZE, dedupe=False, on_error=None, user=None):
+    """
+    Insert many (date, pillar, hours[, activity_type]) records (tuples or dicts), streaming the
+    iterable in chunks: one staged executemany and one transaction per chunk,
+    with the rollup updated once per chunk instead of once per row.
+    Pillars are validated against the configured pillars; invalid records are skipped and
+    passed to on_error(record, exc) if given.
+    Every record is inserted by default: two sessions of the same length on the
+    same day are both real. With dedupe=True (re-importing an export that
+    overlaps the DB), records identical on (date, pillar, hours, activity_type) to one already
+    in the DB or earlier in the same import are skipped.
+    Returns dict: {"inserted", "duplicates", "rejected", "seconds", "rows_per_sec"}
+    """
+    pillars = frozenset(get_config(user).pillars)
+    conn = _conn(user)
+    c = conn.cursor()
+    c.execute("CREATE TEMP TABLE IF NOT EXISTS import_staging (date TEXT, pillar TEXT, hours REAL, activity_type TEXT)")
+
+    stats = {"inserted": 0, "duplicates": 0, "rejected": 0}
+    t0 = time.perf_counter()
+    it = iter(records)
+    while True:
+        batch = list(islice(it, chunk_size))
+        if not batch:
+            break
+        chunk = []
+        for rec in batch:
+            try:
+                chunk.append(_normalize_record(rec, pillars))
+            except (ValueError, TypeError, AttributeError) as e:
+                stats["rejected"] += 1
+                if on_error:
+                    on_error(rec, e)
+        if not chunk:
+            continue
+        chunk.sort()  # index-order inserts touch far fewer b-tree pages
+
+        try:
+            c.execute("BEGIN IMMEDIATE")
+            c.execute("DELETE FROM import_staging")
+            c.executemany("INSERT INTO import_staging (date, pillar, hours, activity_type) VALUES (?, ?, ?, ?)", chunk)
+            if dedupe:
+                c.execute("""
+                    DELETE FROM import_staging
+                    WHERE rowid NOT IN (SELECT MIN(rowid) FROM import_staging GROUP BY date, pillar, hours, activity_type)
+                       OR EXISTS (
+                            SELECT 1 FROM pillar_logs l
+                            WHERE l.date = import_staging.date
+                              AND l.pillar = import_staging.pillar
+                              AND l.hours = import_staging.hours
+                              AND l.activity_type = import_staging.activity_type
+                       )
+                """)
+            with insert_triggers_suspended(c):
+                c.execute("""
+                    INSERT INTO pillar_logs (date, pillar, hours, activity_type)
+                    SELECT date, pillar, hours, activity_type FROM import_staging
+                """)
+                inserted = c.rowcount
+                apply_insert_side_effects(c, "import_staging")
+            conn.commit()
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+        stats["inserted"] += inserted
+        stats["duplicates"] += len(chunk) - inserted
+
+    _drop_rolling_window(user)
+    if stats["inserted"]:
+        _notify_log_listeners(user)  # once per import, not per row
+    stats["seconds"] = round(time.perf_counter() - t0, 3)
+    processed = stats["inserted"] + stats["duplicates"] + stats["rejected"]
+    stats["rows_per_sec"] = round(processed / stats["seconds"]) if stats["seconds"] > 0 else processed
+    return stats
 
 # FETCH ALL LOGS
-def get_all_logs():
+@timed()
+def get_all_logs(user=None):
     """Retrieve all logs from DB."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = _conn(user)
     c = conn.cursor()
     c.execute("SELECT * FROM pillar_logs ORDER BY date DESC;")
     rows = c.fetchall()
-    conn.close()
     return rows
 
-if __name__ == "__main__":
-    print(get_all_logs())
+
+# PAGINATED / STREAMING LOGS
+LOG_PAGE_SIZE = 50
+
+@timed()
+def get_logs_page(page_size=LOG_PAGE_SIZE, after=None, pillar=None, date_from=None, date_to=None, user=None):
+    """
+    One page of logs, newest first, using keyset pagination on (date, id) so
+    page N costs the same as page 1.
+    `after` is the cursor returned with the previous page (None = first page).
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    where, params = [], []
+    if after is not None:
+        where.append("(date, id) < (?, ?)")
+        params.extend(after)
+    if pillar:
+        where.append("pillar = ?")
+        params.append(pillar)
+    if date_from:
+        where.append("date >= ?")
+        params.append(str(date_from))
+    if date_to:
+        where.append("date <= ?")
+        params.append(str(date_to))
+
+    conn = _conn(user)
+    c = conn.cursor()
+    c.execute(f"""
+        SELECT id, date, pillar, hours FROM pillar_logs
+        {"WHERE " + " AND ".join(where) if where else ""}
+        ORDER BY date DESC, id DESC
+        LIMIT ?
+    """, (*params, page_size + 1))
+    rows = c.fetchall()
+
+    if len(rows) <= page_size:
+        return rows, None
+    rows = rows[:page_size]
+    return rows, (rows[-1][1], rows[-1][0])
+
+def iter_logs(page_size=LOG_PAGE_SIZE, **filters):
+    """Yield matching logs newest first, holding only one page in memory."""
+    cursor = None
+    while True:
+        rows, cursor = get_logs_page(page_size, after=cursor, **filters)
+        yield from rows
+        if cursor is None:
+            return
+
+# PILLAR CONFIG (targets, actions, thresholds; see pillar_config.py)
+MAX_CONFIGS = 1024
+CONFIG_SYNC_INTERVAL = 1.0  # s between checks for config edits made by other processes
+
+_CONFIGS = {}  # db path -> (compiled PillarConfig, pool generation, next check time)
+
+@timed()
+def get_config(user=None):
+    """
+    The compiled pillar config for `user`'s DB. It is loaded once and reused:
+    edits through set_target()/set_actions()/set_threshold() apply at once,
+    edits from other processes within CONFIG_SYNC_INTERVAL (config_changes counter).
+    """
+    path = db_path_for(user)
+    entry = _CONFIGS.get(path)
+    now = time.monotonic()
+    generation = pool_generation()
+    if entry is not None and entry[1] == generation and now < entry[2]:
+        return entry[0]
+
+    conn = _conn(user)
+    version = conn.execute("SELECT counter FROM config_changes WHERE id = 1").fetchone()[0]
+    if entry is not None and entry[1] == generation and entry[0].version == version:
+        config = entry[0]
+    else:
+        config = load_config(conn)
+    if path not in _CONFIGS and len(_CONFIGS) >= MAX_CONFIGS:
+        _CONFIGS.pop(next(iter(_CONFIGS)), None)
+    _CONFIGS[path] = (config, generation, now + CONFIG_SYNC_INTERVAL)
+    return config
+
+@timed()
+def set_target(pillar, target, effective_from=None, user=None):
+    """
+    Set `pillar`'s daily target from `effective_from` (default today) onward.
+    Earlier days keep the target that was active then. Adds the pillar if new.
+    """
+    target = float(target)
+    if target < 0:
+        raise ValueError(f"negative target {target}")
+    day = _normalize_date(effective_from) if effective_from is not None else day_to_date(get_config(user).today())
+    conn = _conn(user)
+    with conn:
+        conn.execute("INSERT OR IGNORE INTO pillars (name) VALUES (?)", (pillar,))
+        conn.execute("""
+            INSERT INTO pillar_targets (pillar, effective_from, target) VALUES (?, ?, ?)
+            ON CONFLICT (pillar, effective_from) DO UPDATE SET target = excluded.target
+        """, (pillar, day, target))
+    _CONFIGS.pop(db_path_for(user), None)
+
+@timed()
+def set_actions(pillar, actions, user=None):
+    """Replace `pillar`'s suggested actions: [(text, minutes), ...], most ambitious first."""
+    conn = _conn(user)
+    with conn:
+        conn.execute("DELETE FROM pillar_actions WHERE pillar = ?", (pillar,))
+        conn.executemany(
+            "INSERT INTO pillar_actions (pillar, rank, action, minutes) VALUES (?, ?, ?, ?)",
+            [(pillar, rank, text, int(minutes)) for rank, (text, minutes) in enumerate(actions)],
+        )
+    _CONFIGS.pop(db_path_for(user), None)
+
+@timed()
+def set_threshold(priority, min_pct_deficit, user=None):
+    """Set the fraction below target at which `priority` ("high"/"medium") starts."""
+    if priority not in ("high", "medium"):  # "low" is whatever is below medium: it has no threshold
+        raise ValueError(f"priority must be 'high' or 'medium', got {priority!r}")
+    thresholds = get_config(user).thresholds
+    thresholds[priority] = float(min_pct_deficit)
+    if thresholds["high"] < thresholds["medium"]:
+        raise ValueError("high threshold must be at least the medium threshold")
+    conn = _conn(user)
+    with conn:
+        conn.execute("""
+            INSERT INTO priority_thresholds (priority, min_pct_deficit) VALUES (?, ?)
+            ON CONFLICT (priority) DO UPDATE SET min_pct_deficit = excluded.min_pct_deficit
+        """, (priority, float(min_pct_deficit)))
+    _CONFIGS.pop(db_path_for(user), None)
+
+@timed()
+def set_day_boundary(timezone=None, rollover_hour=0, user=None):
+    """
+    Count `user`'s days in IANA `timezone` (None = server local time), starting
+    at `rollover_hour` local time. Applies to entries logged from now on.
+    """
+    get_zone(timezone)  # raises ValueError for unknown zones
+    rollover_hour = int(rollover_hour)
+    if not 0 <= rollover_hour <= 23:
+        raise ValueError(f"rollover hour {rollover_hour} is not in 0-23")
+    conn = _conn(user)
+    with conn:
+        conn.execute("UPDATE day_settings SET timezone = ?, rollover_hour = ? WHERE id = 1",
+                     (timezone or None, rollover_hour))
+    _CONFIGS.pop(db_path_for(user), None)
+    _drop_rolling_window(user)
 
 # Weekly average calculator
-TARGETS = {"Dev": 1.5, "DSA": 1, "GATE": 1}
 
-def get_weekly_avg():
+def _last_day(end, user):
+    """Epoch-day a window ends on: `end` if given, else the user's today."""
+    return to_day(end) if end is not None else get_config(user).today()
+
+def window_dates(days=7, end=None, user=None):
+    """List of the last `days` calendar dates (strings) ending at `end` (default: the user's today), oldest first."""
+    last = _last_day(end, user)
+    return [day_to_date(d) for d in range(last - days + 1, last + 1)]
+
+@timed()
+def get_window_sums(days=7, end=None, pillars=None, user=None):
     """
-    Calculate average hours per pillar for the last 7 calendar days.
-    Missing days are counted as 0 hours.
-    Returns dict: {pillar: avg_hours}
+    Per-pillar, per-day hour sums for the last `days` days ending at `end`
+    (default: the user's today), read from daily_pillar_rollup with one
+    integer range scan on its day key. Missing days are zero-filled.
+    Returns dict: {"dates": [oldest..newest], "hours": {pillar: [hours per date]}}
     """
-    # ensure DB path/folder exist (defensive)
-    os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
+    pillars = list(pillars or get_config(user).pillars)
+    last = _last_day(end, user)
+    first = last - days + 1
+    hours = {p: [0.0] * days for p in pillars}
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = _conn(user)
     c = conn.cursor()
+    c.execute(f"""
+        SELECT day, pillar, total_hours
+        FROM daily_pillar_rollup
+        WHERE day BETWEEN ? AND ?
+          AND pillar IN ({",".join("?" * len(pillars))})
+    """, (first, last, *pillars))
+    for d, pillar, total in c.fetchall():
+        if total is not None:
+            hours[pillar][d - first] = total
 
-    # list of last 7 dates (strings), including today
-    seven_days = [(datetime.now() - timedelta(days=i)).strftime("%Y-%m-%d") for i in range(7)]
+    return {"dates": [day_to_date(d) for d in range(first, last + 1)], "hours": hours}
 
-    avg_result = {}
-    for pillar in TARGETS.keys():
-        total_hours = 0.0
-        for d in seven_days:
-            c.execute("SELECT SUM(hours) FROM pillar_logs WHERE date = ? AND pillar = ?", (d, pillar))
-            row = c.fetchone()
-            hours_for_day = row[0] if (row and row[0] is not None) else 0.0
-            total_hours += hours_for_day
-        # divide by 7 to get hours-per-day average
-        avg_result[pillar] = round(total_hours / 7.0, 2)
+# MULTI-RANGE REPORTS (30/90/365 days, downsampled in SQL)
+BUCKETS = ("day", "week", "month")
 
-    conn.close()
-    return avg_result
+def auto_bucket(days):
+    """Bucket that keeps a chart to a few dozen points: days up to a month, weeks up to ~6 months, then months."""
+    if days <= 31:
+        return "day"
+    return "week" if days <= 183 else "month"
 
-if __name__ == "__main__":
-    print(get_weekly_avg())
+def _month_index(day):
+    text = day_to_date(day)
+    return int(text[:4]) * 12 + int(text[5:7]) - 1
+
+@timed()
+def get_bucketed_sums(days=30, bucket="day", end=None, pillars=None, user=None):
+    """
+    Per-pillar hour totals for the last `days` days ending at `end` (default:
+    the user's today), summed into day / week / month buckets by one
+    aggregated query over the rollup's day key, so a 365-day chart gets 12
+    points, not 365 x pillars rows. Weeks are 7-day blocks counted back from
+    `end` (the newest is always complete); months are calendar months.
+    Returns dict: {"bucket", "end", "starts": [first date of each bucket],
+                   "days": [days in each bucket], "hours": {pillar: [total per bucket]}}
+    """
+    if bucket not in BUCKETS:
+        raise ValueError(f"unknown bucket {bucket!r} (use {', '.join(BUCKETS)})")
+    pillars = list(pillars or get_config(user).pillars)
+    last = _last_day(end, user)
+    first = last - days + 1
+
+    if bucket == "day":
+        starts = list(range(first, last + 1))
+        key_sql, key_params = "day - ?", (first,)
+    elif bucket == "week":
+        n = -(-days // 7)
+        starts = [max(first, last - 7 * (n - 1 - i) - 6) for i in range(n)]
+        key_sql, key_params = "? - (? - day) / 7", (n - 1, last)
+    else:
+        base = _month_index(first)
+        starts = [first] + [d for d in range(first + 1, last + 1) if day_to_date(d).endswith("-01")]
+        key_sql = ("CAST(strftime('%Y', day * 86400, 'unixepoch') AS INTEGER) * 12"
+                   " + CAST(strftime('%m', day * 86400, 'unixepoch') AS INTEGER) - 1 - ?")
+        key_params = (base,)
+    ends = starts[1:] + [last + 1]
+    hours = {p: [0.0] * len(starts) for p in pillars}
+
+    conn = _conn(user)
+    c = conn.cursor()
+    c.execute(f"""
+        SELECT {key_sql} AS bucket, pillar, SUM(total_hours)
+        FROM daily_pillar_rollup
+        WHERE day BETWEEN ? AND ?
+          AND pillar IN ({",".join("?" * len(pillars))})
+        GROUP BY bucket, pillar
+    """, (*key_params, first, last, *pillars))
+    for b, pillar, total in c.fetchall():
+        hours[pillar][b] = round(total or 0.0, 2)
+
+    return {
+        "bucket": bucket,
+        "end": day_to_date(last),
+        "starts": [day_to_date(d) for d in starts],
+        "days": [e - s for s, e in zip(starts, ends)],
+        "hours": hours,
+    }
+
+def check_range_targets(report, user=None):
+    """check_targets() for a get_bucketed_sums() report: average hours/day over its whole range."""
+    span = sum(report["days"])
+    avg_hours = {p: round(sum(h) / span, 2) for p, h in report["hours"].items()}
+    return _target_status(avg_hours, get_config(user).targets_on(report["end"]))
+
+@timed()
+def get_week_over_week(end=None, user=None):
+    """
+    This week (the 7 days ending at `end`) against the 7 days before, per pillar:
+    {pillar: {"this_week", "last_week", "delta", "pct_change"}} (pct_change None when last week was 0).
+    """
+    report = get_bucketed_sums(14, "week", end, user=user)
+    out = {}
+    for pillar, (last_week, this_week) in report["hours"].items():
+        delta = round(this_week - last_week, 2)
+        out[pillar] = {
+            "this_week": this_week,
+            "last_week": last_week,
+            "delta": delta,
+            "pct_change": round(delta / last_week * 100, 1) if last_week else None,
+        }
+    return out
+
+# ROLLING 7-DAY STATE (status checks without a DB query; see rolling_window.py)
+STATUS_WINDOW_DAYS = 7
+WINDOW_SYNC_INTERVAL = 1.0  # s between checks for pillar_logs writes made by other processes
+
+_WINDOWS = {}  # db path -> {"window": RollingWindow, "version", "generation", "next_sync", "reload_on"}
+_windows_lock = threading.Lock()
+
+@timed()
+def get_rolling_window(user=None):
+    """
+    In-memory per-day sums for `user`'s last STATUS_WINDOW_DAYS days. Rehydrated
+    from daily_pillar_rollup on first use (or when the db_changes counter shows
+    writes this process did not apply), kept current by log_hours() and rolled
+    forward at the user's day rollover. Writes from other processes show up within WINDOW_SYNC_INTERVAL.
+    Rows dated after today aren't in the window: it is rebuilt on the first such day.
+    """
+    path = db_path_for(user)
+    config = get_config(user)
+    pillars = config.pillars
+    now = time.monotonic()
+    generation = pool_generation()
+    with _windows_lock:
+        entry = _WINDOWS.get(path)
+        fresh = (entry is not None and entry["generation"] == generation and entry["window"].pillars == pillars
+                 and (entry["reload_on"] is None or config.today() < entry["reload_on"]))
+        if fresh and now < entry["next_sync"]:
+            return entry["window"]
+
+        version = get_change_counter(user)  # read before the sums: a racing write forces a reload later
+        if not fresh or entry["version"] != version:
+            if path not in _WINDOWS and len(_WINDOWS) >= MAX_CONFIGS:
+                _WINDOWS.pop(next(iter(_WINDOWS)), None)
+            today = config.today()
+            window = RollingWindow.from_window(get_window_sums(STATUS_WINDOW_DAYS, end=today, pillars=pillars, user=user),
+                                               clock=lambda: get_config(user).today())
+            reload_on = _conn(user).execute("SELECT MIN(day) FROM daily_pillar_rollup WHERE day > ?", (today,)).fetchone()[0]
+            entry = _WINDOWS[path] = {"window": window, "version": version, "generation": generation,
+                                      "reload_on": reload_on}
+        entry["next_sync"] = now + WINDOW_SYNC_INTERVAL
+        return entry["window"]
+
+def _note_log(user, day, pillar, hours):
+    """Apply a just-committed log_hours() row to the rolling window, if this process holds one."""
+    _note_logs(user, [(day, pillar, hours)])
+
+def _note_logs(user, rows):
+    """Apply (day, pillar, hours) rows committed in one transaction (see write_queue.py)."""
+    path = db_path_for(user)
+    with _windows_lock:
+        entry = _WINDOWS.get(path)
+        if entry is None:
+            return
+        # exactly our writes since the window was synced; anything else -> rehydrate
+        # (a row dated after today isn't stored: rehydrate, which schedules a rebuild on its day)
+        if entry["generation"] == pool_generation() and get_change_counter(user) == entry["version"] + len(rows):
+            stored = [entry["window"].add(day, pillar, hours) for day, pillar, hours in rows]
+            if all(stored):
+                entry["version"] += len(rows)
+                return
+        del _WINDOWS[path]
+
+def _drop_rolling_window(user):
+    with _windows_lock:
+        _WINDOWS.pop(db_path_for(user), None)
+
+@timed()
+def get_weekly_avg(window=None, user=None):
+    """
+    Calculate average hours per pillar for the last 7 calendar days.
+    Missing days are counted as 0 hours.
+    Pass a `window` from get_window_sums() to reuse an already computed result;
+    without one the in-memory rolling window is used (no DB query).
+    Returns dict: {pillar: avg_hours}
+    """
+    window = window or get_rolling_window(user).window()
+    days = len(window["dates"])
+    return {p: round(sum(h) / days, 2) for p, h in window["hours"].items()}
 
 
 # Target check function
-def check_targets():
-    """Compare weekly averages with target hours, return structured dict."""
-    avg_hours = get_weekly_avg()
+@timed()
+def check_targets(window=None, user=None):
+    """
+    Compare weekly averages with target hours, return structured dict.
+    Targets are the ones active on the window's last day, so past windows are
+    judged against the targets of their time. Without a `window` this reads
+    the in-memory rolling window: O(pillars), no DB query.
+    """
+    window = window or get_rolling_window(user).window()
+    return _target_status(get_weekly_avg(window), get_config(user).targets_on(window["dates"][-1]))
+
+def _target_status(avg_hours, targets):
+    """{pillar: {"avg", "target", "status"}} for per-pillar average hours/day against `targets`."""
     status_dict = {}
 
-    for pillar, target in TARGETS.items():
+    for pillar, target in targets.items():
         current = avg_hours.get(pillar, 0)
         if current >= target:
             status = "✅ On track"
@@ -119,27 +620,50 @@ def check_targets():
     return status_dict
 
 
-if __name__ == "__main__":
-    from pprint import pprint
-    pprint(check_targets())
-
-
-def get_weekly_totals():
+@timed()
+def get_weekly_totals(window=None, user=None):
     """
     Returns dict {pillar: total_hours_over_last_7_days}
     Missing days count as 0.
+    Pass a `window` from get_window_sums() to reuse an already computed result.
     """
-    conn = sqlite3.connect(DB_PATH)
+    window = window or get_rolling_window(user).window()
+    return {p: round(sum(h), 2) for p, h in window["hours"].items()}
+
+
+@timed()
+def get_pillar_totals(user=None):
+    """Returns dict {pillar: total_hours_all_time} from the daily rollup."""
+    conn = _conn(user)
     c = conn.cursor()
-    seven_days = [(datetime.now() - timedelta(days=i)).strftime("%Y-%m-%d") for i in range(7)]
-    totals = {}
-    for pillar in TARGETS.keys():
-        total = 0.0
-        for d in seven_days:
-            c.execute("SELECT SUM(hours) FROM pillar_logs WHERE date = ? AND pillar = ?", (d, pillar))
-            row = c.fetchone()
-            total += row[0] if (row and row[0] is not None) else 0.0
-        totals[pillar] = round(total, 2)
-    conn.close()
+    c.execute("SELECT pillar, SUM(total_hours) FROM daily_pillar_rollup GROUP BY pillar")
+    totals = {pillar: round(total, 2) for pillar, total in c.fetchall()}
     return totals
 
+
+@timed()
+def get_change_counter(user=None):
+    """Monotonic count of pillar_logs writes (any connection/process); cache key for reports."""
+    conn = _conn(user)
+    row = conn.execute("SELECT counter FROM db_changes WHERE id = 1").fetchone()
+    return row[0] if row else 0
+
+
+@timed()
+def rebuild_rollup(user=None):
+    """Repair daily_pillar_rollup by recomputing it from pillar_logs."""
+    conn = _conn(user)
+    with conn:
+        _rebuild_rollup(conn.cursor())
+    _drop_rolling_window(user)
+
+
+if __name__ == "__main__":
+    from pprint import pprint
+
+    init_db()
+    print(f"Database initialized at {DB_PATH}")
+    log_hours("Dev", 2.0)
+    print(get_all_logs())
+    print(get_weekly_avg())
+    pprint(check_targets())
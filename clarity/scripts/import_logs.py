@@ -0,0 +1,78 @@
+# clarity/scripts/import_logs.py
+"""
+Stream historical logs from CSV or JSONL into pillar_logs.
+
+CSV needs a header with date,pillar,hours; JSONL needs one {"date", "pillar", "hours"} object per line.
+An optional activity_type column / key (execution or research) feeds the perfection loop detector.
+Usage: python clarity/scripts/import_logs.py FILE [FILE ...] [--chunk-size N] [--dedupe]
+"""
+import argparse
+import csv
+import json
+import sys
+
+from goal_tracker import init_db, bulk_log_hours, BULK_CHUNK_SIZE
+
+MAX_ERRORS_SHOWN = 10
+
+def read_csv(path):
+    """Yield (date, pillar, hours[, activity_type]) tuples; columns are located by header name."""
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = [h.strip().lower() for h in next(reader, [])]
+        try:
+            cols = [header.index(name) for name in ("date", "pillar", "hours")]
+        except ValueError:
+            raise SystemExit(f"❌ {path}: CSV header must contain date,pillar,hours (got {header})")
+        if "activity_type" in header:
+            cols.append(header.index("activity_type"))
+        width = max(cols) + 1
+        for row in reader:
+            yield tuple(row[i] for i in cols) if len(row) >= width else row
+
+def read_jsonl(path):
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    yield {"raw": line}  # rejected downstream as an invalid record
+
+def read_records(path):
+    """Pick a reader from the file extension; both yield one record at a time."""
+    if path.endswith((".jsonl", ".ndjson")):
+        return read_jsonl(path)
+    return read_csv(path)
+
+def import_file(path, chunk_size=BULK_CHUNK_SIZE, dedupe=False):
+    errors = []
+
+    def on_error(rec, exc):
+        if len(errors) < MAX_ERRORS_SHOWN:
+            errors.append(f"{rec} → {exc}")
+
+    stats = bulk_log_hours(read_records(path), chunk_size=chunk_size, dedupe=dedupe, on_error=on_error)
+    print(
+        f"✅ {path}: {stats['inserted']:,} inserted, {stats['duplicates']:,} duplicates, "
+        f"{stats['rejected']:,} rejected in {stats['seconds']}s ({stats['rows_per_sec']:,} rows/sec)"
+    )
+    for e in errors:
+        print(f"   ⚠ {e}")
+    return stats
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import historical pillar logs from CSV/JSONL.")
+    parser.add_argument("files", nargs="+")
+    parser.add_argument("--chunk-size", type=int, default=BULK_CHUNK_SIZE)
+    parser.add_argument("--dedupe", action="store_true",
+                        help="skip rows identical to one already imported (re-importing an overlapping export)")
+    args = parser.parse_args(argv)
+
+    init_db()
+    for path in args.files:
+        import_file(path, chunk_size=args.chunk_size, dedupe=args.dedupe)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,257 @@
+# clarity/scripts/instrumentation.py
+"""
+In-process timing and query metrics.
+
+    @timed("goal_tracker.check_targets")      # or @timed() -> module.qualname
+    def check_targets(...): ...
+
+    with timed("page.Weekly Report"):
+        ...
+
+Every span records calls, wall time (sum / max / histogram), errors, SQL
+statements executed and SQLite VM steps (the engine's own count of work done,
+i.e. rows scanned and index probes) while it was open, including nested spans.
+Statements are counted by a sqlite3 trace callback installed on every pooled
+connection (db.OPEN_HOOKS). Read the numbers with snapshot() (JSON) or
+prometheus_text(); set CLARITY_METRICS_OUT=<file.json|file.prom> to dump them
+when a script exits. CLARITY_INSTRUMENT=0 turns the SQL callbacks off.
+"""
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import ContextDecorator
+
+import db
+
+VM_STEP_INTERVAL = 1000  # progress handler granularity (VM instructions per callback)
+ENABLED = os.environ.get("CLARITY_INSTRUMENT", "1") != "0"
+
+# =====================
+# LATENCY HISTOGRAMS
+# =====================
+LATENCY_BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram (upper bounds in ms, last bucket +Inf). Not thread-safe on its own."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+
+    def observe(self, ms):
+        self.counts[bisect_left(self.buckets, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-quantile (None if empty or in +Inf)."""
+        if not self.count:
+            return None
+        rank, seen = q * self.count, 0
+        for bound, n in zip(self.buckets, self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return None
+
+    def snapshot(self):
+        labels = [f"le_{b:g}" for b in self.buckets] + ["le_inf"]
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else None,
+            "p50_ms": self.quantile(0.50),
+            "p95_ms": self.quantile(0.95),
+            "p99_ms": self.quantile(0.99),
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+# =====================
+# SPANS
+# =====================
+_lock = threading.Lock()
+_local = threading.local()
+_spans = {}          # name -> stats dict
+_totals = {"statements": 0, "vm_steps": 0}
+_collectors = {}     # name -> zero-arg callable returning {metric: number}
+
+def _stack():
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+class _Frame:
+    __slots__ = ("name", "t0", "statements", "vm_steps")
+
+    def __init__(self, name):
+        self.name = name
+        self.t0 = time.perf_counter()
+        self.statements = 0
+        self.vm_steps = 0
+
+class timed(ContextDecorator):
+    """Context manager / decorator recording one span. timed() on a function names it module.qualname."""
+
+    def __init__(self, name=None):
+        self.name = name
+
+    def __call__(self, fn):
+        if self.name is None:
+            self.name = f"{fn.__module__}.{fn.__qualname__}"
+        return super().__call__(fn)
+
+    def __enter__(self):
+        _stack().append(_Frame(self.name or "anonymous"))
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        stack = _stack()
+        frame = stack.pop()
+        ms = (time.perf_counter() - frame.t0) * 1000
+        if stack:  # inclusive counts: the parent also saw what its children ran
+            stack[-1].statements += frame.statements
+            stack[-1].vm_steps += frame.vm_steps
+        with _lock:
+            s = _spans.get(frame.name)
+            if s is None:
+                s = _spans[frame.name] = {"calls": 0, "errors": 0, "wall_ms": 0.0, "max_ms": 0.0,
+                                          "statements": 0, "vm_steps": 0, "histogram": LatencyHistogram()}
+            s["calls"] += 1
+            s["errors"] += exc_type is not None and exc_type.__name__ not in _CONTROL_FLOW
+            s["wall_ms"] += ms
+            s["max_ms"] = max(s["max_ms"], ms)
+            s["statements"] += frame.statements
+            s["vm_steps"] += frame.vm_steps
+            s["histogram"].observe(ms)
+        return False
+
+# Streamlit's st.rerun()/st.stop() unwind the page with exceptions; they are not failures.
+# Matched by name so importing this module never pulls in streamlit.
+_CONTROL_FLOW = frozenset({"GeneratorExit", "RerunException", "StopException"})
+
+# =====================
+# SQLITE HOOKS
+# =====================
+def _on_statement(sql):
+    stack = getattr(_local, "stack", None)
+    if stack:
+        stack[-1].statements += 1
+    _totals["statements"] += 1  # approximate under contention; exact per span
+
+def _on_progress():
+    stack = getattr(_local, "stack", None)
+    if stack:
+        stack[-1].vm_steps += VM_STEP_INTERVAL
+    _totals["vm_steps"] += VM_STEP_INTERVAL
+    return 0  # never abort the query
+
+def install(conn):
+    """Count statements and VM steps on `conn` (runs for every pooled connection)."""
+    conn.set_trace_callback(_on_statement)
+    conn.set_progress_handler(_on_progress, VM_STEP_INTERVAL)
+
+if ENABLED:
+    db.OPEN_HOOKS.append(install)
+
+# =====================
+# EXPORT
+# =====================
+def register_collector(name, fn):
+    """Include fn()'s numeric values (e.g. cache hit counters) in every snapshot."""
+    _collectors[name] = fn
+
+def reset():
+    with _lock:
+        _spans.clear()
+        _totals.update(statements=0, vm_steps=0)
+
+def snapshot():
+    """JSON-ready view of every span, the SQL totals and registered collectors."""
+    with _lock:
+        spans = {
+            name: {
+                "calls": s["calls"],
+                "errors": s["errors"],
+                "wall_ms": round(s["wall_ms"], 3),
+                "mean_ms": round(s["wall_ms"] / s["calls"], 3),
+                "max_ms": round(s["max_ms"], 3),
+                "p95_ms": s["histogram"].quantile(0.95),
+                "statements": s["statements"],
+                "vm_steps": s["vm_steps"],
+            }
+            for name, s in sorted(_spans.items())
+        }
+        totals = dict(_totals)
+    return {
+        "enabled": ENABLED,
+        "spans": spans,
+        "sqlite": totals,
+        "collectors": {name: fn() for name, fn in _collectors.items()},
+    }
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def prometheus_text(prefix="clarity"):
+    """Prometheus text exposition format (version 0.0.4) of the current metrics."""
+    lines = []
+
+    def family(name, kind, help_text):
+        lines.append(f"# HELP {prefix}_{name} {help_text}")
+        lines.append(f"# TYPE {prefix}_{name} {kind}")
+
+    with _lock:
+        spans = {name: dict(s, histogram=s["histogram"].snapshot()) for name, s in sorted(_spans.items())}
+        totals = dict(_totals)
+
+    for key, kind, help_text, scale in (
+        ("calls", "counter", "Completed spans.", 1),
+        ("errors", "counter", "Spans that raised.", 1),
+        ("wall_ms", "counter", "Wall time spent in the span, seconds.", 0.001),
+        ("statements", "counter", "SQL statements executed inside the span.", 1),
+        ("vm_steps", "counter", "SQLite VM steps inside the span (approx. rows scanned).", 1),
+    ):
+        metric = "span_seconds_total" if key == "wall_ms" else f"span_{key}_total"
+        family(metric, kind, help_text)
+        for name, s in spans.items():
+            lines.append(f'{prefix}_{metric}{{span="{_label(name)}"}} {s[key] * scale:g}')
+
+    family("span_duration_ms", "histogram", "Span duration in milliseconds.")
+    for name, s in spans.items():
+        h, cumulative = s["histogram"], 0
+        for bucket, n in h["buckets"].items():
+            cumulative += n
+            le = "+Inf" if bucket == "le_inf" else bucket[3:]
+            lines.append(f'{prefix}_span_duration_ms_bucket{{span="{_label(name)}",le="{le}"}} {cumulative}')
+        lines.append(f'{prefix}_span_duration_ms_sum{{span="{_label(name)}"}} {s["wall_ms"]:g}')
+        lines.append(f'{prefix}_span_duration_ms_count{{span="{_label(name)}"}} {h["count"]}')
+
+    family("sqlite_statements_total", "counter", "SQL statements executed on pooled connections.")
+    lines.append(f"{prefix}_sqlite_statements_total {totals['statements']}")
+    family("sqlite_vm_steps_total", "counter", "SQLite VM steps on pooled connections.")
+    lines.append(f"{prefix}_sqlite_vm_steps_total {totals['vm_steps']}")
+
+    for collector, fn in _collectors.items():
+        for key, value in fn().items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            family(f"{collector}_{key}", "gauge", f"{collector} {key}.")
+            lines.append(f"{prefix}_{collector}_{key} {value:g}")
+    return "\n".join(lines) + "\n"
+
+def dump(path):
+    """Write snapshot() as JSON, or Prometheus text if `path` ends in .prom/.txt."""
+    with open(path, "w") as f:
+        if path.endswith((".prom", ".txt")):
+            f.write(prometheus_text())
+        else:
+            json.dump(snapshot(), f, indent=2)
+
+if os.environ.get("CLARITY_METRICS_OUT"):
+    atexit.register(functools.partial(dump, os.environ["CLARITY_METRICS_OUT"]))
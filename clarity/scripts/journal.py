@@ -0,0 +1,375 @@
+# clarity/scripts/journal.py
+"""
+Journal Analyzer: daily journal entries, mood trend and recurring themes.
+
+    python clarity/scripts/journal.py add "Shipped the parser, felt great"
+    python clarity/scripts/journal.py search parser
+    python clarity/scripts/journal.py themes --weeks 8
+
+Entries live next to pillar_logs in the user's DB (journal_entries, see
+db_migrations._v10_journal). Text is indexed in an FTS5 table kept in step by
+triggers, so keyword search is an index lookup however long the journal gets.
+
+Analysis is incremental and cached: analyze_pending() only runs entries whose
+content hash (date + text) or analyzer differs from the stored result, in
+batches of BATCH_SIZE texts, and writes each entry's mood and themes to
+journal_analysis / journal_themes. Theme and mood queries then read those
+tables by day range and never touch the NLP code.
+
+NLP backends are optional and loaded once per process (get_analyzer()):
+  * spaCy (en_core_web_sm) for themes: noun / proper-noun lemmas
+  * NLTK VADER for mood (needs the vader_lexicon data)
+  * otherwise a built-in tokenizer, stopword list and mood lexicon
+Set CLARITY_NLP=builtin|nltk|spacy to pin one; the default picks the best available.
+"""
+import argparse
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import Counter
+
+import goal_tracker
+from goal_tracker import get_config, _normalize_date
+from day_keys import day_to_date, to_day
+from instrumentation import timed
+
+BATCH_SIZE = 64
+THEMES_PER_ENTRY = 5
+ANALYZER_VERSION = 1  # bump when analysis output changes: every entry is re-analyzed once
+SPACY_MODEL = "en_core_web_sm"
+
+# =====================
+# BUILT-IN TEXT PROCESSING
+# =====================
+WORD_RE = re.compile(r"[a-z][a-z'-]*[a-z]|[a-z]")
+
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being below
+between both but by can could did do does doing done down during each even few for from further get got
+had has have having he her here hers herself him himself his how i if in into is it its itself just
+like me more most much my myself no nor not now of off on once only or other our ours ourselves out over
+own really same she should so some still such than that the their theirs them themselves then there these
+they thing things this those through to today too under until up very was we were what when where which
+while who whom why will with would yesterday you your yours yourself yourselves day days time lot bit
+""".split())
+
+POSITIVE = frozenset("""
+good great happy productive focused calm proud progress shipped solved finished done win won enjoyed fun
+excited confident clear grateful motivated energized learned improved better best love loved nice
+satisfied relaxed rested strong smooth breakthrough accomplished success successful easy
+""".split())
+
+NEGATIVE = frozenset("""
+bad sad tired stuck stressed anxious overwhelmed lazy distracted procrastinated procrastinating wasted
+frustrated frustrating angry bored confused lost behind failed fail failing worse worst hard difficult
+exhausted worried guilty burnout burned messy slow sick doubt doubting unproductive scattered
+""".split())
+
+NEGATIONS = frozenset(("not", "no", "never", "didn't", "don't", "wasn't", "isn't", "couldn't", "can't", "won't"))
+
+def _tokens(text):
+    return WORD_RE.findall(text.lower())
+
+def _normalize_word(word):
+    """Fold simple plurals so "bugs" and "bug" count as one theme."""
+    if len(word) > 4 and word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        return word[:-1]
+    return word
+
+def _lexicon_mood(words):
+    """-1 (negative) .. 1 (positive); a negation flips the next sentiment word."""
+    pos = neg = 0
+    flip = False
+    for word in words:
+        if word in NEGATIONS:
+            flip = True
+            continue
+        if word in POSITIVE or word in NEGATIVE:
+            positive = (word in POSITIVE) != flip
+            pos, neg = (pos + 1, neg) if positive else (pos, neg + 1)
+            flip = False
+    return round((pos - neg) / (pos + neg), 3) if pos + neg else 0.0
+
+def _top_themes(words):
+    """{theme: share of the entry's content words} for the THEMES_PER_ENTRY most frequent ones."""
+    counts = Counter(w for w in words if len(w) > 2 and w not in STOPWORDS
+                     and w not in POSITIVE and w not in NEGATIVE)
+    total = sum(counts.values())
+    return {w: round(n / total, 3) for w, n in counts.most_common(THEMES_PER_ENTRY)}
+
+# =====================
+# ANALYZERS
+# =====================
+class BuiltinAnalyzer:
+    """No dependencies: regex tokens, stopword-filtered word counts, lexicon mood."""
+    name = "builtin"
+
+    def analyze(self, texts):
+        out = []
+        for text in texts:
+            words = [_normalize_word(w) for w in _tokens(text)]
+            out.append((_lexicon_mood(words), _top_themes(words)))
+        return out
+
+class NltkAnalyzer(BuiltinAnalyzer):
+    """VADER compound score for mood; themes as in BuiltinAnalyzer."""
+    name = "nltk-vader"
+
+    def __init__(self):
+        from nltk.sentiment import SentimentIntensityAnalyzer
+        self._vader = SentimentIntensityAnalyzer()  # LookupError without the vader_lexicon data
+
+    def analyze(self, texts):
+        return [(round(self._vader.polarity_scores(text)["compound"], 3), themes)
+                for text, (_, themes) in zip(texts, super().analyze(texts))]
+
+class SpacyAnalyzer:
+    """spaCy noun/proper-noun lemmas for themes, one nlp.pipe() per batch; mood from `mood` (VADER or lexicon)."""
+
+    def __init__(self, mood=None):
+        import spacy
+        self._nlp = spacy.load(SPACY_MODEL, disable=["ner", "parser"])  # OSError if the model isn't installed
+        self._mood = mood
+        self.name = f"spacy+{mood.name}" if mood else "spacy"
+
+    def analyze(self, texts):
+        out = []
+        moods = self._mood.analyze(texts) if self._mood else None
+        for i, doc in enumerate(self._nlp.pipe(texts, batch_size=BATCH_SIZE)):
+            lemmas = [t.lemma_.lower() for t in doc if t.pos_ in ("NOUN", "PROPN") and not t.is_stop and t.is_alpha]
+            mood = moods[i][0] if moods else _lexicon_mood(_tokens(doc.text))
+            out.append((mood, _top_themes(lemmas)))
+        return out
+
+_analyzer = None
+_analyzer_lock = threading.Lock()
+
+def _build_analyzer(choice):
+    if choice == "builtin":
+        return BuiltinAnalyzer()
+    mood = None
+    if choice in ("auto", "nltk", "spacy"):
+        try:
+            mood = NltkAnalyzer()
+        except (ImportError, LookupError):
+            if choice == "nltk":
+                raise
+    if choice in ("auto", "spacy"):
+        try:
+            return SpacyAnalyzer(mood)
+        except (ImportError, OSError):
+            if choice == "spacy":
+                raise
+    return mood or BuiltinAnalyzer()
+
+def get_analyzer():
+    """The process-wide analyzer (models load on first call only)."""
+    global _analyzer
+    with _analyzer_lock:
+        if _analyzer is None:
+            _analyzer = _build_analyzer(os.environ.get("CLARITY_NLP", "auto"))
+        return _analyzer
+
+def _analyzer_key(analyzer):
+    return f"{analyzer.name}/{ANALYZER_VERSION}"
+
+# =====================
+# ENTRIES
+# =====================
+def _hash(date, text):
+    return hashlib.sha1(f"{date}\n{text}".encode()).hexdigest()
+
+def _clean(text):
+    text = (text or "").strip()
+    if not text:
+        raise ValueError("journal entry is empty")
+    return text
+
+@timed()
+def add_entry(text, date=None, user=None):
+    """Store a journal entry for `date` (default: the user's today); returns its id."""
+    text = _clean(text)
+    date = _normalize_date(date) if date is not None else day_to_date(get_config(user).today())
+    conn = goal_tracker._conn(user)
+    with conn:
+        cur = conn.execute(
+            "INSERT INTO journal_entries (date, text, content_hash, updated_at) VALUES (?, ?, ?, ?)",
+            (date, text, _hash(date, text), int(time.time())),
+        )
+    return cur.lastrowid
+
+@timed()
+def update_entry(entry_id, text=None, date=None, user=None):
+    """Change an entry's text and/or date; its analysis is redone on the next analyze_pending()."""
+    conn = goal_tracker._conn(user)
+    row = conn.execute("SELECT date, text FROM journal_entries WHERE id = ?", (entry_id,)).fetchone()
+    if row is None:
+        raise KeyError(f"no journal entry {entry_id}")
+    date = _normalize_date(date) if date is not None else row[0]
+    text = _clean(text) if text is not None else row[1]
+    with conn:
+        conn.execute(
+            "UPDATE journal_entries SET date = ?, text = ?, content_hash = ?, updated_at = ? WHERE id = ?",
+            (date, text, _hash(date, text), int(time.time()), entry_id),
+        )
+
+@timed()
+def delete_entry(entry_id, user=None):
+    conn = goal_tracker._conn(user)
+    with conn:
+        conn.execute("DELETE FROM journal_entries WHERE id = ?", (entry_id,))
+
+@timed()
+def get_entries(limit=20, user=None):
+    """Newest entries with their cached analysis (mood None until analyzed)."""
+    rows = goal_tracker._conn(user).execute("""
+        SELECT e.id, e.date, e.text, a.mood
+        FROM journal_entries e
+        LEFT JOIN journal_analysis a ON a.entry_id = e.id AND a.content_hash = e.content_hash
+        ORDER BY e.day DESC, e.id DESC
+        LIMIT ?
+    """, (limit,)).fetchall()
+    return [{"id": i, "date": d, "text": t, "mood": m} for i, d, t, m in rows]
+
+# =====================
+# INCREMENTAL ANALYSIS
+# =====================
+@timed()
+def analyze_pending(user=None, batch_size=BATCH_SIZE):
+    """
+    Analyze entries that are new, edited or were analyzed by another analyzer,
+    batch by batch. Returns {"analyzed", "analyzer", "seconds"}; a no-op costs one query.
+    """
+    t0 = time.perf_counter()
+    conn = goal_tracker._conn(user)
+    analyzer = get_analyzer()
+    key = _analyzer_key(analyzer)
+    pending = conn.execute("""
+        SELECT e.id, e.day, e.text, e.content_hash
+        FROM journal_entries e
+        LEFT JOIN journal_analysis a ON a.entry_id = e.id
+        WHERE a.entry_id IS NULL OR a.content_hash != e.content_hash OR a.analyzer != ?
+        ORDER BY e.id
+    """, (key,)).fetchall()
+
+    for start in range(0, len(pending), batch_size):
+        batch = pending[start:start + batch_size]
+        results = analyzer.analyze([text for _, _, text, _ in batch])
+        now = int(time.time())
+        with conn:
+            for (entry_id, day, _, content_hash), (mood, themes) in zip(batch, results):
+                # the hash we read is what was analyzed: an edit racing this pass is picked up by the next one
+                conn.execute("""
+                    INSERT INTO journal_analysis (entry_id, content_hash, analyzer, mood, analyzed_at)
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT (entry_id) DO UPDATE SET
+                        content_hash = excluded.content_hash, analyzer = excluded.analyzer,
+                        mood = excluded.mood, analyzed_at = excluded.analyzed_at
+                """, (entry_id, content_hash, key, mood, now))
+                conn.execute("DELETE FROM journal_themes WHERE entry_id = ?", (entry_id,))
+                conn.executemany(
+                    "INSERT INTO journal_themes (day, theme, entry_id, weight) VALUES (?, ?, ?, ?)",
+                    [(day, theme, entry_id, weight) for theme, weight in themes.items()],
+                )
+    return {"analyzed": len(pending), "analyzer": key, "seconds": round(time.perf_counter() - t0, 3)}
+
+# =====================
+# QUERIES
+# =====================
+def _has_fts(conn):
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'journal_fts'").fetchone() is not None
+
+def _match_expr(query):
+    """Keywords -> FTS5 query: every term must appear, each quoted so user input is never FTS syntax."""
+    terms = re.findall(r"\w+", query.lower())
+    return " ".join(f'"{t}"' for t in terms)
+
+@timed()
+def search(query, limit=20, user=None):
+    """Entries containing every keyword (stemmed: "shipping" finds "shipped"), best match first."""
+    expr = _match_expr(query)
+    if not expr:
+        return []
+    conn = goal_tracker._conn(user)
+    if _has_fts(conn):
+        rows = conn.execute("""
+            SELECT e.id, e.date, snippet(journal_fts, 0, '**', '**', '…', 16)
+            FROM journal_fts JOIN journal_entries e ON e.id = journal_fts.rowid
+            WHERE journal_fts MATCH ?
+            ORDER BY rank
+            LIMIT ?
+        """, (expr, limit)).fetchall()
+    else:
+        terms = expr.replace('"', "").split()
+        rows = conn.execute(f"""
+            SELECT id, date, substr(text, 1, 160) FROM journal_entries
+            WHERE {" AND ".join("text LIKE ?" for _ in terms)}
+            ORDER BY day DESC, id DESC
+            LIMIT ?
+        """, (*[f"%{t}%" for t in terms], limit)).fetchall()
+    return [{"id": i, "date": d, "snippet": s} for i, d, s in rows]
+
+def _last_day(end, user):
+    return to_day(end) if end is not None else get_config(user).today()
+
+@timed()
+def recurring_themes(weeks=4, min_weeks=2, limit=10, end=None, user=None):
+    """
+    Themes that come back across the last `weeks` weeks ending at `end`:
+    [{"theme", "weeks", "entries", "weight"}] where "weeks" counts the 7-day
+    periods the theme appeared in (at least `min_weeks`), most persistent first.
+    """
+    analyze_pending(user)
+    last = _last_day(end, user)
+    rows = goal_tracker._conn(user).execute("""
+        SELECT theme, COUNT(DISTINCT (? - day) / 7) AS weeks, COUNT(*) AS entries, ROUND(SUM(weight), 3)
+        FROM journal_themes
+        WHERE day BETWEEN ? AND ?
+        GROUP BY theme
+        HAVING weeks >= ?
+        ORDER BY weeks DESC, entries DESC, theme
+        LIMIT ?
+    """, (last, last - 7 * weeks + 1, last, min_weeks, limit)).fetchall()
+    return [{"theme": t, "weeks": w, "entries": n, "weight": s} for t, w, n, s in rows]
+
+@timed()
+def mood_trend(days=30, end=None, user=None):
+    """Average mood per day for the last `days` days: {"dates": [...], "mood": [float or None]}."""
+    analyze_pending(user)
+    last = _last_day(end, user)
+    first = last - days + 1
+    mood = [None] * days
+    for day, avg in goal_tracker._conn(user).execute("""
+        SELECT e.day, AVG(a.mood)
+        FROM journal_entries e JOIN journal_analysis a ON a.entry_id = e.id
+        WHERE e.day BETWEEN ? AND ?
+        GROUP BY e.day
+    """, (first, last)):
+        mood[day - first] = round(avg, 3)
+    return {"dates": [day_to_date(d) for d in range(first, last + 1)], "mood": mood}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Clarity journal: add entries, search them, see recurring themes.")
+    parser.add_argument("--user", help="per-user DB (default: the shared DB)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    add = sub.add_parser("add")
+    add.add_argument("text")
+    add.add_argument("--date", help="YYYY-MM-DD (default: today)")
+    sub.add_parser("search").add_argument("query")
+    themes = sub.add_parser("themes")
+    themes.add_argument("--weeks", type=int, default=4)
+    sub.add_parser("analyze")
+    args = parser.parse_args()
+
+    if args.command == "add":
+        print(f"✅ Saved journal entry {add_entry(args.text, args.date, user=args.user)}.")
+    elif args.command == "search":
+        for hit in search(args.query, user=args.user):
+            print(f"{hit['date']}  #{hit['id']}  {hit['snippet']}")
+    elif args.command == "themes":
+        for row in recurring_themes(args.weeks, user=args.user):
+            print(f"{row['theme']:<20} {row['weeks']} weeks, {row['entries']} entries")
+    else:
+        print(f"✅ {analyze_pending(args.user)}")
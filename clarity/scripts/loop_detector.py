@@ -0,0 +1,261 @@
+# clarity/scripts/loop_detector.py
+"""
+Perfection Loop Detector: too much research, not enough shipping.
+
+    python clarity/scripts/loop_detector.py            # backfill from all history, print alerts
+    get_alerts(user)                                    # [{"pillar", "message", ...}] for generate_suggestions()
+
+Every log carries an activity_type: "execution" (building, solving, writing)
+or "research" (reading, tutorials, videos). Per pillar the detector keeps
+  * exponentially weighted research and execution hours/day (ALPHA per day,
+    idle days decay both), whose ratio is the recent research share;
+  * the run of research-only days: days with research and no execution.
+    A day with any execution ends the run; days with no logs leave it as is.
+Each new log updates that state in O(1); history is only re-read when a row
+arrives for a day before one already seen (backdated imports) or an existing
+row is edited (log_edits counter), and then in one ordered streaming pass.
+
+State persists in loop_detector_state (high-water log id + edits counter), so
+a restart resumes from the last processed id instead of rescanning.
+"""
+import json
+import threading
+import time
+
+import goal_tracker
+import instrumentation
+from goal_tracker import get_config, db_path_for
+from db import pool_generation
+from day_keys import day_to_date
+from instrumentation import timed
+
+ALPHA = 0.3                  # weight of the newest day in the EWMAs (~ a week of memory)
+RESEARCH_SHARE_ALERT = 0.7   # recent research share that raises an alert
+RUN_ALERT_DAYS = 3           # research-only days in a row that raise an alert
+MIN_RECENT_HOURS = 0.25      # EWMA hours/day below this: too little activity to judge the share
+STALE_DAYS = 14              # no alerts for pillars untouched this long
+FETCH_ROWS = 50_000
+
+class OutOfOrder(Exception):
+    """A log for a day before the pillar's current day: the online state can't absorb it."""
+
+# =====================
+# ONLINE STATE
+# =====================
+class PillarStats:
+    """One pillar's streaming statistics. Rows must arrive in day order (within a day, any order)."""
+    __slots__ = ("day", "research", "execution", "ewma_research", "ewma_execution", "run", "longest_run")
+
+    def __init__(self, day=None, research=0.0, execution=0.0, ewma_research=0.0, ewma_execution=0.0,
+                 run=0, longest_run=0):
+        self.day = day                  # the open (latest) day; its hours are not folded in yet
+        self.research = research
+        self.execution = execution
+        self.ewma_research = ewma_research
+        self.ewma_execution = ewma_execution
+        self.run = run                  # research-only days in a row before the open day
+        self.longest_run = longest_run
+
+    def add(self, day, hours, activity_type):
+        if self.day is None:
+            self.day = day
+        elif day > self.day:
+            self._close(day)
+        elif day < self.day:
+            raise OutOfOrder(day)
+        if activity_type == "research":
+            self.research += hours
+        else:
+            self.execution += hours
+
+    def _folded(self, until):
+        """(ewma_research, ewma_execution, run) with the open day closed and idle days up to `until` decayed."""
+        keep = 1 - ALPHA
+        decay = keep ** max(until - self.day, 0)
+        ewma_r = (ALPHA * self.research + keep * self.ewma_research) * decay
+        ewma_e = (ALPHA * self.execution + keep * self.ewma_execution) * decay
+        if self.execution > 0:
+            run = 0
+        elif self.research > 0:
+            run = self.run + 1
+        else:
+            run = self.run
+        return ewma_r, ewma_e, run
+
+    def _close(self, next_day):
+        # the new day's own weight is applied when it closes: decay only the idle days in between
+        self.ewma_research, self.ewma_execution, self.run = self._folded(next_day - 1)
+        self.longest_run = max(self.longest_run, self.run)
+        self.day, self.research, self.execution = next_day, 0.0, 0.0
+
+    def view(self, today):
+        """Statistics as of `today` (epoch-day), counting the open day as finished."""
+        ewma_r, ewma_e, run = self._folded(today)
+        total = ewma_r + ewma_e
+        return {
+            "last_day": day_to_date(self.day),
+            "idle_days": today - self.day,
+            "research_hours": round(ewma_r, 3),
+            "execution_hours": round(ewma_e, 3),
+            "research_share": round(ewma_r / total, 3) if total > 0 else 0.0,
+            "run_days": run,
+            "longest_run": max(self.longest_run, run),
+        }
+
+    def to_list(self):
+        return [self.day, self.research, self.execution, self.ewma_research, self.ewma_execution,
+                self.run, self.longest_run]
+
+class LoopDetector:
+    """Per-pillar PillarStats plus the id of the last log consumed."""
+
+    def __init__(self, pillars=None, last_id=0, edits=0):
+        self.pillars = pillars or {}
+        self.last_id = last_id
+        self.edits = edits
+
+    def consume(self, rows):
+        """Apply (id, day, pillar, hours, activity_type) rows; raises OutOfOrder (state is then unusable)."""
+        n = 0
+        for row_id, day, pillar, hours, activity_type in rows:
+            if day is not None and pillar is not None:
+                stats = self.pillars.get(pillar)
+                if stats is None:
+                    stats = self.pillars[pillar] = PillarStats()
+                stats.add(day, hours or 0.0, activity_type)
+            self.last_id = max(self.last_id, row_id)
+            n += 1
+        return n
+
+    def alerts(self, today, config):
+        out = []
+        for pillar, stats in self.pillars.items():
+            v = stats.view(today)
+            if v["idle_days"] > STALE_DAYS:
+                continue
+            reasons = []
+            if v["run_days"] >= RUN_ALERT_DAYS:
+                reasons.append(f"{v['run_days']} research-only days in a row")
+            recent = v["research_hours"] + v["execution_hours"]
+            if recent >= MIN_RECENT_HOURS and v["research_share"] >= RESEARCH_SHARE_ALERT:
+                reasons.append(f"{int(v['research_share'] * 100)}% of recent time spent researching")
+            if not reasons:
+                continue
+            action, minutes = config.action(pillar, "low")  # the smallest shippable step
+            out.append({
+                "pillar": pillar,
+                "kind": "perfection_loop",
+                "run_days": v["run_days"],
+                "research_share": v["research_share"],
+                "action": action,
+                "minutes": minutes,
+                "message": f"🌀 Perfection loop on {pillar}: {' and '.join(reasons)}. "
+                           f"Ship something small today: {action} ({minutes}m).",
+            })
+        out.sort(key=lambda a: (-a["run_days"], -a["research_share"]))
+        return out
+
+    def to_json(self):
+        return json.dumps({p: s.to_list() for p, s in self.pillars.items()})
+
+    @classmethod
+    def from_json(cls, text, last_id, edits):
+        return cls({p: PillarStats(*v) for p, v in json.loads(text).items()}, last_id, edits)
+
+# =====================
+# SYNC WITH THE DB
+# =====================
+_DETECTORS = {}  # db path -> (pool generation, LoopDetector)
+_lock = threading.Lock()
+_stats = {"rebuilds": 0, "rebuilt_rows": 0, "consumed_rows": 0}
+
+def _edits(conn):
+    return conn.execute("SELECT counter FROM log_edits WHERE id = 1").fetchone()[0]
+
+def _save(conn, detector):
+    with conn:
+        conn.execute("""
+            INSERT INTO loop_detector_state (id, last_id, edits, state) VALUES (1, ?, ?, ?)
+            ON CONFLICT (id) DO UPDATE SET last_id = excluded.last_id, edits = excluded.edits, state = excluded.state
+        """, (detector.last_id, detector.edits, detector.to_json()))
+
+def _rebuild(conn):
+    """Every log in day order, one streaming pass (fetchmany: memory stays flat for years of history)."""
+    detector = LoopDetector(edits=_edits(conn))
+    c = conn.execute("SELECT id, day, pillar, hours, activity_type FROM pillar_logs ORDER BY date, id")
+    rows = 0
+    while True:
+        batch = c.fetchmany(FETCH_ROWS)
+        if not batch:
+            break
+        rows += detector.consume(batch)
+    _save(conn, detector)
+    _stats["rebuilds"] += 1
+    _stats["rebuilt_rows"] += rows
+    return detector, rows
+
+@timed()
+def backfill(user=None):
+    """Rebuild `user`'s detector state from all history. Returns {"rows", "pillars", "seconds"}."""
+    t0 = time.perf_counter()
+    conn = goal_tracker._conn(user)
+    with _lock:
+        detector, rows = _rebuild(conn)
+        _DETECTORS[db_path_for(user)] = (pool_generation(), detector)
+    return {"rows": rows, "pillars": len(detector.pillars), "seconds": round(time.perf_counter() - t0, 3)}
+
+@timed()
+def sync(user=None):
+    """`user`'s detector, brought up to date with logs added since it last ran."""
+    path = db_path_for(user)
+    conn = goal_tracker._conn(user)
+    with _lock:
+        cached = _DETECTORS.get(path)
+        detector = cached[1] if cached and cached[0] == pool_generation() else None
+        if detector is None:
+            row = conn.execute("SELECT last_id, edits, state FROM loop_detector_state WHERE id = 1").fetchone()
+            if row is not None:
+                detector = LoopDetector.from_json(row[2], row[0], row[1])
+        if detector is None or detector.edits != _edits(conn):
+            detector, _ = _rebuild(conn)
+        else:
+            c = conn.execute("""
+                SELECT id, day, pillar, hours, activity_type FROM pillar_logs WHERE id > ? ORDER BY id
+            """, (detector.last_id,))
+            consumed = 0
+            try:
+                while True:
+                    batch = c.fetchmany(FETCH_ROWS)
+                    if not batch:
+                        break
+                    consumed += detector.consume(batch)
+            except OutOfOrder:  # a backdated log: replay history once
+                c.close()
+                detector, _ = _rebuild(conn)
+            else:
+                if consumed:
+                    _save(conn, detector)
+                    _stats["consumed_rows"] += consumed
+        _DETECTORS[path] = (pool_generation(), detector)
+        return detector
+
+def get_alerts(user=None):
+    """Perfection loop alerts for today, strongest first (see LoopDetector.alerts)."""
+    config = get_config(user)
+    return sync(user).alerts(config.today(), config)
+
+def get_stats(user=None):
+    """{pillar: PillarStats.view(today)} for dashboards."""
+    today = get_config(user).today()
+    return {p: s.view(today) for p, s in sync(user).pillars.items()}
+
+def detector_stats():
+    with _lock:
+        return dict(_stats)
+
+instrumentation.register_collector("loop_detector", detector_stats)
+
+if __name__ == "__main__":
+    print(f"✅ Backfilled: {backfill()}")
+    for alert in get_alerts():
+        print(alert["message"])
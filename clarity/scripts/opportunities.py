@@ -0,0 +1,294 @@
+# clarity/scripts/opportunities.py
+"""
+Opportunity store: de-duplicated opportunities (internships, contests, calls
+for papers...) with their deadlines, as found by opportunity_fetcher.py.
+
+Opportunities aren't per user: they live in the default DB (tables
+opportunities and fetch_state, see db_migrations._v12_opportunities).
+
+De-duplication is by `key`: the canonical link (scheme/host lowercased, no
+fragment, no utm_* tracking parameters, no trailing slash), or the title and
+deadline for items without a link. The same opportunity listed on two pages, or
+crawled twice, is one row; a row is only rewritten when its content changed.
+
+Upcoming deadlines (upcoming()) read two indexes (db_migrations._v13_opportunity_index):
+  * opportunity_tags: (tag, deadline, opportunity_id) for every dated
+    opportunity, kept in step by upsert_opportunities(). "Due in the next N
+    days and tagged like one of my pillars" is one primary-key range scan per
+    pillar tag, each stopping after k rows, then k lookups by id;
+  * idx_opportunities_deadline for the same question without the pillar filter.
+Either way the cost depends on k and the number of tags, not on how many
+opportunities are stored. opportunity_changes counts content writes, so cached
+suggestions can tell when they're stale; seeing an unchanged item again only
+moves its last_seen (db_migrations._v14_opportunity_content_trigger).
+"""
+import hashlib
+import re
+import time
+from datetime import date, datetime, timedelta
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+import goal_tracker
+from goal_tracker import get_config
+from day_keys import day_to_date
+from instrumentation import timed
+
+# =====================
+# NORMALIZATION
+# =====================
+_TRACKING_PARAMS = re.compile(r"^(utm_\w+|ref|fbclid|gclid)$", re.I)
+_SPACES = re.compile(r"\s+")
+
+UPCOMING_DAYS = 14
+UPCOMING_K = 5
+# Tags that make an opportunity relevant to a pillar (the pillar's own name, lowercased, always counts)
+PILLAR_TAGS = {
+    "Dev": ("dev", "software", "hackathon", "open source", "internship", "web", "ml"),
+    "DSA": ("dsa", "competitive programming", "coding contest", "contest", "algorithms"),
+    "GATE": ("gate", "exam", "mtech", "psu"),
+}
+
+def clean_text(text):
+    return _SPACES.sub(" ", text or "").strip()
+
+def canonical_url(url):
+    """`url` with the parts that don't change the page removed (None for empty / non-http links)."""
+    if not url:
+        return None
+    parts = urlsplit(url.strip())
+    if parts.scheme.lower() not in ("http", "https") or not parts.netloc:
+        return None
+    query = urlencode([(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                       if not _TRACKING_PARAMS.match(k)])
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip("/") or "/", query, ""))
+
+def parse_deadline(value, today=None):
+    """ISO date (YYYY-MM-DD) from "2026-03-05", "Mar 5, 2026", "Deadline: 5 March"... or None."""
+    value = clean_text(value)
+    if not value or not re.search(r"\d", value):
+        return None
+    try:
+        return date.fromisoformat(value[:10]).isoformat()
+    except ValueError:
+        pass
+    from dateutil import parser as date_parser
+    today = today or date.today()
+    try:
+        parsed = date_parser.parse(value, fuzzy=True, default=datetime(today.year, today.month, today.day))
+    except (ValueError, OverflowError):
+        return None
+    return parsed.date().isoformat()
+
+def normalize_tags(tags):
+    """Lowercased, de-duplicated tags from a list or a comma-separated string, as a comma-separated string."""
+    if isinstance(tags, str):
+        tags = tags.split(",")
+    seen = []
+    for tag in tags or ():
+        tag = clean_text(tag).lower()
+        if tag and tag not in seen:
+            seen.append(tag)
+    return ",".join(seen)
+
+def opportunity_key(title, url=None, deadline=None):
+    link = canonical_url(url)
+    if link:
+        return link
+    return "title:" + hashlib.sha1(f"{clean_text(title).lower()}|{deadline or ''}".encode()).hexdigest()
+
+# =====================
+# STORE
+# =====================
+def _row(item, source):
+    title = clean_text(item.get("title"))
+    url = canonical_url(item.get("url"))
+    deadline = item.get("deadline")
+    tags = normalize_tags(item.get("tags"))
+    description = clean_text(item.get("description"))
+    content_hash = hashlib.sha1(f"{title}|{url}|{deadline}|{tags}|{description}".encode()).hexdigest()
+    return (opportunity_key(title, url, deadline), title, url, source, deadline, tags, description, content_hash)
+
+@timed()
+def upsert_opportunities(items, source, conn=None):
+    """
+    Insert new opportunities and update changed ones (items: dicts with title, url,
+    deadline, tags, description). Returns {"inserted", "updated", "unchanged"}.
+    Items without a title are ignored; duplicates within `items` collapse to the last one.
+    Writes go to the default DB; pass `conn` (a connection to it) to join the caller's transaction.
+    """
+    rows = {}
+    for item in items:
+        if clean_text(item.get("title")):
+            row = _row(item, source)
+            rows[row[0]] = row
+    counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+    if not rows:
+        return counts
+    conn = conn or goal_tracker._conn()
+    now = int(time.time())
+    with conn:
+        known = {}
+        keys = list(rows)
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            known.update(conn.execute(
+                f"SELECT key, content_hash FROM opportunities WHERE key IN ({','.join('?' * len(chunk))})", chunk))
+        fresh = [r for k, r in rows.items() if known.get(k) != r[-1]]
+        conn.executemany("""
+            INSERT INTO opportunities (key, title, url, source, deadline, tags, description, content_hash,
+                                       first_seen, last_seen)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (key) DO UPDATE SET
+                title = excluded.title, url = excluded.url, source = excluded.source,
+                deadline = excluded.deadline, tags = excluded.tags, description = excluded.description,
+                content_hash = excluded.content_hash, last_seen = excluded.last_seen
+        """, [r + (now, now) for r in fresh])
+        _index_tags(conn, fresh)
+        seen = [k for k, r in rows.items() if known.get(k) == r[-1]]
+        for i in range(0, len(seen), 500):
+            chunk = seen[i:i + 500]
+            conn.execute(f"UPDATE opportunities SET last_seen = ? WHERE key IN ({','.join('?' * len(chunk))})",
+                         [now] + chunk)
+    counts["updated"] = sum(1 for r in fresh if r[0] in known)
+    counts["inserted"] = len(fresh) - counts["updated"]
+    counts["unchanged"] = len(rows) - len(fresh)
+    return counts
+
+def _index_tags(conn, rows):
+    """Rewrite the opportunity_tags entries of the upserted `rows`."""
+    for i in range(0, len(rows), 500):
+        chunk = rows[i:i + 500]
+        ids = dict(conn.execute(
+            f"SELECT key, id FROM opportunities WHERE key IN ({','.join('?' * len(chunk))})", [r[0] for r in chunk]))
+        conn.execute(f"DELETE FROM opportunity_tags WHERE opportunity_id IN ({','.join('?' * len(ids))})",
+                     list(ids.values()))
+        conn.executemany("INSERT OR IGNORE INTO opportunity_tags (tag, deadline, opportunity_id) VALUES (?, ?, ?)",
+                         [(tag, r[4], ids[r[0]]) for r in chunk if r[4] for tag in r[5].split(",") if tag])
+
+def get_opportunities(limit=100):
+    """Most recently seen opportunities, as dicts."""
+    c = goal_tracker._conn().execute("""
+        SELECT id, title, url, source, deadline, tags, description, first_seen, last_seen
+        FROM opportunities ORDER BY last_seen DESC, id DESC LIMIT ?
+    """, (limit,))
+    cols = [d[0] for d in c.description]
+    return [dict(zip(cols, r)) for r in c.fetchall()]
+
+# =====================
+# FETCH STATE (HTTP validators)
+# =====================
+def get_fetch_state(urls):
+    """{url: {"etag", "last_modified", "body_hash", "bytes"}} for the urls fetched before."""
+    urls = list(urls)
+    out = {}
+    conn = goal_tracker._conn()
+    for i in range(0, len(urls), 500):
+        chunk = urls[i:i + 500]
+        for url, etag, last_modified, body_hash, size in conn.execute(f"""
+            SELECT url, etag, last_modified, body_hash, bytes FROM fetch_state
+            WHERE url IN ({','.join('?' * len(chunk))})
+        """, chunk):
+            out[url] = {"etag": etag, "last_modified": last_modified, "body_hash": body_hash, "bytes": size}
+    return out
+
+def save_fetch_state(conn, url, status, etag=None, last_modified=None, body_hash=None, size=0):
+    """Record a fetch. A 200 replaces the validators; a 304 or an error keeps those of the last good response."""
+    now = int(time.time())
+    if status == 200:
+        conn.execute("""
+            INSERT INTO fetch_state (url, etag, last_modified, body_hash, bytes, status, fetched_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (url) DO UPDATE SET
+                etag = excluded.etag, last_modified = excluded.last_modified, body_hash = excluded.body_hash,
+                bytes = excluded.bytes, status = excluded.status, fetched_at = excluded.fetched_at
+        """, (url, etag, last_modified, body_hash, size, status, now))
+    else:
+        conn.execute("""
+            INSERT INTO fetch_state (url, status, fetched_at) VALUES (?, ?, ?)
+            ON CONFLICT (url) DO UPDATE SET status = excluded.status, fetched_at = excluded.fetched_at
+        """, (url, status, now))
+
+# =====================
+# UPCOMING DEADLINES
+# =====================
+def opportunity_version():
+    """Monotonic count of opportunity writes; part of the key of cached suggestions."""
+    row = goal_tracker._conn().execute("SELECT counter FROM opportunity_changes WHERE id = 1").fetchone()
+    return row[0] if row else 0
+
+def pillar_tags(pillars):
+    """{tag: [pillars]} for a list of pillar names or a {pillar: tags} mapping."""
+    if not isinstance(pillars, dict):
+        pillars = {p: PILLAR_TAGS.get(p, ()) for p in pillars}
+    out = {}
+    for pillar, tags in pillars.items():
+        for tag in normalize_tags([pillar, *tags]).split(","):
+            if tag:
+                out.setdefault(tag, []).append(pillar)
+    return out
+
+_SQL_COLUMNS = "o.id, o.title, o.url, o.source, o.deadline, o.tags"
+
+@timed()
+def upcoming(days=UPCOMING_DAYS, k=UPCOMING_K, pillars=None, relevant_only=True, today=None, user=None):
+    """
+    Top `k` opportunities due in the next `days` days (today included), soonest
+    first, with "days_left", "pillars" (those whose tags matched) and "message".
+    `pillars` (names or {pillar: tags}) defaults to `user`'s configured pillars and
+    `today` to their current day; relevant_only=False drops the pillar filter.
+    Opportunities are shared: they're always read from the default DB.
+    """
+    if pillars is None or today is None:
+        config = get_config(user)
+        pillars = config.pillars if pillars is None else pillars
+        today = day_to_date(config.today()) if today is None else today
+    if isinstance(today, str):
+        today = date.fromisoformat(today)
+    start, end = today.isoformat(), (today + timedelta(days=days)).isoformat()
+    tag_map = pillar_tags(pillars)
+    conn = goal_tracker._conn()
+    if relevant_only:
+        if not tag_map or k <= 0:
+            return []
+        tags = sorted(tag_map)
+        # per-tag top-k by (deadline, id) holds the overall top-k: each scan stops after k index entries
+        per_tag = " UNION ALL ".join(["""
+            SELECT * FROM (SELECT tag, deadline, opportunity_id FROM opportunity_tags
+                           WHERE tag = ? AND deadline BETWEEN ? AND ? ORDER BY deadline, opportunity_id LIMIT ?)
+        """] * len(tags))
+        rows = conn.execute(f"""
+            WITH hits AS ({per_tag})
+            SELECT {_SQL_COLUMNS}, GROUP_CONCAT(h.tag)
+            FROM hits h JOIN opportunities o ON o.id = h.opportunity_id
+            GROUP BY h.opportunity_id
+            ORDER BY MIN(h.deadline), h.opportunity_id
+            LIMIT ?
+        """, [v for tag in tags for v in (tag, start, end, k)] + [k]).fetchall()
+    else:
+        rows = conn.execute(f"""
+            SELECT {_SQL_COLUMNS}, NULL FROM opportunities o
+            WHERE o.deadline BETWEEN ? AND ? ORDER BY o.deadline, o.id LIMIT ?
+        """, (start, end, k)).fetchall()
+    out = []
+    for oid, title, url, source, deadline, tags, matched in rows:
+        tag_list = tags.split(",") if tags else []
+        matched_pillars = []
+        for tag in (matched.split(",") if matched else tag_list):
+            for pillar in tag_map.get(tag, ()):
+                if pillar not in matched_pillars:
+                    matched_pillars.append(pillar)
+        days_left = (date.fromisoformat(deadline) - today).days
+        when = "today" if days_left == 0 else "tomorrow" if days_left == 1 else f"in {days_left} days"
+        out.append({
+            "id": oid,
+            "title": title,
+            "url": url,
+            "source": source,
+            "deadline": deadline,
+            "days_left": days_left,
+            "tags": tag_list,
+            "pillars": matched_pillars,
+            "message": f"📅 Due {when} ({deadline}): {title}"
+                       + (f" [{', '.join(matched_pillars)}]" if matched_pillars else ""),
+        })
+    return out
@@ -0,0 +1,267 @@
+# clarity/scripts/opportunity_fetcher.py
+"""
+Opportunity Awareness fetcher: crawl a list of listing pages, store what's on them.
+
+    python clarity/scripts/opportunity_fetcher.py                       # sources from SOURCES_PATH
+    python clarity/scripts/opportunity_fetcher.py --sources my.json --workers 8 --interval 1
+
+Sources are a JSON list; each entry is a URL or an object:
+
+    {"url": "https://example.org/internships", "name": "Example", "tags": ["internship"],
+     "item": "li.job", "title": "h3", "link": "a[href]", "deadline": ".closes", "tag": ".label"}
+
+The CSS selectors are optional (DEFAULT_SELECTORS cover pages marked up with
+.opportunity / <article> items and <time datetime> deadlines); "tags" are added
+to every item of that page.
+
+Pages are fetched by a thread pool sharing one requests.Session (keep-alive
+connections, pool sized to the workers), at most one request per host every
+`interval` seconds. Each request sends the ETag / Last-Modified validators of
+the last good response, so an unchanged page costs a bodiless 304 and is not
+parsed again; a 200 whose body hashes the same as last time isn't re-parsed
+either. Parsing uses lxml when installed, html.parser otherwise. Items are
+upserted de-duplicated (opportunities.upsert_opportunities) from the calling
+thread, one transaction per page, into the default DB like every other
+opportunity read and write.
+"""
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urljoin, urlsplit
+
+import requests
+from bs4 import BeautifulSoup
+
+import goal_tracker
+import instrumentation
+from instrumentation import timed
+from opportunities import (
+    clean_text, normalize_tags, parse_deadline, upsert_opportunities, get_fetch_state, save_fetch_state,
+)
+
+SOURCES_PATH = "clarity/data/opportunity_sources.json"
+WORKERS = 8
+HOST_INTERVAL = 1.0   # seconds between two requests to the same host
+TIMEOUT = 15
+USER_AGENT = "Clarity-MVP opportunity fetcher"
+DEFAULT_SELECTORS = {
+    "item": "[data-opportunity], .opportunity, article",
+    "title": "[data-title], .title, h1, h2, h3, a",
+    "link": "a[href]",
+    "deadline": "time[datetime], [data-deadline], .deadline",
+    "tag": "[data-tag], .tag",
+    "description": ".description, .summary, p",
+}
+
+try:
+    import lxml  # noqa: F401
+    PARSER = "lxml"
+except ImportError:
+    PARSER = "html.parser"
+
+# =====================
+# SOURCES
+# =====================
+def load_sources(path=SOURCES_PATH):
+    """Source dicts (url, name, tags + selectors) from a JSON list of URLs / objects."""
+    with open(path, encoding="utf-8") as f:
+        return [normalize_source(s) for s in json.load(f)]
+
+def normalize_source(source):
+    if isinstance(source, str):
+        source = {"url": source}
+    if not source.get("url"):
+        raise ValueError(f"source without a url: {source!r}")
+    out = dict(DEFAULT_SELECTORS)
+    out.update(source)
+    out.setdefault("name", urlsplit(source["url"]).netloc)
+    out["tags"] = normalize_tags(source.get("tags"))
+    return out
+
+# =====================
+# PARSING
+# =====================
+def _first(node, selector):
+    return node.select_one(selector) if selector else None
+
+def parse_page(html, source):
+    """Items on a listing page: [{"title", "url", "deadline", "tags", "description"}]."""
+    soup = BeautifulSoup(html, PARSER)
+    items = []
+    for node in soup.select(source["item"]):
+        title_node = _first(node, source["title"])
+        title = clean_text((title_node or node).get_text(" "))[:300]
+        if not title:
+            continue
+        link = _first(node, source["link"])
+        if link is None and node.name == "a":
+            link = node
+        deadline_node = _first(node, source["deadline"])
+        deadline = None
+        if deadline_node is not None:
+            deadline = parse_deadline(deadline_node.get("datetime") or deadline_node.get("data-deadline")
+                                      or deadline_node.get_text(" "))
+        tags = [t.get("data-tag") or t.get_text(" ") for t in node.select(source["tag"])] if source["tag"] else []
+        description_node = _first(node, source["description"])
+        items.append({
+            "title": title,
+            "url": urljoin(source["url"], link["href"]) if link is not None and link.get("href") else None,
+            "deadline": deadline,
+            "tags": normalize_tags(tags + source["tags"].split(",")),
+            "description": clean_text(description_node.get_text(" "))[:1000] if description_node else "",
+        })
+    return items
+
+# =====================
+# FETCHING
+# =====================
+class HostRateLimiter:
+    """At most one request per host every `interval` seconds; threads reserve slots in arrival order."""
+
+    def __init__(self, interval=HOST_INTERVAL):
+        self.interval = interval
+        self._next = {}
+        self._lock = threading.Lock()
+
+    def wait(self, host):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next.get(host, now))
+            self._next[host] = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+        return slot - now
+
+_totals = {"crawls": 0, "pages": 0, "not_modified": 0, "unchanged": 0, "errors": 0,
+           "bytes": 0, "bytes_saved": 0, "inserted": 0, "updated": 0}
+_totals_lock = threading.Lock()
+
+class OpportunityFetcher:
+    """Concurrent, rate-limited, cache-aware crawler. Reusable across crawls; close() when done."""
+
+    def __init__(self, workers=WORKERS, interval=HOST_INTERVAL, timeout=TIMEOUT):
+        self.workers = workers
+        self.timeout = timeout
+        self.limiter = HostRateLimiter(interval)
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers["User-Agent"] = USER_AGENT
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _fetch(self, source, state):
+        """Runs on a worker: one conditional GET, parsed if the page changed."""
+        url = source["url"]
+        headers = {}
+        if state and state["etag"]:
+            headers["If-None-Match"] = state["etag"]
+        if state and state["last_modified"]:
+            headers["If-Modified-Since"] = state["last_modified"]
+        self.limiter.wait(urlsplit(url).netloc)
+        result = {"source": source, "status": None, "items": None, "bytes": 0, "error": None}
+        try:
+            resp = self.session.get(url, headers=headers, timeout=self.timeout)
+        except requests.RequestException as e:
+            result["error"] = str(e)
+            return result
+        result["status"] = resp.status_code
+        if resp.status_code == 304:
+            result["bytes_saved"] = state["bytes"] if state else 0
+            return result
+        if resp.status_code != 200:
+            result["error"] = f"HTTP {resp.status_code}"
+            return result
+        body = resp.content
+        body_hash = hashlib.sha1(body).hexdigest()
+        result.update(bytes=len(body), body_hash=body_hash,
+                      etag=resp.headers.get("ETag"), last_modified=resp.headers.get("Last-Modified"))
+        if state and state["body_hash"] == body_hash:
+            return result  # no validators, same body: nothing to parse
+        result["items"] = parse_page(body, source)
+        return result
+
+    @timed()
+    def crawl(self, sources):
+        """Fetch every source once. Returns crawl stats (pages, not_modified, bytes_saved, pages_per_sec...)."""
+        sources = [normalize_source(s) for s in sources]
+        states = get_fetch_state([s["url"] for s in sources])
+        stats = {"pages": 0, "not_modified": 0, "unchanged": 0, "errors": 0, "items": 0,
+                 "inserted": 0, "updated": 0, "bytes": 0, "bytes_saved": 0}
+        failures = []
+        conn = goal_tracker._conn()  # opportunities are shared: always the default DB
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="opportunity-fetch") as pool:
+            futures = [pool.submit(self._fetch, s, states.get(s["url"])) for s in sources]
+            for future in as_completed(futures):
+                r = future.result()
+                url = r["source"]["url"]
+                stats["pages"] += 1
+                if r["error"]:
+                    stats["errors"] += 1
+                    failures.append((url, r["error"]))
+                    if r["status"] is not None:
+                        with conn:
+                            save_fetch_state(conn, url, r["status"])
+                    continue
+                if r["status"] == 304:
+                    stats["not_modified"] += 1
+                    stats["bytes_saved"] += r["bytes_saved"]
+                    with conn:
+                        save_fetch_state(conn, url, 304)
+                    continue
+                stats["bytes"] += r["bytes"]
+                with conn:  # validators and items commit together
+                    save_fetch_state(conn, url, 200, r["etag"], r["last_modified"], r["body_hash"], r["bytes"])
+                    if r["items"] is None:
+                        stats["unchanged"] += 1
+                    else:
+                        stats["items"] += len(r["items"])
+                        counts = upsert_opportunities(r["items"], r["source"]["name"], conn=conn)
+                        stats["inserted"] += counts["inserted"]
+                        stats["updated"] += counts["updated"]
+        stats["seconds"] = round(time.perf_counter() - t0, 3)
+        stats["pages_per_sec"] = round(stats["pages"] / stats["seconds"], 1) if stats["seconds"] else None
+        stats["failures"] = failures
+        with _totals_lock:
+            _totals["crawls"] += 1
+            for k in _totals:
+                if k != "crawls":
+                    _totals[k] += stats[k]
+        return stats
+
+def fetcher_stats():
+    with _totals_lock:
+        return dict(_totals)
+
+instrumentation.register_collector("opportunity_fetcher", fetcher_stats)
+
+def crawl(sources=None, workers=WORKERS, interval=HOST_INTERVAL):
+    """One-off crawl of `sources` (default: load_sources())."""
+    with OpportunityFetcher(workers, interval) as fetcher:
+        return fetcher.crawl(load_sources() if sources is None else sources)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fetch opportunities from the configured sources.")
+    parser.add_argument("--sources", default=SOURCES_PATH, help="JSON list of source URLs / objects")
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    parser.add_argument("--interval", type=float, default=HOST_INTERVAL, help="seconds between requests per host")
+    args = parser.parse_args()
+    if not os.path.exists(args.sources):
+        raise SystemExit(f"❌ No sources file at {args.sources} (a JSON list of listing-page URLs).")
+    stats = crawl(load_sources(args.sources), args.workers, args.interval)
+    for url, error in stats.pop("failures"):
+        print(f"⚠️ {url}: {error}")
+    print(f"✅ Crawled: {stats}")
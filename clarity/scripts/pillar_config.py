@@ -0,0 +1,208 @@
+# clarity/scripts/pillar_config.py
+from bisect import bisect_right
+from typing import Dict, Tuple
+
+from day_keys import day_to_date, epoch_day, get_zone, next_rollover
+
+# =====================
+# PILLAR CONFIGURATION
+# =====================
+# Pillars, daily targets, suggested actions and priority thresholds live in the
+# DB (pillar_targets / pillar_actions / priority_thresholds, see db_migrations.py).
+# The defaults below only seed new databases. load_config() reads the tables
+# once and compiles them into a PillarConfig: an immutable object with the
+# lookups suggestion code needs already worked out (per-priority action table,
+# threshold bisect array, per-pillar target history), shared by every module.
+
+DEFAULT_TARGETS = {"Dev": 1.5, "DSA": 1, "GATE": 1}  # hours/day
+
+DEFAULT_ACTIONS = {
+    "Dev": [
+        ("Build a tiny feature", 60),
+        ("Fix one open bug or write one unit test", 45),
+        ("Write README + docs for current project", 30),
+        ("Push one meaningful commit & open a PR", 20),
+    ],
+    "DSA": [
+        ("Solve 1 medium problem (patterns: graphs/trees/greedy)", 60),
+        ("Do 2 easy practice problems on a platform (time-box)", 45),
+        ("Review one solved problem; write a short note in Obsidian", 30),
+        ("Practice 20 min of speed problems (arrays/strings)", 20),
+    ],
+    "GATE": [
+        ("Revise yesterday's topic + solve 5 MCQs", 60),
+        ("Do 1 full previous year question on that topic", 45),
+        ("Summarize formulae + create 1 flashcard set", 30),
+        ("Quick concept check (15 min)", 15),
+    ],
+}
+
+# Priority thresholds (fraction below target)
+DEFAULT_THRESHOLDS = {
+    "high": 0.30,   # >=30% below target => HIGH priority
+    "medium": 0.15, # >=15% below target => MEDIUM
+    "low": 0.0      # <15% below => LOW
+}
+
+PRIORITIES = ("high", "medium", "low")  # index = priority code used by the batch API
+DEFAULT_ACTION = ("Do one focused session for this pillar (30 min).", 30)
+
+# effective_from of the seeded targets: they apply to all history
+TARGETS_EPOCH = "1970-01-01"
+
+def choose_action(actions, priority: str) -> Tuple[str, int]:
+    """Action for a priority from a pillar's ranked action list (first = most ambitious)."""
+    if not actions:
+        return DEFAULT_ACTION
+    if priority == "high":
+        return actions[0]
+    elif priority == "medium":
+        return actions[1] if len(actions) > 1 else actions[0]
+    else:
+        return min(actions, key=lambda x: x[1])  # shortest action
+
+def _day(day):
+    if isinstance(day, int):
+        return day_to_date(day)
+    return day if isinstance(day, str) else day.strftime("%Y-%m-%d")
+
+class PillarConfig:
+    """
+    Compiled, read-only pillar configuration. Build it directly from dicts or with
+    load_config(conn); every lookup afterwards is a dict hit or a bisect.
+    """
+    __slots__ = ("pillars", "version", "actions", "timezone", "rollover_hour",
+                 "_history", "_action_codes", "_bounds", "_thresholds", "_zone")
+
+    def __init__(self, targets, actions=None, thresholds=None, version=0, timezone=None, rollover_hour=0):
+        """
+        targets: {pillar: {effective_from "YYYY-MM-DD": target}} or {pillar: target}
+                 (a plain number applies from TARGETS_EPOCH); dict order = pillar order
+        actions: {pillar: [(text, minutes), ...]} ranked most ambitious first
+        thresholds: {"high": fraction, "medium": fraction}
+        timezone: IANA name the user's days are counted in (None = server local time)
+        rollover_hour: local hour at which a new day starts (0-23)
+        """
+        actions = DEFAULT_ACTIONS if actions is None else actions
+        thresholds = DEFAULT_THRESHOLDS if thresholds is None else thresholds
+        if thresholds["high"] < thresholds["medium"]:
+            raise ValueError(f"high threshold {thresholds['high']} is below medium {thresholds['medium']}")
+
+        history = {}
+        for pillar, versions in targets.items():
+            if not isinstance(versions, dict):
+                versions = {TARGETS_EPOCH: versions}
+            days = tuple(sorted(versions))
+            history[pillar] = (days, tuple(float(versions[d]) for d in days))
+
+        # Flat action list (index 0 = fallback) + per-pillar code per priority
+        flat, index, codes = [DEFAULT_ACTION], {DEFAULT_ACTION: 0}, {}
+        for pillar in list(history) + [p for p in actions if p not in history]:
+            row = []
+            for priority in PRIORITIES:
+                action = tuple(choose_action(actions.get(pillar, ()), priority))
+                if action not in index:
+                    index[action] = len(flat)
+                    flat.append(action)
+                row.append(index[action])
+            codes[pillar] = tuple(row)
+
+        rollover_hour = int(rollover_hour)
+        if not 0 <= rollover_hour <= 23:
+            raise ValueError(f"rollover hour {rollover_hour} is not in 0-23")
+
+        setattr_ = object.__setattr__
+        setattr_(self, "pillars", tuple(history))
+        setattr_(self, "version", version)
+        setattr_(self, "actions", tuple(flat))
+        setattr_(self, "_history", history)
+        setattr_(self, "_action_codes", codes)
+        # ascending bounds: bisect_right(bounds, pct) = 0 low, 1 medium, 2 high
+        setattr_(self, "_bounds", (float(thresholds["medium"]), float(thresholds["high"])))
+        setattr_(self, "_thresholds", {p: float(thresholds.get(p, 0.0)) for p in PRIORITIES})
+        setattr_(self, "timezone", timezone or None)
+        setattr_(self, "rollover_hour", rollover_hour)
+        setattr_(self, "_zone", get_zone(timezone))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("PillarConfig is immutable; write the DB and reload")
+
+    def __repr__(self):
+        return f"PillarConfig(pillars={self.pillars!r}, version={self.version})"
+
+    # --- day boundaries ---
+    def day_of(self, ts=None) -> int:
+        """Epoch-day a UTC timestamp (default now) falls on for this user."""
+        return epoch_day(ts, self._zone, self.rollover_hour)
+
+    def today(self) -> int:
+        return self.day_of()
+
+    def next_rollover(self, ts=None) -> float:
+        """UTC timestamp at which this user's current day (as of `ts`, default now) ends."""
+        return next_rollover(ts, self._zone, self.rollover_hour)
+
+    # --- targets ---
+    def target_history(self, pillar) -> Tuple[Tuple[str, ...], Tuple[float, ...]]:
+        """(effective_from dates, targets), oldest first."""
+        return self._history.get(pillar, ((), ()))
+
+    def target_on(self, pillar, day=None) -> float:
+        """Target that was active on `day` (default today); 0.0 before the first one."""
+        days, values = self.target_history(pillar)
+        i = bisect_right(days, _day(self.today() if day is None else day))
+        return values[i - 1] if i else 0.0
+
+    def targets_on(self, day=None) -> Dict[str, float]:
+        """{pillar: target active on `day`} in pillar order."""
+        day = _day(self.today() if day is None else day)
+        return {p: self.target_on(p, day) for p in self.pillars}
+
+    # --- priorities ---
+    @property
+    def threshold_bounds(self) -> Tuple[float, float]:
+        """(medium, high) lower bounds, ascending, for bisect / np.searchsorted(side="right")."""
+        return self._bounds
+
+    @property
+    def thresholds(self) -> Dict[str, float]:
+        return dict(self._thresholds)
+
+    def priority_code(self, pct_deficit: float) -> int:
+        """Index into PRIORITIES (0 = high)."""
+        return 2 - bisect_right(self._bounds, pct_deficit)
+
+    def priority(self, pct_deficit: float) -> str:
+        return PRIORITIES[self.priority_code(pct_deficit)]
+
+    # --- actions ---
+    def action_codes(self, pillar) -> Tuple[int, int, int]:
+        """Index into self.actions for each priority; unknown pillars get the fallback."""
+        return self._action_codes.get(pillar, (0, 0, 0))
+
+    def action(self, pillar, priority: str) -> Tuple[str, int]:
+        return self.actions[self.action_codes(pillar)[PRIORITIES.index(priority)]]
+
+DEFAULT_CONFIG = PillarConfig(DEFAULT_TARGETS, DEFAULT_ACTIONS, DEFAULT_THRESHOLDS)
+
+def load_config(conn) -> PillarConfig:
+    """Read the config tables once and compile them. Pillars keep registration (id) order."""
+    targets = {}
+    for pillar, day, target in conn.execute("""
+        SELECT t.pillar, t.effective_from, t.target
+        FROM pillar_targets t JOIN pillars p ON p.name = t.pillar
+        ORDER BY p.id, t.effective_from
+    """):
+        targets.setdefault(pillar, {})[day] = target
+
+    actions = {}
+    for pillar, text, minutes in conn.execute("SELECT pillar, action, minutes FROM pillar_actions ORDER BY pillar, rank"):
+        actions.setdefault(pillar, []).append((text, minutes))
+
+    thresholds = dict(DEFAULT_THRESHOLDS)
+    thresholds.update(conn.execute("SELECT priority, min_pct_deficit FROM priority_thresholds"))
+
+    timezone, rollover_hour = conn.execute("SELECT timezone, rollover_hour FROM day_settings WHERE id = 1").fetchone()
+    row = conn.execute("SELECT counter FROM config_changes WHERE id = 1").fetchone()
+    return PillarConfig(targets, actions, thresholds, version=row[0] if row else 0,
+                        timezone=timezone, rollover_hour=rollover_hour)
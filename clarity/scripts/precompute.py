@@ -0,0 +1,229 @@
+# clarity/scripts/precompute.py
+"""
+Background precomputation of each user's daily status, suggestions and weekly frames.
+
+    scheduler = PrecomputeScheduler().start()   # hooks goal_tracker.LOG_LISTENERS
+    get_daily_results(user)                     # page loads: one keyed read
+
+A PrecomputeScheduler thread recomputes a user's results
+  * after their logs change, debounced: a burst of log_hours() calls (or one
+    bulk import) becomes one recompute DEBOUNCE_SECONDS after the last write,
+    and a steady stream still gets one every MAX_DELAY_SECONDS;
+  * at their day rollover (time zone + rollover hour, see day_keys), so the
+    morning's first page load already sees the new day.
+Backpressure: at most one pending job per user however many writes arrive,
+and at most MAX_PENDING users waiting; past that, notifications are dropped
+and get_daily_results() computes on its next miss instead.
+
+Results live in the user's precomputed_results table and stay valid while
+the day, the db_changes counter and the config version all match; the read
+checks all three in the same statement that fetches the payload. Suggestions
+also list upcoming opportunities, which live in the default DB: rows record the
+opportunity_changes counter they saw too, checked in the same statement for the
+default user and by one more read for named users.
+"""
+import heapq
+import json
+import threading
+import time
+
+import goal_tracker
+import instrumentation
+from day_keys import day_to_date
+from goal_tracker import (
+    get_config, get_window_sums, check_targets, get_weekly_totals, get_change_counter, db_path_for,
+    STATUS_WINDOW_DAYS,
+)
+from instrumentation import timed
+from opportunities import upcoming, opportunity_version
+
+DEBOUNCE_SECONDS = 2.0
+MAX_DELAY_SECONDS = 30.0
+MAX_PENDING = 1000
+DAILY = "daily"
+
+_stats_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "computed": 0}
+
+def _count(key):
+    with _stats_lock:
+        _stats[key] += 1
+
+# =====================
+# RESULTS
+# =====================
+@timed()
+def compute_daily(user=None):
+    """Compute and store `user`'s daily results; returns the payload."""
+    from suggestion_engine import generate_suggestions  # numpy; loaded in the worker, not at import
+    from loop_detector import get_alerts
+
+    changes = get_change_counter(user)  # read first: a write racing the compute invalidates the row
+    opportunities_seen = opportunity_version()
+    config = get_config(user)
+    day = config.today()
+    window = get_window_sums(STATUS_WINDOW_DAYS, end=day, user=user)
+    status = check_targets(window, user=user)
+    payload = {
+        "day": day_to_date(day),
+        "status": status,
+        "totals": get_weekly_totals(window),
+        "window": window,
+        "suggestions": generate_suggestions(status, config, get_alerts(user), upcoming(user=user)),
+    }
+    conn = goal_tracker._conn(user)
+    with conn:
+        conn.execute("""
+            INSERT INTO precomputed_results (kind, day, changes, config_version, opportunity_version,
+                                             computed_at, payload)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (kind) DO UPDATE SET
+                day = excluded.day, changes = excluded.changes, config_version = excluded.config_version,
+                opportunity_version = excluded.opportunity_version,
+                computed_at = excluded.computed_at, payload = excluded.payload
+        """, (DAILY, day, changes, config.version, opportunities_seen, int(time.time()), json.dumps(payload)))
+    _count("computed")
+    return payload
+
+@timed()
+def get_daily_results(user=None, compute_on_miss=True):
+    """
+    `user`'s precomputed {"day", "status", "totals", "window", "suggestions"}
+    if still current (one query; two for named users), else computed now
+    (or None with compute_on_miss=False).
+    """
+    day = get_config(user).today()
+    if db_path_for(user) == db_path_for(None):
+        row = goal_tracker._conn(user).execute("""
+            SELECT r.payload
+            FROM precomputed_results r, db_changes c, config_changes k, opportunity_changes o
+            WHERE r.kind = ? AND r.day = ? AND r.changes = c.counter AND r.config_version = k.counter
+              AND r.opportunity_version = o.counter
+        """, (DAILY, day)).fetchone()
+    else:
+        # opportunities live in the default DB: their counter is a second read
+        row = goal_tracker._conn(user).execute("""
+            SELECT r.payload
+            FROM precomputed_results r, db_changes c, config_changes k
+            WHERE r.kind = ? AND r.day = ? AND r.changes = c.counter AND r.config_version = k.counter
+              AND r.opportunity_version = ?
+        """, (DAILY, day, opportunity_version())).fetchone()
+    if row is not None:
+        _count("hits")
+        return json.loads(row[0])
+    _count("misses")
+    return compute_daily(user) if compute_on_miss else None
+
+# =====================
+# SCHEDULER
+# =====================
+class PrecomputeScheduler:
+    """One daemon thread running debounced and rollover recomputes for every user it has heard of."""
+
+    def __init__(self, debounce=DEBOUNCE_SECONDS, max_delay=MAX_DELAY_SECONDS, max_pending=MAX_PENDING):
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.max_pending = max_pending
+        self._cond = threading.Condition()
+        self._pending = {}     # user -> [first notify, due] (monotonic)
+        self._rollovers = []   # heap of (wall-clock due, user name for ties, user)
+        self._watched = set()
+        self._thread = None
+        self._stopping = False
+        self.stats = {"notified": 0, "coalesced": 0, "dropped": 0, "runs": 0, "rollovers": 0, "errors": 0}
+
+    def start(self):
+        if self._thread is None:
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="clarity-precompute", daemon=True)
+            self._thread.start()
+            goal_tracker.LOG_LISTENERS.append(self.notify)
+        return self
+
+    def stop(self, timeout=5.0):
+        if self.notify in goal_tracker.LOG_LISTENERS:
+            goal_tracker.LOG_LISTENERS.remove(self.notify)
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def notify(self, user=None):
+        """A write happened for `user`: recompute after the debounce. Returns False if dropped (queue full)."""
+        with self._cond:
+            self.stats["notified"] += 1
+            now = time.monotonic()
+            entry = self._pending.get(user)
+            if entry is not None:
+                entry[1] = min(entry[0] + self.max_delay, now + self.debounce)
+                self.stats["coalesced"] += 1
+            elif len(self._pending) >= self.max_pending:
+                self.stats["dropped"] += 1
+                return False
+            else:
+                self._pending[user] = [now, now + self.debounce]
+            self._watch(user)
+            self._cond.notify()
+        return True
+
+    def watch(self, user=None):
+        """Recompute `user`'s results at each of their day rollovers (and once now)."""
+        with self._cond:
+            if user not in self._pending and len(self._pending) < self.max_pending:
+                now = time.monotonic()
+                self._pending[user] = [now, now]
+            self._watch(user)
+            self._cond.notify()
+
+    def _watch(self, user):
+        """Caller holds the lock."""
+        if user not in self._watched:
+            self._watched.add(user)
+            heapq.heappush(self._rollovers, (get_config(user).next_rollover(), user or "", user))
+
+    def _due(self):
+        """Users to recompute now, or the seconds until the next job. Caller holds the lock."""
+        now, wall = time.monotonic(), time.time()
+        due = [u for u, (_, at) in self._pending.items() if at <= now]
+        for user in due:
+            del self._pending[user]
+        while self._rollovers and self._rollovers[0][0] <= wall:
+            _, _, user = heapq.heappop(self._rollovers)
+            self.stats["rollovers"] += 1
+            if user not in due:
+                due.append(user)
+            heapq.heappush(self._rollovers, (get_config(user).next_rollover(wall + 1), user or "", user))
+        waits = [at - now for _, at in self._pending.values()]
+        if self._rollovers:
+            waits.append(self._rollovers[0][0] - wall)
+        return due, (min(waits) if waits else None)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    if self._stopping:
+                        return
+                    due, wait = self._due()
+                    if due:
+                        break
+                    self._cond.wait(wait)
+            for user in due:
+                try:
+                    compute_daily(user)
+                    self.stats["runs"] += 1
+                except Exception:  # noqa: BLE001 - one user's broken DB must not stop everyone's precompute
+                    self.stats["errors"] += 1
+
+    def idle(self):
+        """True when no recompute is pending (tests / shutdown)."""
+        with self._cond:
+            return not self._pending
+
+def cache_stats():
+    with _stats_lock:
+        return dict(_stats)
+
+instrumentation.register_collector("precompute", cache_stats)
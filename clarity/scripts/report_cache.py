@@ -0,0 +1,99 @@
+# clarity/scripts/report_cache.py
+import functools
+import threading
+import time
+
+import goal_tracker
+import instrumentation
+
+# =====================
+# REPORT CACHE
+# =====================
+# Report data (weekly window, totals, log pages, ...) only changes when
+# pillar_logs is written, so results are cached against the DB change counter
+# (db_changes, bumped by triggers on every write path, including log_hours()).
+# A new counter value drops every entry at once; the TTL is only a safety net.
+# Cached values are shared between callers — treat them as read-only.
+# With per-user DBs every user's entries are keyed and versioned by their own
+# DB file, so one user's writes never evict another user's reports.
+
+DEFAULT_TTL = 300  # seconds
+MAX_ENTRIES = 256
+
+class ReportCache:
+    def __init__(self, ttl=DEFAULT_TTL, max_entries=MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = {}   # key -> (expires_at, value)
+        self._versions = {}  # db path -> change counter the entries were computed at
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _check_version(self, db_path, version):
+        if self._versions.get(db_path) != version:
+            if db_path in self._versions:
+                self.invalidations += 1
+            self._versions[db_path] = version
+            for key in [k for k in self._entries if k[0] == db_path]:
+                del self._entries[key]
+
+    def get_or_compute(self, key, compute, user=None):
+        """Return the cached value for `key` at `user`'s current DB version, computing it on a miss."""
+        db_path = goal_tracker.db_path_for(user)
+        version = goal_tracker.get_change_counter(user)
+        full_key = (db_path, *key)
+        now = time.monotonic()
+        with self._lock:
+            self._check_version(db_path, version)
+            entry = self._entries.get(full_key)
+            if entry is not None and entry[0] > now:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        value = compute()
+        with self._lock:
+            if self._versions.get(db_path) == version:  # don't store a result a write raced past
+                if len(self._entries) >= self.max_entries:
+                    self._entries.pop(next(iter(self._entries)))  # oldest insertion first
+                self._entries[full_key] = (now + self.ttl, value)
+        return value
+
+    def clear(self):
+        """Drop every entry and reset the hit / miss / invalidation counters."""
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+            self.hits = self.misses = self.invalidations = 0
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+                "invalidations": self.invalidations,
+                "entries": len(self._entries),
+                "versions": dict(self._versions),
+            }
+
+REPORT_CACHE = ReportCache()
+
+def cached(fn):
+    """
+    Decorator: cache fn(*args, **kwargs) in REPORT_CACHE. Arguments must be hashable.
+    A `user=` keyword selects whose DB the entry is versioned against.
+    """
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        key = (fn.__module__, fn.__qualname__, args, tuple(sorted(kwargs.items())))
+        return REPORT_CACHE.get_or_compute(key, lambda: fn(*args, **kwargs), user=kwargs.get("user"))
+    return wrapper
+
+def cache_stats():
+    return REPORT_CACHE.stats()
+
+instrumentation.register_collector("report_cache", cache_stats)
@@ -0,0 +1,94 @@
+# clarity/scripts/rolling_window.py
+import threading
+from datetime import date, datetime
+
+from day_keys import EPOCH_ORDINAL, day_to_date
+
+# =====================
+# ROLLING WINDOW STATE
+# =====================
+# The weekly status only needs per-day, per-pillar sums for the last N days.
+# RollingWindow keeps them in a ring buffer indexed by day ordinal: a log adds
+# to one bucket, a new day zeroes the buckets that fell out of the window, and
+# reading the window is O(pillars * days) with no DB access. It is rehydrated
+# from daily_pillar_rollup (see goal_tracker.get_rolling_window). Days may be
+# given as epoch-day ints (day_keys), dates/datetimes or "YYYY-MM-DD" strings.
+
+def _ordinal(day):
+    if isinstance(day, int):
+        return day + EPOCH_ORDINAL
+    if isinstance(day, str):
+        return date.fromisoformat(day[:10]).toordinal()
+    if isinstance(day, datetime):
+        return day.date().toordinal()
+    return day.toordinal()
+
+class RollingWindow:
+    """
+    Per-day hour sums for the last `days` days ending at the current end day.
+    `clock()` returns the current day (default: the server's local date); pass
+    the user's own, e.g. PillarConfig.today, so the window rolls at their midnight.
+    """
+
+    def __init__(self, pillars, days=7, end=None, clock=None):
+        self.days = days
+        self.pillars = tuple(pillars)
+        self.clock = clock or datetime.now
+        self._col = {p: i for i, p in enumerate(self.pillars)}
+        self._buckets = [[0.0] * len(self.pillars) for _ in range(days)]
+        self._end = _ordinal(self.clock() if end is None else end)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_window(cls, window, clock=None):
+        """Build from a get_window_sums() result (same day range and pillars)."""
+        rw = cls(window["hours"].keys(), days=len(window["dates"]), end=window["dates"][-1], clock=clock)
+        for j, hours in enumerate(window["hours"].values()):
+            for i, h in enumerate(hours):
+                rw._buckets[(rw._end - rw.days + 1 + i) % rw.days][j] = h
+        return rw
+
+    def _roll_to(self, ordinal):
+        """Advance the end day, zeroing buckets of days that left the window. Caller holds the lock."""
+        if ordinal <= self._end:
+            return
+        for o in range(max(self._end + 1, ordinal - self.days + 1), ordinal + 1):
+            self._buckets[o % self.days] = [0.0] * len(self.pillars)
+        self._end = ordinal
+
+    def add(self, day, pillar, hours):
+        """
+        Account one log. Days older than the window and unknown pillars are ignored.
+        Returns False for a day after clock(): it is not stored (rolling to it would
+        zero today's buckets), so the caller must rebuild the window once that day comes.
+        """
+        o = _ordinal(day)
+        j = self._col.get(pillar)
+        if o > _ordinal(self.clock()):
+            return False
+        with self._lock:
+            self._roll_to(o)
+            if j is not None and o > self._end - self.days:
+                bucket = self._buckets[o % self.days]
+                bucket[j] = bucket[j] + (hours or 0.0)
+        return True
+
+    def window(self, today=None):
+        """
+        Same shape as get_window_sums(days): {"dates": [...], "hours": {pillar: [...]}}
+        for the window ending at `today` (default clock()). The end day only moves forward.
+        """
+        with self._lock:
+            self._roll_to(_ordinal(self.clock() if today is None else today))
+            first = self._end - self.days + 1
+            rows = [self._buckets[o % self.days] for o in range(first, self._end + 1)]
+            hours = {p: [row[j] for row in rows] for j, p in enumerate(self.pillars)}
+        dates = [day_to_date(o - EPOCH_ORDINAL) for o in range(first, first + self.days)]
+        return {"dates": dates, "hours": hours}
+
+    @property
+    def end(self):
+        return date.fromordinal(self._end)
+
+    def __repr__(self):
+        return f"RollingWindow(days={self.days}, end={self.end}, pillars={self.pillars!r})"
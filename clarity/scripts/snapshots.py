@@ -0,0 +1,268 @@
+# clarity/scripts/snapshots.py
+"""
+Columnar snapshots of a user's logs, for analytics and offline analysis.
+
+    python clarity/scripts/snapshots.py                         # sync the Arrow snapshot
+    python clarity/scripts/snapshots.py --format parquet --out dataset/
+
+Layout (one directory per DB file and format):
+
+    <data>/snapshots/<db name>/arrow/
+        manifest.json                         high-water id + DB counters at the last sync
+        logs/month=2025-03/part-<first id>-<last id>.arrow
+        daily.arrow                           daily_pillar_rollup (day, pillar, total_hours, entry_count)
+
+sync() appends only rows with an id above the last exported one, as a new part
+in each month they fall in; months with more than MAX_PARTS_PER_MONTH parts are
+compacted into one. Appending is safe because pillar_logs ids only grow; when
+an existing row is updated or deleted (log_edits counter) the logs are
+rewritten, and so are they when the manifest's DB identity token
+(db_migrations._v15_db_identity) is not the DB's: the file was replaced
+(remove_db / reset_db) and its ids and counters say nothing about ours. Arrow IPC files are read memory-mapped: the analytics frames are
+built straight from the page cache instead of row-by-row SQLite tuples.
+"""
+import argparse
+import json
+import os
+import shutil
+import threading
+import time
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+import goal_tracker
+
+SNAPSHOT_VERSION = 2  # 2: logs carry activity_type
+MAX_PARTS_PER_MONTH = 16
+FETCH_ROWS = 100_000
+FORMATS = {"arrow": ".arrow", "parquet": ".parquet"}
+
+LOG_SCHEMA = pa.schema([
+    ("id", pa.int64()),
+    ("date", pa.string()),
+    ("day", pa.int32()),
+    ("pillar", pa.string()),
+    ("hours", pa.float64()),
+    ("logged_at", pa.int64()),
+    ("activity_type", pa.string()),
+])
+DAILY_SCHEMA = pa.schema([
+    ("day", pa.int32()),
+    ("pillar", pa.string()),
+    ("total_hours", pa.float64()),
+    ("entry_count", pa.int64()),
+])
+
+_locks = {}
+_locks_guard = threading.Lock()
+
+def _lock(path):
+    with _locks_guard:
+        return _locks.setdefault(path, threading.RLock())
+
+def snapshot_dir(user=None, fmt="arrow"):
+    """Where `user`'s snapshot in `fmt` lives, next to their DB file."""
+    db_path = goal_tracker.db_path_for(user)
+    name = os.path.splitext(os.path.basename(db_path))[0]
+    return os.path.join(os.path.dirname(db_path), "snapshots", name, fmt)
+
+# =====================
+# FILE I/O
+# =====================
+def _write(table, path, fmt):
+    """Write atomically: readers never see a half-written file."""
+    tmp = path + ".tmp"
+    if fmt == "parquet":
+        pq.write_table(table, tmp)
+    else:
+        with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp, path)
+
+def _read(path, fmt, columns=None):
+    if fmt == "parquet":
+        return pq.read_table(path, columns=columns, memory_map=True)
+    with pa.memory_map(path, "r") as source:
+        table = pa.ipc.open_file(source).read_all()  # zero-copy: buffers point into the mapping
+    return table.select(columns) if columns else table
+
+def _load_manifest(root):
+    try:
+        with open(os.path.join(root, "manifest.json")) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get("version") == SNAPSHOT_VERSION else None
+
+def _save_manifest(root, manifest):
+    path = os.path.join(root, "manifest.json")
+    with open(path + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+def _parts(root, fmt):
+    """{month: [(first_id, last_id, path), ...]} sorted by first id."""
+    logs, ext = os.path.join(root, "logs"), FORMATS[fmt]
+    parts = {}
+    if not os.path.isdir(logs):
+        return parts
+    for month_dir in sorted(os.listdir(logs)):
+        month = month_dir.partition("=")[2]
+        for name in os.listdir(os.path.join(logs, month_dir)):
+            if name.startswith("part-") and name.endswith(ext):
+                first, last = (int(x) for x in name[5:-len(ext)].split("-"))
+                parts.setdefault(month, []).append((first, last, os.path.join(logs, month_dir, name)))
+    for month in parts:
+        parts[month].sort()
+    return parts
+
+def _part_path(root, month, first, last, fmt):
+    month_dir = os.path.join(root, "logs", f"month={month}")
+    os.makedirs(month_dir, exist_ok=True)
+    return os.path.join(month_dir, f"part-{first:012d}-{last:012d}{FORMATS[fmt]}")
+
+# =====================
+# SYNC
+# =====================
+def _append_logs(conn, root, fmt, after_id):
+    """Write rows with id > after_id as new month parts. Returns (rows, last id, months touched)."""
+    c = conn.cursor()
+    c.execute("SELECT id, date, day, pillar, hours, logged_at, activity_type FROM pillar_logs WHERE id > ? ORDER BY id", (after_id,))
+    rows, last_id, months = 0, after_id, set()
+    while True:
+        batch = c.fetchmany(FETCH_ROWS)
+        if not batch:
+            break
+        table = pa.Table.from_arrays([pa.array(col, type=f.type) for col, f in zip(zip(*batch), LOG_SCHEMA)],
+                                     schema=LOG_SCHEMA)
+        month_of = pc.utf8_slice_codeunits(pc.fill_null(table["date"], "unknown"), 0, 7)
+        for month in pc.unique(month_of).to_pylist():
+            part = table.filter(pc.equal(month_of, month))
+            ids = part["id"]
+            _write(part, _part_path(root, month, pc.min(ids).as_py(), pc.max(ids).as_py(), fmt), fmt)
+            months.add(month)
+        rows += len(batch)
+        last_id = batch[-1][0]
+    return rows, last_id, months
+
+def _compact(root, fmt, month, parts):
+    """Merge one month's parts into a single file (id order)."""
+    table = pa.concat_tables([_read(path, fmt) for _, _, path in parts]).sort_by("id")
+    _write(table, _part_path(root, month, parts[0][0], parts[-1][1], fmt), fmt)
+    for first, last, path in parts:
+        if (first, last) != (parts[0][0], parts[-1][1]):
+            os.remove(path)
+
+def sync(user=None, fmt="arrow", out_dir=None):
+    """
+    Bring `user`'s snapshot up to date with their DB and return stats:
+    {"appended", "rebuilt", "compacted", "unchanged", "seconds"}.
+    Cheap when nothing changed (two counter reads).
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"unknown snapshot format {fmt!r} (use {', '.join(FORMATS)})")
+    root = out_dir or snapshot_dir(user, fmt)
+    t0 = time.perf_counter()
+    stats = {"appended": 0, "rebuilt": False, "compacted": 0, "unchanged": False}
+    with _lock(os.path.abspath(root)):
+        conn = goal_tracker._conn(user)
+        # counters first: anything committed after this is picked up by the next sync
+        changes = goal_tracker.get_change_counter(user)
+        edits = conn.execute("SELECT counter FROM log_edits WHERE id = 1").fetchone()[0]
+        max_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM pillar_logs").fetchone()[0]
+        db_id = conn.execute("SELECT token FROM db_identity WHERE id = 1").fetchone()[0]
+        manifest = _load_manifest(root)
+        if manifest is not None and manifest.get("db_id") != db_id:
+            manifest = None  # built from another DB file at this path
+        if manifest is not None and (manifest["changes"], manifest["edits"], manifest["last_id"]) == (changes, edits, max_id):
+            stats["unchanged"] = True
+        else:
+            # another DB, edited rows, or fewer ids than exported -> start over
+            if manifest is None or manifest["edits"] != edits or manifest["last_id"] > max_id:
+                shutil.rmtree(os.path.join(root, "logs"), ignore_errors=True)
+                manifest = {"version": SNAPSHOT_VERSION, "db_id": db_id, "last_id": 0}
+                stats["rebuilt"] = True
+            os.makedirs(root, exist_ok=True)
+
+            # parts past the high-water mark are leftovers of an interrupted sync
+            for parts in _parts(root, fmt).values():
+                for first, _, path in parts:
+                    if first > manifest["last_id"]:
+                        os.remove(path)
+
+            stats["appended"], last_id, months = _append_logs(conn, root, fmt, manifest["last_id"])
+            parts = _parts(root, fmt)
+            for month in months:
+                if len(parts[month]) > MAX_PARTS_PER_MONTH:
+                    _compact(root, fmt, month, parts[month])
+                    stats["compacted"] += 1
+
+            daily = conn.execute(
+                "SELECT day, pillar, total_hours, entry_count FROM daily_pillar_rollup ORDER BY day, pillar").fetchall()
+            columns = zip(*daily) if daily else [[]] * len(DAILY_SCHEMA)
+            _write(pa.Table.from_arrays([pa.array(col, type=f.type) for col, f in zip(columns, DAILY_SCHEMA)],
+                                        schema=DAILY_SCHEMA),
+                   os.path.join(root, "daily" + FORMATS[fmt]), fmt)
+
+            manifest.update(last_id=last_id, changes=changes, edits=edits, synced_at=int(time.time()))
+            _save_manifest(root, manifest)
+    stats["seconds"] = round(time.perf_counter() - t0, 3)
+    return stats
+
+# =====================
+# READS
+# =====================
+def read_logs(user=None, date_from=None, date_to=None, columns=None, fmt="arrow"):
+    """
+    pillar_logs as an Arrow table (synced first), grouped by month. Month
+    partitions outside [date_from, date_to] are never opened.
+    """
+    root = snapshot_dir(user, fmt)
+    low_month = None if date_from is None else str(date_from)[:7]
+    high_month = None if date_to is None else str(date_to)[:7]
+    with _lock(os.path.abspath(root)):  # no compaction can delete a part between listing and mapping it
+        sync(user, fmt)
+        tables = [
+            _read(path, fmt, columns)
+            for month, parts in sorted(_parts(root, fmt).items())
+            if month == "unknown" or not ((low_month and month < low_month) or (high_month and month > high_month))
+            for _, _, path in parts
+        ]
+    if not tables:
+        empty = LOG_SCHEMA.empty_table()
+        return empty.select(columns) if columns else empty
+    table = pa.concat_tables(tables)
+    if date_from is not None:
+        table = table.filter(pc.greater_equal(table["date"], str(date_from)[:10]))
+    if date_to is not None:
+        table = table.filter(pc.less_equal(table["date"], str(date_to)[:10]))
+    return table
+
+def read_daily(user=None, first_day=None, last_day=None, fmt="arrow"):
+    """daily_pillar_rollup as an Arrow table (synced first), optionally limited to [first_day, last_day] epoch-days."""
+    root = snapshot_dir(user, fmt)
+    with _lock(os.path.abspath(root)):
+        sync(user, fmt)
+        table = _read(os.path.join(root, "daily" + FORMATS[fmt]), fmt)
+    if first_day is not None:
+        table = table.filter(pc.greater_equal(table["day"], first_day))
+    if last_day is not None:
+        table = table.filter(pc.less_equal(table["day"], last_day))
+    return table
+
+def parquet_bytes(user=None):
+    """Every log as one in-memory Parquet file (downloads from the app)."""
+    sink = pa.BufferOutputStream()
+    pq.write_table(read_logs(user), sink)
+    return sink.getvalue().to_pybytes()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export pillar logs to month-partitioned Arrow/Parquet files.")
+    parser.add_argument("--user", help="per-user DB (default: the shared DB)")
+    parser.add_argument("--format", choices=sorted(FORMATS), default="arrow")
+    parser.add_argument("--out", help="output directory (default: next to the DB)")
+    args = parser.parse_args()
+    stats = sync(args.user, args.format, args.out)
+    print(f"✅ Snapshot {args.out or snapshot_dir(args.user, args.format)}: {stats}")
@@ -1,35 +1,14 @@
 # clarity/scripts/suggestion_engine.py
 
-from typing import Dict, Tuple
-
-# === Configuration: Actions mapped to pillars ===
-PILLAR_ACTIONS = {
-    "Dev": [
-        ("Build a tiny feature", 60),
-        ("Fix one open bug or write one unit test", 45),
-        ("Write README + docs for current project", 30),
-        ("Push one meaningful commit & open a PR", 20),
-    ],
-    "DSA": [
-        ("Solve 1 medium problem (patterns: graphs/trees/greedy)", 60),
-        ("Do 2 easy practice problems on a platform (time-box)", 45),
-        ("Review one solved problem; write a short note in Obsidian", 30),
-        ("Practice 20 min of speed problems (arrays/strings)", 20),
-    ],
-    "GATE": [
-        ("Revise yesterday's topic + solve 5 MCQs", 60),
-        ("Do 1 full previous year question on that topic", 45),
-        ("Summarize formulae + create 1 flashcard set", 30),
-        ("Quick concept check (15 min)", 15),
-    ],
-}
-
-# Priority thresholds (percentage below target)
-PRIORITY_THRESHOLDS = {
-    "high": 0.30,   # >=30% below target => HIGH priority
-    "medium": 0.15, # >=15% below target => MEDIUM
-    "low": 0.0      # <15% below => LOW
-}
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# === Configuration ===
+# Actions and priority thresholds come from the compiled PillarConfig
+# (pillar_config.py). Pass get_config(user) from goal_tracker to use a DB's
+# settings; without one the shipped defaults apply.
+from pillar_config import DEFAULT_CONFIG, PRIORITIES, PillarConfig
 
 def _compute_deficit(avg: float, target: float) -> Tuple[float, float]:
     """
@@ -42,23 +21,33 @@ def _compute_deficit(avg: float, target: float) -> Tuple[float, float]:
         pct_def = round((target - avg) / target, 3)
     return abs_def, pct_def
 
-def _pick_action(pillar: str, priority: str) -> Tuple[str, int]:
-    """
-    Pick a reasonable action for the pillar based on priority.
-    Returns (action_text, recommended_minutes).
-    """
-    actions = PILLAR_ACTIONS.get(pillar, [])
-    if not actions:
-        return ("Do one focused session for this pillar (30 min).", 30)
-
-    if priority == "high":
-        return actions[0]
-    elif priority == "medium":
-        return actions[1] if len(actions) > 1 else actions[0]
-    else:
-        return sorted(actions, key=lambda x: x[1])[0]  # shortest action
-
-def generate_suggestions(status_dict: Dict[str, Dict]) -> Dict:
+def _summary_lines(suggestions: List[Dict]) -> List[str]:
+    """Human-friendly lines for suggestions already sorted by priority."""
+    summary_lines = []
+    if suggestions:
+        top = suggestions[0]
+        summary_lines.append(
+            f"🔔 Top focus: {top['pillar']} — {int(top['pct_deficit']*100)}% below target. "
+            f"Suggested: {top['action']} ({top['minutes']} min)."
+        )
+
+    for s in suggestions:
+        if s["priority"] == "high":
+            emoji = "🔥"
+        elif s["priority"] == "medium":
+            emoji = "⚠"
+        else:
+            emoji = "✅"
+
+        line = (
+            f"{emoji} {s['pillar']}: Avg {s['avg']} / Target {s['target']} → "
+            f"{s['abs_deficit']} hrs deficit. Action: {s['action']} ({s['minutes']}m)."
+        )
+        summary_lines.append(line)
+    return summary_lines
+
+def generate_suggestions(status_dict: Dict[str, Dict], config: Optional[PillarConfig] = None,
+                         alerts: Optional[List[Dict]] = None, opportunities: Optional[List[Dict]] = None) -> Dict:
     """
     Takes status_dict from check_targets() and outputs actionable suggestions.
     Example status_dict:
@@ -67,21 +56,19 @@ def generate_suggestions(status_dict: Dict[str, Dict]) -> Dict:
         "DSA": {"avg": 0.67, "target": 1.0, "status": "..."},
         ...
       }
+    `config` supplies actions and thresholds (default: DEFAULT_CONFIG).
+    `alerts` (e.g. loop_detector.get_alerts()) are passed through and lead the summary lines.
+    `opportunities` (e.g. opportunities.upcoming()) are passed through and close them.
     """
+    config = config or DEFAULT_CONFIG
     suggestions = []
     for pillar, data in status_dict.items():
         avg = float(data.get("avg", 0.0))
         target = float(data.get("target", 0.0))
         abs_def, pct_def = _compute_deficit(avg, target)
 
-        if pct_def >= PRIORITY_THRESHOLDS["high"]:
-            priority = "high"
-        elif pct_def >= PRIORITY_THRESHOLDS["medium"]:
-            priority = "medium"
-        else:
-            priority = "low"
-
-        action_text, minutes = _pick_action(pillar, priority)
+        priority = config.priority(pct_def)
+        action_text, minutes = config.action(pillar, priority)
         suggestion = {
             "pillar": pillar,
             "avg": avg,
@@ -94,39 +81,113 @@ def generate_suggestions(status_dict: Dict[str, Dict]) -> Dict:
         }
         suggestions.append(suggestion)
 
-    priority_order = {"high": 0, "medium": 1, "low": 2}
+    priority_order = {p: i for i, p in enumerate(PRIORITIES)}
     suggestions.sort(key=lambda s: (priority_order[s["priority"]], -s["pct_deficit"]))
 
     top_focus = suggestions[0]["pillar"] if suggestions else None
 
-    summary_lines = []
-    if top_focus:
-        top = suggestions[0]
-        summary_lines.append(
-            f"🔔 Top focus: {top['pillar']} — {int(top['pct_deficit']*100)}% below target. "
-            f"Suggested: {top['action']} ({top['minutes']} min)."
-        )
-
-    for s in suggestions:
-        if s["priority"] == "high":
-            emoji = "🔥"
-        elif s["priority"] == "medium":
-            emoji = "⚠"
-        else:
-            emoji = "✅"
-
-        line = (
-            f"{emoji} {s['pillar']}: Avg {s['avg']} / Target {s['target']} → "
-            f"{s['abs_deficit']} hrs deficit. Action: {s['action']} ({s['minutes']}m)."
-        )
-        summary_lines.append(line)
+    alerts = list(alerts or [])
+    opportunities = list(opportunities or [])
+    summary_lines = [a["message"] for a in alerts] + _summary_lines(suggestions) + [o["message"] for o in opportunities]
 
     return {
         "top_focus": top_focus,
         "suggestions": suggestions,
-        "summary_lines": summary_lines
+        "summary_lines": summary_lines,
+        "alerts": alerts,
+        "opportunities": opportunities,
     }
 
+# === Batch API: many (avg, target) rows at once ===
+class SuggestionBatch:
+    """
+    Suggestions for many rows (days, users, ...) computed with array ops.
+    Arrays are shaped (n_rows, n_pillars) except where noted; text is only
+    built when a row is asked for via row() / summary_lines().
+    """
+
+    def __init__(self, pillars, avgs, targets, abs_deficit, pct_deficit, priority, order, action_index, actions):
+        self.pillars = pillars            # list of pillar names (column order)
+        self.avgs = avgs
+        self.targets = targets
+        self.abs_deficit = abs_deficit
+        self.pct_deficit = pct_deficit
+        self.priority = priority          # codes into PRIORITIES (0 = high)
+        self.order = order                # per row: pillar indices sorted like generate_suggestions()
+        self.action_index = action_index  # into self.actions, per (row, pillar)
+        self.actions = actions            # flat list of (action_text, minutes)
+
+    def __len__(self):
+        return self.avgs.shape[0]
+
+    @property
+    def top_focus_index(self):
+        """(n_rows,) index of each row's top-focus pillar."""
+        return self.order[:, 0]
+
+    def top_focus(self, i: int) -> str:
+        return self.pillars[self.order[i, 0]] if self.pillars else None
+
+    def suggestions(self, i: int) -> List[Dict]:
+        """Row i in the same structure generate_suggestions() returns."""
+        out = []
+        for j in self.order[i]:
+            action_text, minutes = self.actions[self.action_index[i, j]]
+            out.append({
+                "pillar": self.pillars[j],
+                "avg": float(self.avgs[i, j]),
+                "target": float(self.targets[i, j]),
+                "abs_deficit": float(self.abs_deficit[i, j]),
+                "pct_deficit": float(self.pct_deficit[i, j]),
+                "priority": PRIORITIES[self.priority[i, j]],
+                "action": action_text,
+                "minutes": minutes,
+            })
+        return out
+
+    def summary_lines(self, i: int) -> List[str]:
+        return _summary_lines(self.suggestions(i))
+
+    def row(self, i: int) -> Dict:
+        suggestions = self.suggestions(i)
+        return {
+            "top_focus": suggestions[0]["pillar"] if suggestions else None,
+            "suggestions": suggestions,
+            "summary_lines": _summary_lines(suggestions),
+            "alerts": [],
+            "opportunities": [],
+        }
+
+def generate_suggestions_batch(pillars: Sequence[str], avgs, targets, config: Optional[PillarConfig] = None) -> SuggestionBatch:
+    """
+    Vectorized generate_suggestions() for many rows at once.
+    avgs: array-like (n_rows, n_pillars) of average hrs/day, columns in `pillars` order.
+    targets: same shape (e.g. per-day targets), or (n_pillars,) to use one target per pillar for every row.
+    Same deficits, priorities, ordering and actions as calling generate_suggestions()
+    on each row with the same `config`.
+    """
+    config = config or DEFAULT_CONFIG
+    pillars = list(pillars)
+    avgs = np.atleast_2d(np.asarray(avgs, dtype=np.float64))
+    targets = np.broadcast_to(np.asarray(targets, dtype=np.float64), avgs.shape)
+
+    gap = targets - avgs
+    abs_def = np.round(np.maximum(0.0, np.round(gap, 2)), 2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pct_def = np.where(targets > 0, np.round(gap / np.where(targets > 0, targets, 1.0), 3), 0.0)
+
+    # same bisect as PillarConfig.priority_code(), for the whole array
+    priority = (2 - np.searchsorted(config.threshold_bounds, pct_def, side="right")).astype(np.int8)
+
+    # sort key (priority, -pct_deficit); lexsort is stable, like list.sort()
+    order = np.lexsort((-pct_def, priority), axis=-1)
+
+    # (n_pillars, 3) precompiled action codes -> one fancy-index lookup
+    table = np.array([config.action_codes(p) for p in pillars], dtype=np.intp).reshape(len(pillars), len(PRIORITIES))
+    action_index = table[np.arange(len(pillars)), priority]
+
+    return SuggestionBatch(pillars, avgs, targets, abs_def, pct_def, priority, order, action_index, list(config.actions))
+
 if __name__ == "__main__":
     # Example quick test
     example_status = {
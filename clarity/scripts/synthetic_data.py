@@ -0,0 +1,55 @@
+# clarity/scripts/synthetic_data.py
+"""
+Seeded synthetic pillar logs for benchmarks and load tests.
+
+Same arguments + seed -> same rows, so benchmark runs on different commits see identical data.
+The history ends on a fixed ANCHOR date, not today, so the rows don't shift from one day to the next.
+"""
+import random
+from datetime import date, timedelta
+
+BASE_PILLARS = ["Dev", "DSA", "GATE"]
+ANCHOR = date(2025, 6, 30)  # default last day of generated history
+
+def pillar_names(count):
+    """The real pillars first, then P4, P5, ... for larger configs."""
+    return (BASE_PILLARS + [f"P{i}" for i in range(len(BASE_PILLARS) + 1, count + 1)])[:count]
+
+def pillar_weights(count, skew):
+    """Zipf-style weights: skew=0 spreads entries evenly, higher skew favours the first pillars."""
+    return [1.0 / (i + 1) ** skew for i in range(count)]
+
+def generate_logs(years=1.0, pillars=3, entries_per_day=3.0, skew=1.0, seed=42, end=None, skip_day_prob=0.1):
+    """
+    Yield (date, pillar, hours) tuples, oldest day first.
+    years            history length
+    pillars          number of pillars (see pillar_names)
+    entries_per_day  mean log entries per active day
+    skew             pillar popularity skew (see pillar_weights)
+    skip_day_prob    chance a whole day has no entries (missed days must zero-fill)
+    end              last day (date / datetime, default ANCHOR; pass date.today() for "recent" data)
+    """
+    rng = random.Random(seed)
+    names = pillar_names(pillars)
+    weights = pillar_weights(pillars, skew)
+    days = max(1, int(round(years * 365)))
+    end = end or ANCHOR
+    start = end - timedelta(days=days - 1)
+
+    for d in range(days):
+        if rng.random() < skip_day_prob:
+            continue
+        date = (start + timedelta(days=d)).strftime("%Y-%m-%d")
+        # Poisson-ish count around the mean without numpy
+        n = max(0, int(rng.gauss(entries_per_day, entries_per_day ** 0.5) + 0.5))
+        for pillar in rng.choices(names, weights, k=n):
+            yield date, pillar, round(min(6.0, rng.lognormvariate(-0.2, 0.6)) * 4) / 4 or 0.25
+
+if __name__ == "__main__":
+    import sys
+
+    # Usage: python clarity/scripts/synthetic_data.py [years] > logs.csv   (feeds import_logs.py)
+    years = float(sys.argv[1]) if len(sys.argv) > 1 else 1.0
+    print("date,pillar,hours")
+    for row in generate_logs(years=years):
+        print(",".join(map(str, row)))
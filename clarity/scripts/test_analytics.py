@@ -0,0 +1,66 @@
+# clarity/scripts/test_analytics.py
+import os
+import random
+import tempfile
+from datetime import datetime, timedelta
+
+import goal_tracker
+from db import close_all
+from goal_tracker import init_db, bulk_log_hours, get_weekly_avg, check_targets, get_config
+from analytics import load_daily_frame, rolling_averages, streaks, weekday_distribution, progress_frame, top_focus_history
+from suggestion_engine import generate_suggestions
+
+def loop_streaks(hours, target):
+    """Reference implementation: plain Python loop over days."""
+    run = longest = 0
+    runs = []
+    for h in hours:
+        run = run + 1 if h >= target else 0
+        longest = max(longest, run)
+        runs.append(run)
+    current = runs[-1] if hours[-1] >= target or len(runs) == 1 else runs[-2]
+    return current, longest
+
+def test_vectorized_matches_loops():
+    with tempfile.TemporaryDirectory() as tmp:
+        goal_tracker.DB_PATH = os.path.join(tmp, "clarity.db")
+        init_db()
+        rng = random.Random(3)
+        today = datetime.now()
+        records = []
+        for i in range(120):
+            day = (today - timedelta(days=i)).strftime("%Y-%m-%d")
+            for pillar in get_config().pillars:
+                if rng.random() < 0.8:
+                    records.append((day, pillar, rng.choice([0.5, 1.0, 1.5, 2.0])))
+        bulk_log_hours(records, dedupe=False)
+
+        daily = load_daily_frame(120)
+        assert daily.shape == (120, len(get_config().pillars)), daily.shape
+
+        roll = rolling_averages(daily, windows=(7,))
+        last = roll[roll["date"] == roll["date"].max()].set_index("pillar")["avg_hours"]
+        assert {p: float(last[p]) for p in get_config().pillars} == get_weekly_avg()
+
+        st = streaks(daily)
+        for pillar, target in get_config().targets_on().items():
+            expected = loop_streaks(list(daily[pillar]), target)
+            assert (st.loc[pillar, "current_streak"], st.loc[pillar, "longest_streak"]) == expected, pillar
+
+        wd = weekday_distribution(daily)
+        assert len(wd) == 7 * len(get_config().pillars)
+        mondays = daily[daily.index.dayofweek == 0]["Dev"].mean()
+        assert abs(wd[(wd["weekday"] == "Mon") & (wd["pillar"] == "Dev")]["avg_hours"].iloc[0] - mondays) < 0.01
+
+        pf = progress_frame(check_targets())
+        assert list(pf["Pillar"]) == list(get_config().pillars)
+        assert (pf["PercentOfDailyTarget"] <= 150).all()
+
+        # backfilled suggestion for today == the live one
+        history = top_focus_history(daily)
+        assert history.iloc[-1] == generate_suggestions(check_targets(), get_config())["top_focus"]
+        close_all()
+    print("✅ Analytics test passed.")
+
+if __name__ == "__main__":
+    test_vectorized_matches_loops()
@@ -0,0 +1,191 @@
+# clarity/scripts/test_api_server.py
+import asyncio
+import contextlib
+import io
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+import goal_tracker
+from db import close_all
+from goal_tracker import init_db
+from api_server import ApiServer, ApiError, LatencyHistogram, _int_param
+
+async def request(host, port, method, path, payload=None):
+    """Minimal HTTP/1.1 client: returns (status, json body)."""
+    reader, writer = await asyncio.open_connection(host, port)
+    body = json.dumps(payload).encode() if payload is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: {host}\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode()
+        + body
+    )
+    await writer.drain()
+    raw = await reader.read()
+    writer.close()
+    head, _, data = raw.partition(b"\r\n\r\n")
+    if b"application/json" not in head:
+        return int(head.split()[1]), data.decode()
+    return int(head.split()[1]), json.loads(data)
+
+@contextlib.contextmanager
+def assert_logs(name):
+    """Capture records of logger `name` into a StringIO."""
+    out = io.StringIO()
+    handler = logging.StreamHandler(out)
+    logger = logging.getLogger(name)
+    logger.addHandler(handler)
+    try:
+        yield out
+    finally:
+        logger.removeHandler(handler)
+
+async def exercise_endpoints():
+    server = ApiServer(workers=4)
+    host, port = await server.start("127.0.0.1", 0)
+    try:
+        assert (await request(host, port, "POST", "/logs", {"pillar": "Dev", "hours": 2.5}))[0] == 201
+        status, out = await request(host, port, "POST", "/logs", {"pillar": "Chess", "hours": 1})
+        assert status == 400 and "unknown pillar" in out["error"], out
+        status, out = await request(host, port, "POST", "/logs", {"pillar": "Dev", "hours": 1, "at": time.time() + 86400})
+        assert status == 400 and "future" in out["error"], out
+        for bad in ({"hours": float("nan")}, {"hours": "inf"}, {"hours": "-Infinity"}, {"hours": 1, "at": float("nan")}):
+            status, out = await request(host, port, "POST", "/logs", {"pillar": "Dev", **bad})
+            assert status == 400, (bad, status, out)
+
+        today = time.strftime("%Y-%m-%d")
+        records = [{"date": today, "pillar": "DSA", "hours": 0.5 + i} for i in range(120)]
+        records.append({"date": today, "pillar": "Nope", "hours": 1})
+        records.append({"date": today, "pillar": "DSA", "hours": "nan"})
+        status, out = await request(host, port, "POST", "/logs/batch", {"records": records})
+        assert status == 200 and (out["inserted"], out["rejected"]) == (120, 2), out
+        assert out["rejected_examples"][0]["record"]["pillar"] == "Nope"
+
+        status, out = await request(host, port, "GET", "/status")
+        assert status == 200 and out["status"]["Dev"]["avg"] == round(2.5 / 7, 2), out
+
+        status, out = await request(host, port, "GET", "/suggestions?days=7")
+        assert status == 200 and out["top_focus"] == "GATE", out
+
+        # page through every log with the opaque cursor
+        seen, cursor = [], None
+        while True:
+            path = "/logs?page_size=50" + (f"&cursor={cursor}" if cursor else "")
+            status, out = await request(host, port, "GET", path)
+            assert status == 200, out
+            seen += out["logs"]
+            cursor = out["next_cursor"]
+            if cursor is None:
+                break
+        assert len(seen) == 121 and len({r["id"] for r in seen}) == 121
+
+        # per-user DBs are isolated
+        await request(host, port, "POST", "/logs?user=bot1", {"pillar": "GATE", "hours": 7})
+        _, out = await request(host, port, "GET", "/status?user=bot1")
+        assert out["status"]["GATE"]["avg"] == 1.0 and out["status"]["Dev"]["avg"] == 0.0
+        assert (await request(host, port, "GET", "/status?user=../x"))[0] == 400
+        assert (await request(host, port, "GET", "/nowhere"))[0] == 404
+        assert (await request(host, port, "DELETE", "/logs"))[0] == 405
+        assert (await request(host, port, "GET", "/logs?page_size=0"))[0] == 400
+
+        # concurrent clients all get answers
+        results = await asyncio.gather(*(request(host, port, "GET", "/status") for _ in range(50)))
+        assert all(s == 200 and r == results[0][1] for s, r in results)
+
+        status, report = await request(host, port, "GET", "/report?days=365")
+        assert status == 200 and report["report"]["bucket"] == "month" and len(report["report"]["starts"]) in (12, 13)
+        assert set(report["status"]) >= {"Dev", "DSA", "GATE"}
+        status, _ = await request(host, port, "GET", "/report?bucket=year")
+        assert status == 400
+
+        _, metrics = await request(host, port, "GET", "/metrics")
+        assert metrics["endpoints"]["GET /status"]["count"] >= 52
+        assert metrics["endpoints"]["POST /logs"]["p50_ms"] is not None
+        assert metrics["instrumentation"]["spans"]["goal_tracker.insert_log"]["statements"] >= 1
+        status, text = await request(host, port, "GET", "/metrics?format=prometheus")
+        assert status == 200 and 'clarity_api_request_duration_ms_count{endpoint="GET /status"}' in text
+        assert "clarity_span_calls_total" in text
+
+        # an unexpected error is logged server-side; the client only sees a generic 500
+        async def broken(query, body):
+            raise RuntimeError("secret table layout")
+        server.routes[("GET", "/broken")] = broken
+        with assert_logs("clarity.api") as logged:
+            status, out = await request(host, port, "GET", "/broken")
+        assert status == 500 and out == {"error": "internal server error"}, out
+        assert "secret table layout" in logged.getvalue()
+    finally:
+        await server.close()
+
+async def exercise_coalescing():
+    server = ApiServer(workers=4)
+    calls = []
+    lock = threading.Lock()
+
+    def slow_report():
+        with lock:
+            calls.append(1)
+        time.sleep(0.05)
+        return {"ok": True}
+
+    try:
+        results = await asyncio.gather(*(server.coalesce(("status", None, 7), slow_report) for _ in range(20)))
+        assert len(calls) == 1 and server.coalesced == 19
+        assert all(r is results[0] for r in results)
+        await server.coalesce(("status", None, 7), slow_report)  # finished queries are not reused
+        assert len(calls) == 2
+    finally:
+        await server.close()
+
+async def exercise_group_commit():
+    server = ApiServer(workers=4, precompute=False, group_commit=True)
+    host, port = await server.start("127.0.0.1", 0)
+    before = goal_tracker.get_weekly_totals()["GATE"]
+    try:
+        posts = [request(host, port, "POST", "/logs", {"pillar": "GATE", "hours": 0.25}) for _ in range(40)]
+        assert all(status == 201 for status, _ in await asyncio.gather(*posts))
+        # every 201 was committed: visible to the next read
+        assert goal_tracker.get_weekly_totals()["GATE"] == before + 10
+        status, out = await request(host, port, "GET", "/metrics")
+        assert out["write_queue"]["rows"] == 40 and out["write_queue"]["transactions"] <= 40, out
+        status, out = await request(host, port, "POST", "/logs", {"pillar": "GATE", "hours": -1})
+        assert status == 400, out
+    finally:
+        await server.close()
+
+def test_histogram():
+    h = LatencyHistogram()
+    for ms in [0.5] * 90 + [30] * 9 + [4000]:
+        h.observe(ms)
+    snap = h.snapshot()
+    assert (snap["p50_ms"], snap["p95_ms"], snap["p99_ms"]) == (1, 50, 50), snap
+    assert snap["count"] == 100 and snap["buckets"]["le_5000"] == 1
+
+def test_api():
+    with tempfile.TemporaryDirectory() as tmp:
+        goal_tracker.DB_PATH = os.path.join(tmp, "clarity.db")
+        init_db()
+        with contextlib.redirect_stdout(io.StringIO()) as stdout:
+            asyncio.run(exercise_endpoints())
+        assert "Logged" not in stdout.getvalue(), "the server must not print per request"
+        asyncio.run(exercise_coalescing())
+        asyncio.run(exercise_group_commit())
+        close_all()
+
+def test_int_param_messages():
+    def error(raw, **bounds):
+        try:
+            _int_param({"n": [raw]}, "n", 1, **bounds)
+        except ApiError as e:
+            return str(e)
+    assert error("0") == "n must be at least 1"
+    assert error("0", hi=10) == error("11", hi=10) == "n must be between 1 and 10"
+    assert error("x") == "n must be an integer" and error("5", hi=10) is None
+
+if __name__ == "__main__":
+    test_histogram()
+    test_int_param_messages()
+    test_api()
+    print("✅ API server test passed.")
@@ -0,0 +1,21 @@
+# clarity/scripts/test_bench_startup.py
+import os
+import tempfile
+
+from bench_startup import measure
+
+def test_light_pages_skip_heavy_imports():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "clarity.db")
+        for page in ("Home", "Log Hours"):
+            result = measure(page, db_path=db_path)
+            assert result["heavy_modules"] == [], result
+            assert result["first_paint_ms"] is not None
+
+        charts = measure("Trends", db_path=db_path)
+        assert "plotly.express" in charts["imports_ms"], charts
+        assert os.path.exists(db_path), "the app ran on the temporary DB"
+
+if __name__ == "__main__":
+    test_light_pages_skip_heavy_imports()
+    print("✅ Startup test passed.")
@@ -0,0 +1,30 @@
+# clarity/scripts/test_bench_suite.py
+import json
+from datetime import timedelta
+
+import goal_tracker
+from bench_suite import run
+from synthetic_data import generate_logs, pillar_names, ANCHOR
+
+def test_generator_is_seeded():
+    a = list(generate_logs(years=0.5, pillars=5, seed=1))
+    assert a == list(generate_logs(years=0.5, pillars=5, seed=1))
+    assert a != list(generate_logs(years=0.5, pillars=5, seed=2))
+    assert {p for _, p, _ in a} <= set(pillar_names(5))
+    assert all(0 < h <= 6 for _, _, h in a)
+    # history ends on the fixed anchor, not today
+    assert (ANCHOR - timedelta(days=30)).isoformat() <= a[-1][0] <= ANCHOR.isoformat()
+
+def test_run_produces_json():
+    before = goal_tracker.DB_PATH
+    results = run(years=0.2, pillars=4, repeat=2, single_logs=5)
+    json.dumps(results)  # serializable
+    assert results["meta"]["rows"] > 0
+    for name in ("insert_bulk", "window_sums_7d", "check_targets", "generate_suggestions", "page_weekly_report"):
+        assert name in results["benchmarks"], name
+    assert goal_tracker.DB_PATH == before, "run() must restore global state"
+
+if __name__ == "__main__":
+    test_generator_is_seeded()
+    test_run_produces_json()
+    print("✅ Benchmark suite test passed.")
@@ -1,8 +1,8 @@
-import os
 import sqlite3
 from datetime import datetime, timedelta
 from pprint import pprint
 
+from db import remove_db
 from goal_tracker import init_db, check_targets
 
 DB_PATH = "clarity/data/clarity.db"
@@ -10,8 +10,7 @@ DB_PATH = "clarity/data/clarity.db"
 # ---------------------------
 # Step 1: Reset DB for clean test
 # ---------------------------
-if os.path.exists(DB_PATH):
-    os.remove(DB_PATH)
+remove_db(DB_PATH)  # also closes pooled handles to the old file
 init_db()
 
 # ---------------------------
@@ -0,0 +1,79 @@
+# clarity/scripts/test_day_keys.py
+import contextlib
+import io
+import os
+import sqlite3
+import tempfile
+from datetime import datetime, timezone
+
+import goal_tracker
+from db import close_all
+from day_keys import day_to_date, epoch_day, get_zone, to_day
+from goal_tracker import (
+    init_db, log_hours, bulk_log_hours, get_window_sums, check_targets, set_day_boundary, get_config,
+)
+
+def ts(text):
+    """UTC unix time of an ISO "YYYY-MM-DD HH:MM" string."""
+    return datetime.fromisoformat(text).replace(tzinfo=timezone.utc).timestamp()
+
+def test_epoch_days():
+    assert to_day("1970-01-01") == 0 and to_day("2025-03-10") == 20157
+    assert day_to_date(20157) == "2025-03-10" and to_day(datetime(2025, 3, 10, 23, 59)) == 20157
+    kolkata = get_zone("Asia/Kolkata")
+    # 20:00 UTC is already 01:30 the next day in Kolkata
+    assert epoch_day(ts("2025-03-10 20:00"), kolkata) == to_day("2025-03-11")
+    assert epoch_day(ts("2025-03-10 20:00"), get_zone("America/New_York")) == to_day("2025-03-10")
+    # before a 4 a.m. rollover, the session still belongs to the previous day
+    assert epoch_day(ts("2025-03-10 20:00"), kolkata, rollover_hour=4) == to_day("2025-03-10")
+    try:
+        get_zone("Mars/Olympus")
+        raise AssertionError("unknown zone accepted")
+    except ValueError:
+        pass
+
+def test_logs_bucket_by_user_day():
+    with tempfile.TemporaryDirectory() as tmp:
+        goal_tracker.DB_PATH = os.path.join(tmp, "clarity.db")
+        init_db()
+        set_day_boundary("Asia/Kolkata", 4)
+        assert (get_config().timezone, get_config().rollover_hour) == ("Asia/Kolkata", 4)
+        with contextlib.redirect_stdout(io.StringIO()):
+            log_hours("Dev", 1.0, at=ts("2025-03-10 20:00"))  # 01:30 on the 11th, before rollover -> the 10th
+            log_hours("Dev", 2.0, at=ts("2025-03-10 23:00"))  # 04:30 on the 11th -> the 11th
+        bulk_log_hours([("2025-03-09", "DSA", 0.5)])
+
+        conn = sqlite3.connect(goal_tracker.DB_PATH)
+        rows = conn.execute("SELECT date, day, logged_at FROM pillar_logs ORDER BY id").fetchall()
+        assert rows == [
+            ("2025-03-10", 20157, int(ts("2025-03-10 20:00"))),
+            ("2025-03-11", 20158, int(ts("2025-03-10 23:00"))),
+            ("2025-03-09", 20156, None),
+        ], rows
+        # direct writers only set date; the day key follows it
+        conn.execute("INSERT INTO pillar_logs (date, pillar, hours) VALUES ('2025-03-11', 'GATE', 1.5)")
+        conn.commit()
+
+        window = get_window_sums(3, end="2025-03-11")
+        assert window["dates"] == ["2025-03-09", "2025-03-10", "2025-03-11"]
+        assert window["hours"]["Dev"] == [0.0, 1.0, 2.0] and window["hours"]["DSA"] == [0.5, 0.0, 0.0]
+        assert get_window_sums(3, end=20158) == window
+        plan = " ".join(r[-1] for r in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT day, pillar, total_hours FROM daily_pillar_rollup WHERE day BETWEEN ? AND ?", (1, 2)))
+        assert "SEARCH" in plan, plan
+        conn.close()
+
+        # the default window ends on the user's today, not the server's
+        assert get_window_sums(7)["dates"][-1] == day_to_date(get_config().today())
+        assert check_targets() == check_targets(get_window_sums(7))
+        try:
+            set_day_boundary("UTC", 24)
+            raise AssertionError("rollover hour 24 accepted")
+        except ValueError:
+            pass
+        close_all()
+
+if __name__ == "__main__":
+    test_epoch_days()
+    test_logs_bucket_by_user_day()
+    print("✅ Day key test passed.")
@@ -0,0 +1,58 @@
+# clarity/scripts/test_db_migrations.py
+import os
+import sqlite3
+import tempfile
+
+from db_migrations import migrate, get_schema_version, SCHEMA_VERSION
+
+def make_legacy_db(path):
+    """A DB exactly as the pre-migration init_db() left it (user_version 0)."""
+    conn = sqlite3.connect(path)
+    conn.execute('''
+        CREATE TABLE pillar_logs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            date TEXT,
+            pillar TEXT,
+            hours REAL
+        )
+    ''')
+    conn.executemany(
+        "INSERT INTO pillar_logs (date, pillar, hours) VALUES (?, ?, ?)",
+        [("2025-08-06", "Dev", 2.0), ("2025-08-07 21:15:00", "DSA", 1.0), ("2025-08-07", "Chess", 0.5)],
+    )
+    conn.commit()
+    return conn
+
+def test_upgrade_in_place():
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = make_legacy_db(os.path.join(tmp, "legacy.db"))
+        assert get_schema_version(conn) == 0
+
+        applied = migrate(conn, seed_pillars=["Dev", "DSA", "GATE"])
+        assert applied == list(range(1, SCHEMA_VERSION + 1)), applied
+        assert get_schema_version(conn) == SCHEMA_VERSION
+
+        # rows survive, dates are normalized
+        rows = conn.execute("SELECT date, pillar, hours FROM pillar_logs ORDER BY id").fetchall()
+        assert [r[0] for r in rows] == ["2025-08-06", "2025-08-07", "2025-08-07"], rows
+
+        # pillar lookup = seeds + pillars found in existing logs, kept current by trigger
+        conn.execute("INSERT INTO pillar_logs (date, pillar, hours) VALUES ('2025-08-08', 'ML', 1)")
+        names = {r[0] for r in conn.execute("SELECT name FROM pillars")}
+        assert names == {"Dev", "DSA", "GATE", "Chess", "ML"}, names
+
+        plan = " ".join(r[-1] for r in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT SUM(hours) FROM pillar_logs WHERE date = ? AND pillar = ?", ("2025-08-06", "Dev")))
+        assert "COVERING INDEX" in plan, plan
+
+        # the rollup is keyed by integer epoch-day (2025-08-07 = 20307)
+        rollup = conn.execute("SELECT day, pillar, total_hours FROM daily_pillar_rollup WHERE day = 20307 ORDER BY pillar")
+        assert rollup.fetchall() == [(20307, "Chess", 0.5), (20307, "DSA", 1.0)]
+
+        # re-running is a no-op
+        assert migrate(conn) == []
+        conn.close()
+    print("✅ Migration test passed.")
+
+if __name__ == "__main__":
+    test_upgrade_in_place()
@@ -0,0 +1,89 @@
+# clarity/scripts/test_db_pool.py
+import os
+import sqlite3
+import tempfile
+import threading
+
+import db
+import goal_tracker
+from db import get_conn, close_all
+from goal_tracker import init_db, log_hours, get_window_sums
+
+def test_connection_reuse_and_wal():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "pool.db")
+        conn = get_conn(path)
+        assert get_conn(path) is conn, "same thread should reuse its connection"
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+        other = []
+        t = threading.Thread(target=lambda: other.append(get_conn(path)))
+        t.start()
+        t.join()
+        assert other[0] is not conn, "each thread gets its own connection"
+
+        close_all()
+        assert get_conn(path) is not conn, "close_all() drops cached handles"
+        close_all()
+
+def test_thread_exit_closes_its_connections():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "pool.db")
+        close_all()
+        opened = []
+
+        def short_lived():
+            opened.append(get_conn(path))
+            opened[-1].execute("SELECT 1")
+
+        for _ in range(300):  # e.g. one Streamlit rerun each
+            t = threading.Thread(target=short_lived)
+            t.start()
+            t.join()
+        assert len(db._registry) == 0, "exited threads leave no open handles"
+        try:
+            opened[0].execute("SELECT 1")
+            raise AssertionError("connection of an exited thread still open")
+        except sqlite3.ProgrammingError:
+            pass
+        close_all()
+
+def test_readers_while_writing():
+    with tempfile.TemporaryDirectory() as tmp:
+        goal_tracker.DB_PATH = os.path.join(tmp, "clarity.db")
+        init_db()
+        errors = []
+
+        def writer():
+            try:
+                for _ in range(200):
+                    log_hours("Dev", 0.25)
+            except Exception as e:  # noqa: BLE001 - surface any lock error
+                errors.append(e)
+
+        def reader():
+            try:
+                for _ in range(200):
+                    get_window_sums(7)
+            except Exception as e:  # noqa: BLE001
+                errors.append(e)
+
+        threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert not errors, errors
+        assert get_window_sums(7)["hours"]["Dev"][-1] == 50.0
+        close_all()
+
+if __name__ == "__main__":
+    import contextlib
+    import io
+
+    with contextlib.redirect_stdout(io.StringIO()):  # log_hours prints per call
+        test_connection_reuse_and_wal()
+        test_thread_exit_closes_its_connections()
+        test_readers_while_writing()
+    print("✅ Connection pool test passed.")
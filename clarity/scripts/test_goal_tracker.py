@@ -1,13 +1,12 @@
 from datetime import datetime, timedelta
 import sqlite3
-import os
 
-from clarity.scripts.goal_tracker import init_db, log_hours, get_all_logs, get_weekly_avg, check_targets
+from db import remove_db
+from goal_tracker import init_db, log_hours, get_all_logs, get_weekly_avg, check_targets
 
 # Step 0: Reset DB for testing
 DB_PATH = "clarity/data/clarity.db"
-if os.path.exists(DB_PATH):
-    os.remove(DB_PATH)
+remove_db(DB_PATH)  # also closes pooled handles to the old file
 
 init_db()
 
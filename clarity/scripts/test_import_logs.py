@@ -0,0 +1,60 @@
+# clarity/scripts/test_import_logs.py
+import contextlib
+import io
+import json
+import os
+import tempfile
+
+import goal_tracker
+from db import close_all
+from goal_tracker import init_db, bulk_log_hours, get_pillar_totals
+from import_logs import import_file
+
+def test_bulk_and_file_import():
+    with tempfile.TemporaryDirectory() as tmp:
+        goal_tracker.DB_PATH = os.path.join(tmp, "clarity.db")
+        init_db()
+
+        stats = bulk_log_hours(
+            [("2025-01-01", "Dev", 2), {"date": "2025-01-02T23:10:00", "pillar": "DSA", "hours": "1.5"},
+             ("2025-01-01", "Dev", 2), ("2025-01-03", "Chess", 1), ("not-a-date", "GATE", 1)],
+            chunk_size=2, dedupe=True,
+        )
+        assert (stats["inserted"], stats["duplicates"], stats["rejected"]) == (2, 1, 2), stats
+
+        csv_path = os.path.join(tmp, "logs.csv")
+        with open(csv_path, "w") as f:
+            f.write("date,pillar,hours\n2025-01-01,Dev,2\n2025-01-04,GATE,1\n2025-01-05,GATE,-1\n")
+        jsonl_path = os.path.join(tmp, "logs.jsonl")
+        with open(jsonl_path, "w") as f:
+            f.write(json.dumps({"date": "2025-01-06", "pillar": "DSA", "hours": 0.5}) + "\n{broken\n")
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            csv_stats = import_file(csv_path, dedupe=True)
+            jsonl_stats = import_file(jsonl_path)
+        assert (csv_stats["inserted"], csv_stats["duplicates"], csv_stats["rejected"]) == (1, 1, 1), csv_stats
+        assert (jsonl_stats["inserted"], jsonl_stats["rejected"]) == (1, 1), jsonl_stats
+
+        # imported rows land in the rollup like any other insert
+        assert get_pillar_totals() == {"Dev": 2.0, "DSA": 2.0, "GATE": 1.0}, get_pillar_totals()
+
+        # by default two equal sessions on the same day are both kept
+        stats = bulk_log_hours([("2025-01-07", "Dev", 1.0), ("2025-01-07", "Dev", 1.0)])
+        assert (stats["inserted"], stats["duplicates"]) == (2, 0), stats
+        assert get_pillar_totals()["Dev"] == 4.0
+
+        # with dedupe, the activity type is part of the key: an hour of research and an hour of execution both count
+        stats = bulk_log_hours([
+            {"date": "2025-01-08", "pillar": "Dev", "hours": 1.0, "activity_type": "execution"},
+            {"date": "2025-01-08", "pillar": "Dev", "hours": 1.0, "activity_type": "research"},
+            {"date": "2025-01-08", "pillar": "Dev", "hours": 1.0, "activity_type": "research"},
+        ], dedupe=True)
+        assert (stats["inserted"], stats["duplicates"]) == (2, 1), stats
+        bulk_log_hours([("2025-01-09", "DSA", 0.5, "research")], dedupe=True)
+        stats = bulk_log_hours([("2025-01-09", "DSA", 0.5), ("2025-01-09", "DSA", 0.5, "research")], dedupe=True)
+        assert (stats["inserted"], stats["duplicates"]) == (1, 1), "matched against the DB by type too"
+        close_all()
+    print("✅ Import test passed.")
+
+if __name__ == "__main__":
+    test_bulk_and_file_import()
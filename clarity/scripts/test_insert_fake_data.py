@@ -1,20 +1,18 @@
 # clarity/scripts/test_insert_fake_data.py
-import os
-import sqlite3
 from datetime import datetime, timedelta
 
+from db import get_conn, remove_db
 from goal_tracker import init_db, DB_PATH
 
 def reset_db():
-    if os.path.exists(DB_PATH):
-        os.remove(DB_PATH)
+    remove_db(DB_PATH)
     init_db()
 
 def insert_logs_for_scenario(scenario_name, data_map):
     """
     data_map: dict pillar -> list of 7 numbers (hours for each day, 0..6)
     """
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_conn(DB_PATH)
     c = conn.cursor()
     for i in range(7):
         date = (datetime.now() - timedelta(days=i)).strftime("%Y-%m-%d")
@@ -23,7 +21,6 @@ def insert_logs_for_scenario(scenario_name, data_map):
             c.execute("INSERT INTO pillar_logs (date, pillar, hours) VALUES (?, ?, ?)",
                       (date, pillar, hours))
     conn.commit()
-    conn.close()
     print(f"[+] Inserted scenario '{scenario_name}'")
 
 if __name__ == "__main__":
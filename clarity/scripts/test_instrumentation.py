@@ -0,0 +1,79 @@
+# clarity/scripts/test_instrumentation.py
+import contextlib
+import io
+import json
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+import goal_tracker
+import instrumentation
+from db import close_all, get_conn
+from goal_tracker import init_db, log_hours, bulk_log_hours, get_window_sums, get_all_logs
+from instrumentation import timed, snapshot, prometheus_text, reset
+from report_cache import REPORT_CACHE, cached
+
+def test_spans_count_statements():
+    with tempfile.TemporaryDirectory() as tmp:
+        goal_tracker.DB_PATH = os.path.join(tmp, "clarity.db")
+        init_db()
+        days = [(datetime.now() - timedelta(days=i)).strftime("%Y-%m-%d") for i in range(400)]
+        bulk_log_hours([(d, p, 1.0) for d in days for p in ("Dev", "DSA", "GATE")])
+        reset()
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            log_hours("Dev", 1.0)
+        get_window_sums(7)
+        with timed("outer"):
+            get_all_logs()
+            get_conn(goal_tracker.DB_PATH).execute("SELECT 1").fetchone()
+
+        spans = snapshot()["spans"]
+        assert spans["goal_tracker.insert_log"]["calls"] == 1
+        assert spans["goal_tracker.insert_log"]["statements"] >= 1
+        assert spans["goal_tracker.get_window_sums"]["statements"] >= 1
+        inner = spans["goal_tracker.get_all_logs"]
+        assert spans["outer"]["statements"] == inner["statements"] + 1, "children roll up into the parent"
+        assert inner["vm_steps"] > 0, "a 1200-row scan registers VM steps"
+        assert snapshot()["sqlite"]["statements"] >= sum(s["statements"] for n, s in spans.items() if n != "outer")
+
+        # failures are counted, and the exception still propagates
+        try:
+            with timed("boom"):
+                raise RuntimeError("x")
+        except RuntimeError:
+            pass
+        assert snapshot()["spans"]["boom"]["errors"] == 1
+        close_all()
+
+def test_exports_and_collectors():
+    with tempfile.TemporaryDirectory() as tmp:
+        goal_tracker.DB_PATH = os.path.join(tmp, "clarity.db")
+        init_db()
+        reset()
+        REPORT_CACHE.clear()
+        window = cached(get_window_sums)
+        window(7)
+        window(7)
+
+        snap = json.loads(json.dumps(snapshot()))  # JSON round-trips
+        assert snap["collectors"]["report_cache"]["hits"] >= 1
+
+        text = prometheus_text()
+        assert '# TYPE clarity_span_calls_total counter' in text
+        assert 'clarity_span_calls_total{span="goal_tracker.get_window_sums"} 1' in text
+        assert 'clarity_span_duration_ms_bucket{span="goal_tracker.get_window_sums",le="+Inf"} 1' in text
+        assert "clarity_report_cache_hits " in text
+
+        out = os.path.join(tmp, "metrics.prom")
+        instrumentation.dump(out)
+        assert open(out).read().startswith("# HELP")
+        out = os.path.join(tmp, "metrics.json")
+        instrumentation.dump(out)
+        assert "goal_tracker.get_window_sums" in json.load(open(out))["spans"]
+        close_all()
+
+if __name__ == "__main__":
+    test_spans_count_statements()
+    test_exports_and_collectors()
+    print("✅ Instrumentation test passed.")
@@ -0,0 +1,84 @@
+# clarity/scripts/test_journal.py
+import os
+from datetime import date, timedelta
+
+os.environ["CLARITY_NLP"] = "builtin"  # deterministic themes whatever NLP packages are installed
+
+import goal_tracker
+import journal
+from goal_tracker import temporary_db
+from journal import (
+    add_entry, update_entry, delete_entry, get_entries, analyze_pending, search, recurring_themes, mood_trend,
+    get_analyzer,
+)
+
+END = date(2025, 6, 30)
+
+def seed():
+    """Eight weeks of entries: the parser comes up every week, the garden only once."""
+    for i in range(56):
+        day = (END - timedelta(days=i)).isoformat()
+        if i % 7 == 0:
+            add_entry("Shipped the parser refactor, felt productive and proud", day)
+        elif i % 7 == 3:
+            add_entry("Stuck on the parser again, tired and distracted", day)
+    add_entry("Planted tomatoes in the garden", (END - timedelta(days=2)).isoformat())
+
+def test_analysis_is_incremental():
+    with temporary_db():
+        seed()
+        assert analyze_pending()["analyzed"] == 17
+        assert analyze_pending()["analyzed"] == 0, "nothing changed: nothing re-analyzed"
+        assert get_analyzer() is get_analyzer()
+
+        newest = get_entries(1)[0]
+        assert newest["date"] == END.isoformat() and newest["mood"] == 1.0
+        update_entry(newest["id"], text="Not productive, stuck on the parser")
+        assert get_entries(1)[0]["mood"] is None  # stale analysis is not served
+        assert analyze_pending()["analyzed"] == 1
+        assert get_entries(1)[0]["mood"] == -1.0  # "not productive" + "stuck"
+
+        # switching analyzer (or ANALYZER_VERSION) re-runs everything once
+        journal.ANALYZER_VERSION += 1
+        try:
+            assert analyze_pending(batch_size=5)["analyzed"] == 17
+        finally:
+            journal.ANALYZER_VERSION -= 1
+
+def test_search_and_themes():
+    with temporary_db():
+        seed()
+        hits = search("shipping parser")  # porter stemming: "shipping" finds "Shipped"
+        assert len(hits) == 8 and all("**" in h["snippet"] for h in hits)
+        assert search('garden" OR "parser') == []  # user input is never FTS syntax
+        assert search("   ") == []
+
+        # theme queries are a range scan on the day key, not a table scan
+        plan = " ".join(r[-1] for r in goal_tracker._conn().execute(
+            "EXPLAIN QUERY PLAN SELECT theme, COUNT(*) FROM journal_themes WHERE day BETWEEN 1 AND 9 GROUP BY theme"))
+        assert "day>? AND day<?" in plan, plan
+
+        themes = recurring_themes(weeks=8, end=END)
+        assert themes[0]["theme"] == "parser" and themes[0]["weeks"] == 8 and themes[0]["entries"] == 16
+        assert "garden" not in {t["theme"] for t in themes}  # one week only
+        assert {t["theme"] for t in recurring_themes(weeks=8, min_weeks=1, limit=50, end=END)} >= {"garden", "planted"}
+        assert recurring_themes(weeks=4, end=END)[0]["weeks"] == 4
+
+        trend = mood_trend(7, end=END)
+        assert trend["dates"][-1] == END.isoformat()
+        assert trend["mood"][-1] == 1.0 and trend["mood"][3] == -1.0 and trend["mood"][0] is None
+
+        garden = search("garden")[0]["id"]
+        delete_entry(garden)
+        assert search("garden") == []
+        assert "garden" not in {t["theme"] for t in recurring_themes(weeks=8, min_weeks=1, limit=50, end=END)}
+        try:
+            add_entry("   ")
+            raise AssertionError("empty entry accepted")
+        except ValueError:
+            pass
+
+if __name__ == "__main__":
+    test_analysis_is_incremental()
+    test_search_and_themes()
+    print("✅ Journal test passed.")
@@ -0,0 +1,45 @@
+# clarity/scripts/test_log_pages.py
+import os
+import random
+import tempfile
+
+import goal_tracker
+from db import get_conn, close_all
+from goal_tracker import init_db, bulk_log_hours, get_logs_page, iter_logs
+
+def test_keyset_pages_match_full_scan():
+    with tempfile.TemporaryDirectory() as tmp:
+        goal_tracker.DB_PATH = os.path.join(tmp, "clarity.db")
+        init_db()
+        rng = random.Random(7)
+        bulk_log_hours(
+            [(f"2025-03-{rng.randint(1, 20):02d}", rng.choice(["Dev", "DSA", "GATE"]), rng.randint(1, 8) / 4)
+             for _ in range(500)],
+            dedupe=False,
+        )
+        conn = get_conn(goal_tracker.DB_PATH)
+        expected = conn.execute("SELECT id, date, pillar, hours FROM pillar_logs ORDER BY date DESC, id DESC").fetchall()
+
+        # walking pages never skips or repeats a row, even with many rows per date
+        pages, cursor = [], None
+        while True:
+            rows, cursor = get_logs_page(7, after=cursor)
+            pages.extend(rows)
+            if cursor is None:
+                break
+        assert pages == expected
+        assert list(iter_logs(13)) == expected
+
+        dsa_march_10s = [r for r in expected if r[2] == "DSA" and "2025-03-10" <= r[1] <= "2025-03-15"]
+        assert list(iter_logs(5, pillar="DSA", date_from="2025-03-10", date_to="2025-03-15")) == dsa_march_10s
+
+        # pages come straight off an index — no sort of the whole table
+        plan = " ".join(r[-1] for r in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT id, date, pillar, hours FROM pillar_logs "
+            "WHERE (date, id) < (?, ?) AND pillar = ? ORDER BY date DESC, id DESC LIMIT 51", ("2025-03-10", 100, "DSA")))
+        assert "TEMP B-TREE" not in plan, plan
+        close_all()
+    print("✅ Log pagination test passed.")
+
+if __name__ == "__main__":
+    test_keyset_pages_match_full_scan()
@@ -0,0 +1,97 @@
+# clarity/scripts/test_loop_detector.py
+import random
+import time
+from datetime import date, datetime, timedelta
+
+import goal_tracker
+import loop_detector
+from db import close_all
+from goal_tracker import temporary_db, bulk_log_hours, log_hours
+from loop_detector import backfill, sync, get_alerts, get_stats, detector_stats
+from synthetic_data import generate_logs
+from suggestion_engine import generate_suggestions
+
+def typed_history(years, seed=5):
+    rng = random.Random(seed)
+    return [(d, p, h, "research" if rng.random() < 0.4 else "execution")
+            for d, p, h in generate_logs(years=years, pillars=3, seed=seed, end=date.today())]
+
+def at_days_ago(n):
+    return (datetime.now() - timedelta(days=n)).timestamp()
+
+def test_incremental_matches_one_pass():
+    with temporary_db():
+        records = sorted(typed_history(2))
+        half = len(records) // 2
+        bulk_log_hours(records[:half], dedupe=False)
+        sync()
+        rebuilds = detector_stats()["rebuilds"]
+        bulk_log_hours(records[half:], dedupe=False)  # later days: absorbed online, no replay
+        online = sync()
+        assert detector_stats()["rebuilds"] == rebuilds
+        online_state = {p: [round(x, 9) for x in s.to_list()] for p, s in online.pillars.items()}
+
+        stats = backfill()  # one streaming pass over everything
+        assert stats["rows"] == len(records) and stats["pillars"] == 3
+        replayed = {p: [round(x, 9) for x in s.to_list()] for p, s in sync().pillars.items()}
+        assert online_state == replayed
+
+def test_alerts_and_invalidation():
+    with temporary_db():
+        log_hours("Dev", 2, at=at_days_ago(6))
+        for n in (3, 2, 1, 0):  # four research-only days on DSA
+            log_hours("DSA", 1.5, at=at_days_ago(n), activity_type="research")
+        log_hours("GATE", 1, at=at_days_ago(0), activity_type="research")
+        log_hours("GATE", 2, at=at_days_ago(0))
+
+        alerts = get_alerts()
+        assert [a["pillar"] for a in alerts] == ["DSA"], alerts
+        assert alerts[0]["run_days"] == 4 and alerts[0]["research_share"] > 0.7
+        assert get_stats()["GATE"]["run_days"] == 0
+
+        out = generate_suggestions(goal_tracker.check_targets(), goal_tracker.get_config(), alerts)
+        assert out["alerts"] == alerts and out["summary_lines"][0].startswith("🌀 Perfection loop on DSA")
+
+        # one more log: consumed online (one row), not a replay
+        consumed, rebuilds = detector_stats()["consumed_rows"], detector_stats()["rebuilds"]
+        log_hours("DSA", 1, activity_type="execution")
+        assert all(a["run_days"] == 0 for a in get_alerts())  # execution ends the run
+        assert detector_stats()["consumed_rows"] == consumed + 1 and detector_stats()["rebuilds"] == rebuilds
+
+        # a backdated log and an edit both replay history once
+        log_hours("Dev", 1, at=at_days_ago(10), activity_type="research")
+        sync()
+        assert detector_stats()["rebuilds"] == rebuilds + 1
+        with goal_tracker._conn() as conn:
+            conn.execute("DELETE FROM pillar_logs WHERE pillar = 'DSA' AND activity_type = 'execution'")
+        assert get_alerts()[0]["pillar"] == "DSA"
+        assert detector_stats()["rebuilds"] == rebuilds + 2
+
+        # a restart resumes from the saved high-water mark
+        close_all()
+        loop_detector._DETECTORS.clear()
+        rebuilds = detector_stats()["rebuilds"]
+        assert get_alerts()[0]["run_days"] == 4
+        assert detector_stats()["rebuilds"] == rebuilds
+
+        try:
+            log_hours("Dev", 1, activity_type="reading")
+            raise AssertionError("unknown activity type accepted")
+        except ValueError:
+            pass
+
+def test_backfill_years_in_one_pass():
+    with temporary_db():
+        records = typed_history(5, seed=9)
+        random.Random(1).shuffle(records)  # arrival order doesn't matter to the backfill
+        bulk_log_hours(records, dedupe=False)
+        t0 = time.perf_counter()
+        stats = backfill()
+        assert stats["rows"] == len(records), stats
+        print(f"   backfilled {stats['rows']:,} rows in {time.perf_counter() - t0:.2f}s")
+
+if __name__ == "__main__":
+    test_incremental_matches_one_pass()
+    test_alerts_and_invalidation()
+    test_backfill_years_in_one_pass()
+    print("✅ Loop detector test passed.")
@@ -0,0 +1,75 @@
+# clarity/scripts/test_multi_tenant.py
+import os
+import tempfile
+
+import db
+import goal_tracker
+from db import get_conn, close_all
+from goal_tracker import db_path_for, log_hours, get_weekly_avg, get_logs_page, get_window_sums
+from report_cache import REPORT_CACHE, cached
+
+def test_users_are_isolated():
+    with tempfile.TemporaryDirectory() as tmp:
+        goal_tracker.DB_PATH = os.path.join(tmp, "clarity.db")
+        log_hours("Dev", 7.0, user="alice")
+        log_hours("DSA", 3.5, user="bob")
+
+        assert db_path_for("alice") == os.path.join(tmp, "users", "alice.db")
+        assert os.path.exists(db_path_for("bob"))
+        assert get_weekly_avg(user="alice")["Dev"] == 1.0
+        assert get_weekly_avg(user="alice")["DSA"] == 0.0
+        assert get_weekly_avg(user="bob")["DSA"] == 0.5
+        assert get_logs_page(user=None)[0] == [], "default DB untouched"
+
+        for bad in ("../etc", "a/b", "", ".hidden", "x" * 65):
+            try:
+                db_path_for(bad)
+            except ValueError:
+                continue
+            raise AssertionError(f"accepted user id {bad!r}")
+        close_all()
+
+def test_lru_bounds_open_handles():
+    saved = db.MAX_OPEN_PER_THREAD
+    db.MAX_OPEN_PER_THREAD = 3
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            goal_tracker.DB_PATH = os.path.join(tmp, "clarity.db")
+            for i in range(6):
+                log_hours("GATE", 1.0, user=f"u{i}")
+            assert len(db._local.pool.conns) == 3
+            assert len(db._registry) == 3, "evicted handles are closed and unregistered"
+
+            # an evicted user's data is still there when their handle reopens
+            assert get_window_sums(1, user="u0")["hours"]["GATE"] == [1.0]
+            first = get_conn(db_path_for("u0"))
+            assert get_conn(db_path_for("u0")) is first
+            close_all()
+    finally:
+        db.MAX_OPEN_PER_THREAD = saved
+
+def test_cache_is_per_user():
+    with tempfile.TemporaryDirectory() as tmp:
+        goal_tracker.DB_PATH = os.path.join(tmp, "clarity.db")
+        REPORT_CACHE.clear()
+        sums = cached(get_window_sums)
+
+        a = sums(7, user="alice")
+        b = sums(7, user="bob")
+        assert sums(7, user="alice") is a and sums(7, user="bob") is b
+
+        log_hours("Dev", 2.0, user="bob")  # only bob's entries go stale
+        assert sums(7, user="alice") is a
+        assert sums(7, user="bob")["hours"]["Dev"][-1] == 2.0
+        REPORT_CACHE.clear()
+        close_all()
+
+if __name__ == "__main__":
+    import contextlib
+    import io
+
+    with contextlib.redirect_stdout(io.StringIO()):  # log_hours prints per call
+        test_users_are_isolated()
+        test_lru_bounds_open_handles()
+        test_cache_is_per_user()
+    print("✅ Multi-tenant test passed.")
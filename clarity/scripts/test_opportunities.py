@@ -0,0 +1,218 @@
+# clarity/scripts/test_opportunities.py
+import hashlib
+import os
+import random
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import goal_tracker
+from db import close_all
+from goal_tracker import init_db
+from opportunities import (
+    canonical_url, parse_deadline, get_opportunities, upsert_opportunities, upcoming, pillar_tags, opportunity_version,
+)
+from suggestion_engine import generate_suggestions
+from opportunity_fetcher import OpportunityFetcher, parse_page, normalize_source, fetcher_stats
+
+LAST_MODIFIED = "Mon, 06 Oct 2025 08:00:00 GMT"
+
+def listing(n, start=0, extra=""):
+    """A canned listing page with n opportunities (ids start..start+n-1)."""
+    items = "".join(f"""
+        <article class="opportunity">
+          <h3><a href="https://jobs.example.org/o/{i}?utm_source=feed#apply">ML Internship {i}</a></h3>
+          <p class="description">Paid research internship number {i}.</p>
+          <time datetime="2026-0{1 + i % 9}-15">15 {i}</time>
+          <span class="tag">ML</span><span class="tag">Internship</span>
+        </article>""" for i in range(start, start + n))
+    return f"<html><body><nav><a href='/'>Home</a></nav>{items}{extra}</body></html>"
+
+class StandIn(BaseHTTPRequestHandler):
+    """Canned pages. /etag/* send an ETag, /lm/* only Last-Modified, /plain/* no validators."""
+    pages = {}
+    hits = []  # (host, path, status, monotonic time)
+
+    def do_GET(self):
+        body = self.pages.get(self.path)
+        if body is None:
+            self._send(404, b"")
+            return
+        body = body.encode()
+        headers = {}
+        etag = '"%s"' % hashlib.md5(body).hexdigest()
+        if self.path.startswith("/etag/"):
+            headers["ETag"] = etag
+            fresh = self.headers.get("If-None-Match") == etag
+        elif self.path.startswith("/lm/"):
+            headers["Last-Modified"] = LAST_MODIFIED
+            fresh = self.headers.get("If-Modified-Since") == LAST_MODIFIED
+        else:
+            fresh = False
+        self._send(304 if fresh else 200, b"" if fresh else body, headers)
+
+    def _send(self, status, body, headers=()):
+        self.hits.append((self.headers.get("Host"), self.path, status, time.monotonic()))
+        self.send_response(status)
+        for k, v in dict(headers).items():
+            self.send_header(k, v)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def serve():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def test_parsing_and_keys():
+    source = normalize_source({"url": "https://example.org/list", "tags": ["Featured"]})
+    items = parse_page(listing(2), source)
+    assert len(items) == 2
+    assert items[0] == {
+        "title": "ML Internship 0",
+        "url": "https://jobs.example.org/o/0?utm_source=feed#apply",
+        "deadline": "2026-01-15",
+        "tags": "ml,internship,featured",
+        "description": "Paid research internship number 0.",
+    }
+    assert canonical_url(items[0]["url"]) == "https://jobs.example.org/o/0"
+    assert canonical_url("HTTPS://Example.org/o/0/?ref=x&page=2") == "https://example.org/o/0?page=2"
+    assert canonical_url("mailto:someone@example.org") is None
+    assert parse_deadline("Deadline: March 5, 2026") == "2026-03-05"
+    assert parse_deadline("rolling") is None
+
+def test_crawl_caches_and_dedupes():
+    server = serve()
+    port = server.server_address[1]
+    StandIn.pages = {}
+    for i in range(6):
+        StandIn.pages[f"/etag/{i}"] = listing(20, start=i * 20)
+        StandIn.pages[f"/lm/{i}"] = listing(20, start=i * 20 + 120)
+    StandIn.pages["/plain/0"] = listing(20, start=0)  # the same items as /etag/0, from another page
+    StandIn.pages["/plain/1"] = "<html><body><p>Nothing open right now.</p></body></html>"
+    # two hosts (127.0.0.1 and localhost) so the per-host limit still leaves room for concurrency
+    sources = [f"http://{host}:{port}{path}" for path in sorted(StandIn.pages)
+               for host in (("127.0.0.1",) if path.startswith("/plain") else ("127.0.0.1", "localhost"))]
+    sources.append(f"http://127.0.0.1:{port}/missing")
+    with tempfile.TemporaryDirectory() as tmp:
+        goal_tracker.DB_PATH = os.path.join(tmp, "clarity.db")
+        init_db()
+        with OpportunityFetcher(workers=8, interval=0.01) as fetcher:
+            first = fetcher.crawl(sources)
+            assert first["pages"] == len(sources) and first["errors"] == 1, first
+            assert first["failures"][0][1] == "HTTP 404"
+            assert first["inserted"] == 240, "each opportunity stored once, however many pages list it"
+            assert len(get_opportunities(limit=1000)) == 240
+
+            second = fetcher.crawl(sources)
+            assert second["not_modified"] == 24 and second["unchanged"] == 2 and second["items"] == 0, second
+            assert second["bytes_saved"] >= first["bytes"] - 2 * len(StandIn.pages["/plain/0"]), second
+            print(f"   cold: {first['pages_per_sec']} pages/s, {first['bytes']:,} bytes; "
+                  f"warm: {second['pages_per_sec']} pages/s, {second['bytes']:,} bytes, "
+                  f"{second['bytes_saved']:,} bytes saved by 304s")
+
+            # a changed page is re-downloaded and only its changed item rewritten
+            StandIn.pages["/etag/0"] = StandIn.pages["/etag/0"].replace("ML Internship 3<", "ML Internship 3 (extended)<")
+            third = fetcher.crawl(sources)
+            assert third["updated"] == 1 and third["inserted"] == 0 and third["not_modified"] == 22, third
+            assert fetcher_stats()["bytes_saved"] >= second["bytes_saved"]
+
+        # the per-host interval holds even with 8 workers
+        StandIn.hits.clear()
+        with OpportunityFetcher(workers=8, interval=0.05) as fetcher:
+            fetcher.crawl(sources[:8])
+        for host in {h for h, *_ in StandIn.hits}:
+            times = sorted(t for h, _, _, t in StandIn.hits if h == host)
+            assert times[-1] - times[0] >= 0.8 * 0.05 * (len(times) - 1), (host, times)  # 20% slack: server-side timing jitter
+        close_all()
+    server.shutdown()
+    server.server_close()
+
+TODAY = date(2026, 3, 1)
+TAG_POOL = ["ml", "hackathon", "contest", "gate", "research", "design", "finance", "internship", "phd", "web"]
+
+def stored(n, seed=3):
+    rng = random.Random(seed)
+    return [{
+        "title": f"Opportunity {i}",
+        "url": f"https://example.org/o/{i}",
+        "deadline": (TODAY + timedelta(days=rng.randint(-200, 500))).isoformat() if rng.random() < 0.9 else None,
+        "tags": rng.sample(TAG_POOL, rng.randint(0, 3)),
+    } for i in range(n)]
+
+def test_upcoming_deadlines():
+    with tempfile.TemporaryDirectory() as tmp:
+        goal_tracker.DB_PATH = os.path.join(tmp, "clarity.db")
+        init_db()
+        items = stored(30_000)
+        assert upsert_opportunities(items, "seed")["inserted"] == 30_000
+        pillars = ["Dev", "DSA", "GATE"]
+        tags = pillar_tags(pillars)
+
+        def expected(days, k, relevant=True):
+            end = (TODAY + timedelta(days=days)).isoformat()
+            due = [(it["deadline"], i) for i, it in enumerate(items)
+                   if it["deadline"] and TODAY.isoformat() <= it["deadline"] <= end
+                   and (not relevant or set(it["tags"]) & set(tags))]
+            return [f"Opportunity {i}" for _, i in sorted(due)[:k]]
+
+        for days, k in ((0, 5), (14, 5), (60, 25), (365, 200)):
+            got = upcoming(days, k, pillars=pillars, today=TODAY)
+            assert [o["title"] for o in got] == expected(days, k), (days, k)
+        assert [o["title"] for o in upcoming(30, 10, pillars=pillars, relevant_only=False, today=TODAY)] \
+            == expected(30, 10, relevant=False)
+        top = upcoming(14, 5, pillars=pillars, today=TODAY)[0]
+        assert top["days_left"] >= 0 and top["pillars"] and top["message"].startswith("📅 Due")
+
+        # both paths are index range scans, never a scan of the stored opportunities
+        conn = goal_tracker._conn()
+        for sql in ("SELECT * FROM opportunity_tags WHERE tag = 'ml' AND deadline BETWEEN '2026' AND '2027' "
+                    "ORDER BY deadline, opportunity_id LIMIT 5",
+                    "SELECT id FROM opportunities WHERE deadline BETWEEN '2026' AND '2027' ORDER BY deadline, id LIMIT 5"):
+            plan = " ".join(r[-1] for r in conn.execute("EXPLAIN QUERY PLAN " + sql))
+            assert "SEARCH" in plan and "SCAN" not in plan and "TEMP B-TREE" not in plan, plan
+
+        runs = []
+        for _ in range(300):
+            t0 = time.perf_counter()
+            upcoming(14, 5, pillars=pillars, today=TODAY)
+            runs.append(time.perf_counter() - t0)
+        median_ms = sorted(runs)[len(runs) // 2] * 1000
+        print(f"   upcoming(14 days, top 5) over 30,000 opportunities: median {median_ms:.3f} ms")
+        assert median_ms < 5, median_ms  # ~0.3 ms here; generous for slow CI machines
+
+        # re-tagging and deleting keep the inverted index in step; writes bump the version
+        version = opportunity_version()
+        first = expected(14, 1)[0]
+        i = int(first.split()[-1])
+        upsert_opportunities([dict(items[i], tags=["finance"])], "seed")
+        assert first not in [o["title"] for o in upcoming(14, 50, pillars=pillars, today=TODAY)]
+        assert first in [o["title"] for o in upcoming(14, 50, pillars={"Money": ["finance"]}, today=TODAY)]
+        conn.execute("DELETE FROM opportunities WHERE title = ?", (first,))
+        conn.commit()
+        assert conn.execute("SELECT COUNT(*) FROM opportunity_tags WHERE opportunity_id = ?", (i + 1,)).fetchone()[0] == 0
+        assert opportunity_version() == version + 2
+
+        # seeing an unchanged item again refreshes last_seen without invalidating cached suggestions
+        conn.execute("UPDATE opportunities SET last_seen = 0 WHERE title = 'Opportunity 0'")
+        conn.commit()
+        version = opportunity_version()
+        assert upsert_opportunities([items[0]], "seed")["unchanged"] == 1
+        assert conn.execute("SELECT last_seen FROM opportunities WHERE title = 'Opportunity 0'").fetchone()[0] > 0
+        assert opportunity_version() == version
+
+        out = generate_suggestions({"Dev": {"avg": 1, "target": 1.5}}, opportunities=upcoming(14, 3, pillars, today=TODAY))
+        assert len(out["opportunities"]) == 3 and out["summary_lines"][-1] == out["opportunities"][-1]["message"]
+        close_all()
+
+if __name__ == "__main__":
+    test_parsing_and_keys()
+    test_crawl_caches_and_dedupes()
+    test_upcoming_deadlines()
+    print("✅ Opportunities test passed.")
@@ -0,0 +1,91 @@
+# clarity/scripts/test_pillar_config.py
+import os
+import random
+import tempfile
+from datetime import datetime, timedelta
+
+import goal_tracker
+from db import close_all
+from goal_tracker import (
+    init_db, bulk_log_hours, check_targets, get_config, get_window_sums, set_target, set_actions, set_threshold,
+)
+from pillar_config import DEFAULT_CONFIG, DEFAULT_TARGETS, DEFAULT_THRESHOLDS, PRIORITIES
+from suggestion_engine import generate_suggestions
+
+def days_ago(n):
+    return (datetime.now() - timedelta(days=n)).strftime("%Y-%m-%d")
+
+def test_compiled_lookups():
+    config = DEFAULT_CONFIG
+    rng = random.Random(5)
+    for _ in range(2000):
+        pct = round(rng.uniform(-1, 1), 3)
+        if pct >= DEFAULT_THRESHOLDS["high"]:
+            expected = "high"
+        elif pct >= DEFAULT_THRESHOLDS["medium"]:
+            expected = "medium"
+        else:
+            expected = "low"
+        assert config.priority(pct) == expected, pct
+    assert config.action("Dev", "low") == ("Push one meaningful commit & open a PR", 20)
+    assert config.action("Chess", "high")[1] == 30, "unknown pillar falls back to the default action"
+
+    try:
+        config.pillars = ()
+    except AttributeError:
+        pass
+    else:
+        raise AssertionError("PillarConfig must be immutable")
+
+def test_db_config_roundtrip():
+    with tempfile.TemporaryDirectory() as tmp:
+        goal_tracker.DB_PATH = os.path.join(tmp, "clarity.db")
+        init_db()
+
+        config = get_config()
+        assert config.pillars == tuple(DEFAULT_TARGETS)
+        assert config.targets_on() == {p: float(t) for p, t in DEFAULT_TARGETS.items()}
+        assert config.actions == DEFAULT_CONFIG.actions
+        assert get_config() is config, "loaded once, reused until the config tables change"
+
+        # time-versioned target: past windows keep the old one
+        set_target("Dev", 3.0, effective_from=days_ago(3))
+        assert get_config() is not config
+        assert check_targets()["Dev"]["target"] == 3.0
+        old = get_window_sums(7, end=datetime.now() - timedelta(days=10))
+        assert check_targets(old)["Dev"]["target"] == 1.5
+
+        # a new pillar only needs config rows, no code changes
+        set_target("Chess", 0.5, effective_from=days_ago(30))
+        set_actions("Chess", [("Play one rapid game", 15), ("Solve 10 puzzles", 10)])
+        stats = bulk_log_hours([(days_ago(0), "Chess", 1.0), (days_ago(0), "Poker", 1.0)])
+        assert (stats["inserted"], stats["rejected"]) == (1, 1)
+        assert get_config().pillars == ("Dev", "DSA", "GATE", "Chess")
+        out = generate_suggestions(check_targets(), get_config())
+        chess = next(s for s in out["suggestions"] if s["pillar"] == "Chess")
+        assert chess["priority"] == "high" and chess["action"] == "Play one rapid game", chess
+
+        set_threshold("high", 0.9)
+        chess = next(s for s in generate_suggestions(check_targets(), get_config())["suggestions"] if s["pillar"] == "Chess")
+        assert chess["priority"] == "medium", chess
+        try:
+            set_threshold("medium", 0.95)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("medium above high must be rejected")
+        for priority in ("low", "urgent"):
+            try:
+                set_threshold(priority, 0.1)
+            except ValueError:
+                pass
+            else:
+                raise AssertionError(f"{priority!r} has no threshold")
+        assert get_config().thresholds["medium"] == DEFAULT_THRESHOLDS["medium"]
+        assert set(get_config().thresholds) == set(PRIORITIES)
+        close_all()
+
+if __name__ == "__main__":
+    test_compiled_lookups()
+    test_db_config_roundtrip()
+    print("✅ Pillar config test passed.")
@@ -0,0 +1,117 @@
+# clarity/scripts/test_precompute.py
+import os
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone
+
+import goal_tracker
+import precompute
+from db import close_all
+from goal_tracker import init_db, log_hours, bulk_log_hours, check_targets, set_target, set_day_boundary
+from precompute import PrecomputeScheduler, get_daily_results, compute_daily
+from suggestion_engine import generate_suggestions
+from instrumentation import reset, snapshot
+from day_keys import next_rollover, get_zone, day_to_date
+from opportunities import upsert_opportunities
+
+def wait_idle(scheduler, runs, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while scheduler.stats["runs"] < runs or not scheduler.idle():
+        assert time.monotonic() < deadline, scheduler.stats
+        time.sleep(0.01)
+
+def test_read_path():
+    with tempfile.TemporaryDirectory() as tmp:
+        goal_tracker.DB_PATH = os.path.join(tmp, "clarity.db")
+        init_db()
+        log_hours("Dev", 2)
+        computed = precompute.cache_stats()["computed"]
+        first = get_daily_results()  # miss -> computed now
+        assert precompute.cache_stats()["computed"] == computed + 1
+        status = check_targets()
+        assert first["status"] == status
+        assert first["suggestions"] == generate_suggestions(status, goal_tracker.get_config())
+
+        # hit: one statement, nothing recomputed
+        reset()
+        assert get_daily_results() == first
+        assert snapshot()["spans"]["precompute.get_daily_results"]["statements"] == 1
+        assert precompute.cache_stats()["computed"] == computed + 1
+
+        # a log or a config change invalidates the stored row
+        log_hours("DSA", 1)
+        assert get_daily_results(compute_on_miss=False) is None
+        assert get_daily_results()["totals"]["DSA"] == 1
+        set_target("DSA", 3)
+        assert get_daily_results(compute_on_miss=False) is None
+        assert get_daily_results()["status"]["DSA"]["target"] == 3
+
+        # so does a new opportunity (shared, default DB), for the default user and named users alike
+        assert get_daily_results("alice")["suggestions"]["opportunities"] == []
+        due = (date.fromisoformat(day_to_date(goal_tracker.get_config().today())) + timedelta(days=3)).isoformat()
+        upsert_opportunities([{"title": "Open source sprint", "url": "https://example.org/s", "deadline": due,
+                               "tags": ["open source"]}], "test")
+        assert get_daily_results(compute_on_miss=False) is None
+        assert get_daily_results("alice", compute_on_miss=False) is None
+        assert get_daily_results()["suggestions"]["opportunities"][0]["pillars"] == ["Dev"]
+        assert get_daily_results("alice")["suggestions"]["summary_lines"][-1].endswith("Open source sprint [Dev]")
+        close_all()
+
+def test_debounce_and_backpressure():
+    with tempfile.TemporaryDirectory() as tmp:
+        goal_tracker.DB_PATH = os.path.join(tmp, "clarity.db")
+        init_db()
+        scheduler = PrecomputeScheduler(debounce=0.2, max_delay=5.0).start()
+        try:
+            for _ in range(50):  # a burst of writes -> one recompute
+                log_hours("Dev", 0.1)
+            wait_idle(scheduler, 1)
+            assert scheduler.stats["runs"] == 1 and scheduler.stats["coalesced"] == 49
+            assert get_daily_results(compute_on_miss=False)["totals"]["Dev"] == 5.0
+
+            # a bulk import notifies once, however many rows it inserts
+            notified = scheduler.stats["notified"]
+            bulk_log_hours([(f"2025-01-{d:02d}", "GATE", 1) for d in range(1, 29)])
+            assert scheduler.stats["notified"] == notified + 1
+            wait_idle(scheduler, 2)
+        finally:
+            scheduler.stop()
+        assert scheduler.notify not in goal_tracker.LOG_LISTENERS
+
+        # past max_pending users, notifications are dropped (readers compute on a miss)
+        full = PrecomputeScheduler(debounce=60, max_pending=2)
+        assert full.notify("a") and full.notify("b") and full.notify("a")
+        assert not full.notify("c")
+        assert full.stats["dropped"] == 1 and full.stats["coalesced"] == 1
+        close_all()
+
+def test_rollover():
+    with tempfile.TemporaryDirectory() as tmp:
+        goal_tracker.DB_PATH = os.path.join(tmp, "clarity.db")
+        init_db()
+        set_day_boundary("Asia/Kolkata", 4)
+        zone = get_zone("Asia/Kolkata")
+        ts = datetime(2025, 3, 11, 1, 0, tzinfo=zone).timestamp()  # before 4 a.m.: still March 10
+        assert next_rollover(ts, zone, 4) == datetime(2025, 3, 11, 4, tzinfo=zone).timestamp()
+        assert datetime.fromtimestamp(next_rollover(ts, zone, 4), timezone.utc).hour == 22
+
+        scheduler = PrecomputeScheduler(debounce=60)
+        scheduler._watch(None)
+        due_at, _, _ = scheduler._rollovers[0]
+        assert due_at == goal_tracker.get_config().next_rollover() and due_at > time.time()
+        scheduler._watch("alice")  # same rollover as the default user: the heap must not compare None with "alice"
+
+        # the rollover fires: the user is recomputed and their next rollover queued a day later
+        scheduler._rollovers = [(time.time() - 1, "", None)]
+        due, _ = scheduler._due()
+        assert due == [None] and scheduler.stats["rollovers"] == 1
+        assert scheduler._rollovers[0][0] > time.time()
+        compute_daily()
+        assert get_daily_results(compute_on_miss=False)["day"] == goal_tracker.window_dates(1)[0]
+        close_all()
+
+if __name__ == "__main__":
+    test_read_path()
+    test_debounce_and_backpressure()
+    test_rollover()
+    print("✅ Precompute tests passed.")
@@ -0,0 +1,53 @@
+# clarity/scripts/test_report_cache.py
+import contextlib
+import io
+import os
+import sqlite3
+import tempfile
+from datetime import datetime
+
+import goal_tracker
+from db import close_all
+from goal_tracker import init_db, log_hours, bulk_log_hours, get_window_sums, get_change_counter
+from report_cache import REPORT_CACHE, cached
+
+def test_cache_follows_db_writes():
+    with tempfile.TemporaryDirectory() as tmp:
+        goal_tracker.DB_PATH = os.path.join(tmp, "clarity.db")
+        init_db()
+        REPORT_CACHE.clear()
+        calls = []
+
+        @cached
+        def window(days):
+            calls.append(days)
+            return get_window_sums(days)
+
+        first = window(7)
+        assert window(7) is first and calls == [7], "second call is a hit"
+        window(30)
+        assert calls == [7, 30], "different args are different entries"
+
+        counter = get_change_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            log_hours("Dev", 1.0)
+        assert get_change_counter() == counter + 1
+        assert window(7)["hours"]["Dev"][-1] == 1.0 and calls == [7, 30, 7], "log_hours invalidates"
+
+        # writes from another connection and from the bulk path invalidate too
+        other = sqlite3.connect(goal_tracker.DB_PATH)
+        other.execute("INSERT INTO pillar_logs (date, pillar, hours) VALUES (?, 'Dev', 2)",
+                      (datetime.now().strftime("%Y-%m-%d"),))
+        other.commit()
+        other.close()
+        assert window(7)["hours"]["Dev"][-1] == 3.0
+        bulk_log_hours([(datetime.now().strftime("%Y-%m-%d"), "Dev", 0.5)])
+        assert window(7)["hours"]["Dev"][-1] == 3.5
+
+        stats = REPORT_CACHE.stats()
+        assert (stats["hits"], stats["misses"], stats["invalidations"]) == (1, 5, 3), stats
+        close_all()
+    print("✅ Report cache test passed.")
+
+if __name__ == "__main__":
+    test_cache_follows_db_writes()
@@ -0,0 +1,61 @@
+# clarity/scripts/test_reports.py
+import random
+from datetime import datetime, timedelta
+
+import goal_tracker
+from goal_tracker import (
+    temporary_db, bulk_log_hours, get_window_sums, get_bucketed_sums, get_week_over_week, check_range_targets,
+    check_targets, auto_bucket,
+)
+from analytics import calendar_heatmap, load_daily_frame
+from instrumentation import reset, snapshot
+
+END = "2025-06-30"
+
+def seed():
+    rng = random.Random(11)
+    end = datetime.fromisoformat(END)
+    records = [((end - timedelta(days=i)).strftime("%Y-%m-%d"), p, rng.choice([0.5, 1.0, 2.0]))
+               for i in range(500) for p in ("Dev", "DSA", "GATE") if rng.random() < 0.7]
+    bulk_log_hours(records, dedupe=False)
+
+def test_buckets_match_daily_window():
+    before = goal_tracker.DB_PATH
+    with temporary_db():
+        seed()
+        for days in (7, 30, 90, 365):
+            window = get_window_sums(days, end=END)
+            index = {d: i for i, d in enumerate(window["dates"])}
+            for bucket in ("day", "week", "month"):
+                report = get_bucketed_sums(days, bucket, end=END)
+                assert sum(report["days"]) == days and report["end"] == END
+                bounds = [index[s] for s in report["starts"]] + [days]
+                for p, hours in window["hours"].items():
+                    expected = [round(sum(hours[a:b]), 2) for a, b in zip(bounds, bounds[1:])]
+                    assert report["hours"][p] == expected, (days, bucket, p)
+                if bucket == "week":
+                    assert report["days"][-1] == 7, "newest week is always complete"
+                if bucket == "month":
+                    assert all(s.endswith("-01") for s in report["starts"][1:])
+            # same averages as the daily path
+            assert check_range_targets(get_bucketed_sums(days, auto_bucket(days), end=END)) == check_targets(window)
+
+        # one aggregated statement per report, whatever the range
+        reset()
+        get_bucketed_sums(365, "month", end=END)
+        assert snapshot()["spans"]["goal_tracker.get_bucketed_sums"]["statements"] == 1
+
+        wow = get_week_over_week(end=END)
+        week = get_window_sums(14, end=END)["hours"]
+        for p, row in wow.items():
+            assert row["this_week"] == round(sum(week[p][7:]), 2) and row["last_week"] == round(sum(week[p][:7]), 2)
+            assert row["delta"] == round(row["this_week"] - row["last_week"], 2)
+
+        daily = load_daily_frame(90, end=END)
+        grid = calendar_heatmap(daily, "Dev")
+        assert grid.shape[0] == 7 and grid.stack().sum() == daily["Dev"].sum()
+    assert goal_tracker.DB_PATH == before, "temporary_db() restores DB_PATH"
+
+if __name__ == "__main__":
+    test_buckets_match_daily_window()
+    print("✅ Reports test passed.")
@@ -0,0 +1,58 @@
+# clarity/scripts/test_rollup.py
+import os
+import sqlite3
+import tempfile
+from datetime import datetime, timedelta
+
+import goal_tracker
+from db import close_all
+from day_keys import to_day
+from goal_tracker import init_db, log_hours, get_window_sums, rebuild_rollup
+
+def raw_sums(conn):
+    return {(d, p): (round(h, 6), n) for d, p, h, n in conn.execute(
+        "SELECT to_day(date), pillar, SUM(hours), COUNT(*) FROM pillar_logs GROUP BY date, pillar")}
+
+def rollup_sums(conn):
+    return {(d, p): (round(h, 6), n) for d, p, h, n in conn.execute(
+        "SELECT day, pillar, total_hours, entry_count FROM daily_pillar_rollup")}
+
+def test_rollup_tracks_every_write_path():
+    with tempfile.TemporaryDirectory() as tmp:
+        goal_tracker.DB_PATH = os.path.join(tmp, "clarity.db")
+        init_db()
+
+        # log_hours path
+        log_hours("Dev", 2.0)
+        log_hours("Dev", 0.5)
+
+        # direct inserts (like test_insert_fake_data.insert_logs_for_scenario)
+        conn = sqlite3.connect(goal_tracker.DB_PATH)
+        conn.create_function("to_day", 1, to_day)
+        for i in range(7):
+            date = (datetime.now() - timedelta(days=i)).strftime("%Y-%m-%d")
+            conn.execute("INSERT INTO pillar_logs (date, pillar, hours) VALUES (?, ?, ?)", (date, "DSA", 1.0))
+        conn.commit()
+        assert rollup_sums(conn) == raw_sums(conn)
+
+        # updates and deletes keep it in sync too
+        conn.execute("UPDATE pillar_logs SET pillar = 'GATE' WHERE pillar = 'DSA' AND id % 2 = 0")
+        conn.execute("DELETE FROM pillar_logs WHERE pillar = 'Dev' AND hours = 0.5")
+        conn.commit()
+        assert rollup_sums(conn) == raw_sums(conn)
+
+        window = get_window_sums(7)
+        assert window["hours"]["Dev"][-1] == 2.0, window
+        assert sum(window["hours"]["DSA"]) + sum(window["hours"]["GATE"]) == 7.0, window
+
+        # repair after the rollup drifts
+        conn.execute("DELETE FROM daily_pillar_rollup")
+        conn.commit()
+        rebuild_rollup()
+        assert rollup_sums(conn) == raw_sums(conn)
+        conn.close()
+        close_all()
+    print("✅ Rollup test passed.")
+
+if __name__ == "__main__":
+    test_rollup_tracks_every_write_path()
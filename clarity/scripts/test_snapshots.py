@@ -0,0 +1,114 @@
+# clarity/scripts/test_snapshots.py
+import os
+import sqlite3
+import tempfile
+from datetime import datetime, timedelta
+
+import analytics
+import goal_tracker
+import snapshots
+from db import close_all, remove_db
+from goal_tracker import init_db, bulk_log_hours
+from snapshots import sync, read_logs, read_daily, snapshot_dir
+
+def records(start, days, hours=1.0):
+    return [((start + timedelta(days=i)).strftime("%Y-%m-%d"), p, hours)
+            for i in range(days) for p in ("Dev", "DSA", "GATE")]
+
+def part_count(root):
+    return sum(len(p) for p in snapshots._parts(root, "arrow").values())
+
+def sqlite_logs():
+    conn = sqlite3.connect(goal_tracker.DB_PATH)
+    rows = conn.execute("SELECT id, date, day, pillar, hours, logged_at, activity_type FROM pillar_logs ORDER BY id").fetchall()
+    conn.close()
+    return rows
+
+def arrow_logs():
+    table = read_logs().sort_by("id")
+    return list(zip(*(table[name].to_pylist() for name in table.column_names)))
+
+def test_incremental_month_partitions():
+    with tempfile.TemporaryDirectory() as tmp:
+        goal_tracker.DB_PATH = os.path.join(tmp, "clarity.db")
+        init_db()
+        root = snapshot_dir()
+        bulk_log_hours(records(datetime(2025, 1, 20), 30))  # spans January and February
+        assert sync()["appended"] == 90
+        assert sorted(snapshots._parts(root, "arrow")) == ["2025-01", "2025-02"]
+        assert sync()["unchanged"], "no writes -> nothing to do"
+
+        bulk_log_hours(records(datetime(2025, 2, 19), 2, hours=2.0))
+        stats = sync()
+        assert stats["appended"] == 6 and not stats["rebuilt"], stats
+        assert part_count(root) == 3, "only the new rows were written, as one new part"
+        assert arrow_logs() == sqlite_logs()
+
+        # month pruning: a February query never maps January's files
+        feb = read_logs(date_from="2025-02-01", date_to="2025-02-28")
+        assert set(feb["date"].to_pylist()) == {f"2025-02-{d:02d}" for d in range(1, 21)}
+
+        # editing an exported row rewrites the snapshot instead of appending
+        conn = sqlite3.connect(goal_tracker.DB_PATH)
+        conn.execute("UPDATE pillar_logs SET hours = 5 WHERE id = 1")
+        conn.commit()
+        conn.close()
+        assert sync()["rebuilt"]
+        assert arrow_logs() == sqlite_logs()
+        daily = read_daily().to_pylist()
+        assert sum(r["total_hours"] for r in daily) == 90 + 4 + 12
+
+        # many small appends to one month are compacted
+        saved = snapshots.MAX_PARTS_PER_MONTH
+        snapshots.MAX_PARTS_PER_MONTH = 3
+        try:
+            for i in range(5):
+                bulk_log_hours([("2025-02-10", "Dev", 0.1 * (i + 1))])
+                sync()
+            assert len(snapshots._parts(root, "arrow")["2025-02"]) <= 3
+            assert arrow_logs() == sqlite_logs()
+        finally:
+            snapshots.MAX_PARTS_PER_MONTH = saved
+
+        # a replaced DB file that reaches the same ids and counters still gets a fresh snapshot
+        for pillar in ("Dev", "GATE"):
+            remove_db(goal_tracker.DB_PATH)
+            init_db()
+            bulk_log_hours([("2025-03-01", pillar, 1.0)] * 50, dedupe=False)
+            sync()
+        assert set(read_logs()["pillar"].to_pylist()) == {"GATE"}
+        assert arrow_logs() == sqlite_logs()
+        close_all()
+
+def test_parquet_export_and_analytics_parity():
+    with tempfile.TemporaryDirectory() as tmp:
+        goal_tracker.DB_PATH = os.path.join(tmp, "clarity.db")
+        init_db()
+        bulk_log_hours(records(datetime.now() - timedelta(days=59), 60, hours=0.75), dedupe=False)
+
+        out = os.path.join(tmp, "dataset")
+        assert sync(fmt="parquet", out_dir=out)["appended"] == 180
+        files = [f for _, _, names in os.walk(out) for f in names if f.endswith(".parquet")]
+        assert files and "manifest.json" in os.listdir(out)
+        exported = snapshots.pq.read_table(os.path.join(out, "logs")).to_pylist()
+        assert {r["activity_type"] for r in exported} == {"execution"}, "the activity type survives the export"
+
+        saved = analytics.USE_SNAPSHOTS
+        try:
+            analytics.USE_SNAPSHOTS = True
+            from_arrow = analytics.load_daily_frame(60), analytics.load_log_frame()
+            analytics.USE_SNAPSHOTS = False
+            from_sqlite = analytics.load_daily_frame(60), analytics.load_log_frame()
+        finally:
+            analytics.USE_SNAPSHOTS = saved
+        assert from_arrow[0].equals(from_sqlite[0])
+        a = from_arrow[1].sort_values("id").reset_index(drop=True)
+        b = from_sqlite[1].sort_values("id").reset_index(drop=True)
+        assert (a["id"].tolist(), a["date"].tolist(), a["hours"].tolist(), list(a["pillar"])) == \
+               (b["id"].tolist(), b["date"].tolist(), b["hours"].tolist(), list(b["pillar"]))
+        close_all()
+
+if __name__ == "__main__":
+    test_incremental_month_partitions()
+    test_parquet_export_and_analytics_parity()
+    print("✅ Snapshot test passed.")
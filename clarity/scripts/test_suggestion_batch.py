@@ -0,0 +1,52 @@
+# clarity/scripts/test_suggestion_batch.py
+import random
+import time
+
+import numpy as np
+
+from pillar_config import DEFAULT_ACTIONS, PillarConfig
+from suggestion_engine import generate_suggestions, generate_suggestions_batch
+
+PILLARS = ["Dev", "DSA", "GATE", "Chess"]  # "Chess" has no configured actions → default action
+
+def test_batch_matches_single():
+    rng = random.Random(11)
+    targets = [1.5, 1.0, 1.0, 0.0]
+    avgs = [[round(rng.uniform(0, 2.5), 2) for _ in PILLARS] for _ in range(2000)]
+    batch = generate_suggestions_batch(PILLARS, avgs, targets)
+    assert len(batch) == len(avgs)
+
+    for i, row in enumerate(avgs):
+        status = {p: {"avg": a, "target": t} for p, a, t in zip(PILLARS, row, targets)}
+        assert batch.row(i) == generate_suggestions(status), i
+        assert batch.top_focus(i) == generate_suggestions(status)["top_focus"]
+
+def test_batch_matches_single_custom_config():
+    rng = random.Random(12)
+    config = PillarConfig(
+        {"Dev": 2.0, "Chess": 0.5},
+        {"Chess": [("Play one rapid game", 15)]},
+        {"high": 0.5, "medium": 0.05},
+    )
+    targets = [2.0, 1.0, 1.0, 0.5]
+    avgs = [[round(rng.uniform(0, 2.5), 2) for _ in PILLARS] for _ in range(500)]
+    batch = generate_suggestions_batch(PILLARS, avgs, targets, config)
+    for i, row in enumerate(avgs):
+        status = {p: {"avg": a, "target": t} for p, a, t in zip(PILLARS, row, targets)}
+        assert batch.row(i) == generate_suggestions(status, config), i
+
+def test_batch_throughput(rows=1_000_000):
+    rng = np.random.default_rng(0)
+    pillars = list(DEFAULT_ACTIONS)
+    avgs = np.round(rng.uniform(0, 2.5, size=(rows, len(pillars))), 2)
+    t0 = time.perf_counter()
+    batch = generate_suggestions_batch(pillars, avgs, [1.5, 1.0, 1.0])
+    elapsed = time.perf_counter() - t0
+    assert batch.top_focus_index.shape == (rows,)
+    print(f"   {rows:,} day-suggestions in {elapsed:.2f}s ({rows / elapsed:,.0f}/sec)")
+
+if __name__ == "__main__":
+    test_batch_matches_single()
+    test_batch_matches_single_custom_config()
+    test_batch_throughput()
+    print("✅ Batch suggestion test passed.")
@@ -0,0 +1,45 @@
+# clarity/scripts/test_window_sums.py
+import contextlib
+import io
+import os
+import tempfile
+from datetime import date, timedelta
+
+import goal_tracker
+from db import close_all
+from goal_tracker import init_db, bulk_log_hours, get_window_sums, get_weekly_avg, get_weekly_totals, check_targets
+from instrumentation import reset, snapshot
+
+END = date(2025, 6, 30)
+
+def test_one_grouped_query_feeds_every_helper():
+    with tempfile.TemporaryDirectory() as tmp:
+        goal_tracker.DB_PATH = os.path.join(tmp, "clarity.db")
+        init_db()
+        day = lambda n: (END - timedelta(days=n)).isoformat()
+        with contextlib.redirect_stdout(io.StringIO()):
+            bulk_log_hours([(day(0), "Dev", 2), (day(0), "Dev", 1), (day(2), "DSA", 1.5),
+                            (day(6), "GATE", 0.5), (day(7), "GATE", 4), (day(40), "Dev", 9)], dedupe=False)
+
+        reset()
+        window = get_window_sums(7, end=END)
+        assert snapshot()["spans"]["goal_tracker.get_window_sums"]["statements"] == 1
+        assert window["dates"] == [day(n) for n in range(6, -1, -1)]
+        assert window["hours"] == {  # zero-filled; day 7 is outside the window
+            "Dev": [0, 0, 0, 0, 0, 0, 3.0],
+            "DSA": [0, 0, 0, 0, 1.5, 0, 0],
+            "GATE": [0.5, 0, 0, 0, 0, 0, 0],
+        }
+        assert get_weekly_totals(window) == {"Dev": 3.0, "DSA": 1.5, "GATE": 0.5}
+        assert get_weekly_avg(window) == {"Dev": 0.43, "DSA": 0.21, "GATE": 0.07}
+        assert {p: s["avg"] for p, s in check_targets(window).items()} == get_weekly_avg(window)
+
+        # any window length, same single pass
+        month = get_window_sums(90, end=END)
+        assert len(month["dates"]) == 90 and sum(month["hours"]["Dev"]) == 12.0
+        assert sum(month["hours"]["GATE"]) == 4.5
+        close_all()
+
+if __name__ == "__main__":
+    test_one_grouped_query_feeds_every_helper()
+    print("✅ Window sums test passed.")
@@ -0,0 +1,76 @@
+# clarity/scripts/test_write_queue.py
+import threading
+
+import goal_tracker
+from goal_tracker import temporary_db, get_rolling_window, get_window_sums
+from write_queue import GroupCommitWriter
+from bench_group_commit import run
+
+def test_concurrent_writes_share_commits():
+    with temporary_db():
+        window = get_rolling_window()  # kept current by the writer, not rehydrated
+        writer = GroupCommitWriter().start()
+        ids = []
+        lock = threading.Lock()
+
+        def client(k):
+            for _ in range(50):
+                row_id = writer.log_hours("DSA" if k % 2 else "Dev", 0.5)
+                with lock:
+                    ids.append(row_id)
+
+        threads = [threading.Thread(target=client, args=(k,)) for k in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        writer.close()
+
+        assert len(set(ids)) == 400
+        assert writer.stats["rows"] == 400 and writer.stats["transactions"] < 400, writer.stats
+        assert get_rolling_window() is window
+        assert window.window() == get_window_sums(7)
+        assert window.window()["hours"]["Dev"][-1] == 100.0
+
+def test_close_drains_queue():
+    with temporary_db():
+        writer = GroupCommitWriter(max_batch=7, max_delay_ms=1).start()
+        futures = [writer.submit("GATE", 1, user="drain") for _ in range(100)]
+        writer.close()
+        assert all(f.done() and f.exception() is None for f in futures)
+        assert goal_tracker._conn("drain").execute("SELECT COUNT(*) FROM pillar_logs").fetchone()[0] == 100
+        assert writer.stats["largest_batch"] <= 7
+        try:
+            writer.submit("GATE", 1)
+            raise AssertionError("closed writer accepted a row")
+        except RuntimeError:
+            pass
+
+        # a row SQLite rejects fails alone; the rest of its group commits
+        writer = GroupCommitWriter().start()
+        bad = writer.submit("Dev", object())
+        good = writer.submit("Dev", 1.0)
+        writer.close()
+        assert bad.exception() is not None and isinstance(good.result(), int)
+        assert writer.stats["errors"] == 1
+
+        # when the whole group then fails, each row is still counted once
+        writer = GroupCommitWriter(max_delay_ms=200).start()
+        bad = writer.submit("Dev", object())
+        broken = writer.submit("Dev", 1.0, at="not a timestamp")  # day_of() raises: the transaction rolls back
+        writer.close()
+        assert bad.exception() is not None and broken.exception() is not None
+        assert writer.stats["errors"] == 2, writer.stats
+
+def test_benchmark_runs():
+    before = goal_tracker.DB_PATH
+    results = run(threads=4, writes=20)
+    assert results["group_commit"]["transactions"] >= 1
+    assert results["per_call_commit"]["writes_per_sec"] > 0
+    assert goal_tracker.DB_PATH == before, "run() must restore global state"
+
+if __name__ == "__main__":
+    test_concurrent_writes_share_commits()
+    test_close_drains_queue()
+    test_benchmark_runs()
+    print("✅ Write queue test passed.")
@@ -1,22 +1,44 @@
-import sqlite3
+import argparse
+
 from tabulate import tabulate
 
-DB_PATH = "clarity/data/clarity.db"
+from goal_tracker import iter_logs, LOG_PAGE_SIZE
+from instrumentation import timed
+
+HEADERS = ["ID", "Date", "Pillar", "Hours"]
 
-def view_logs():
+@timed("view_logs.view_logs")
+def view_logs(pillar=None, date_from=None, date_to=None):
     """Display all pillar logs in a table format."""
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("SELECT id, date, pillar, hours FROM pillar_logs ORDER BY date DESC;")
-    rows = c.fetchall()
-    conn.close()
+    rows = list(iter_logs(pillar=pillar, date_from=date_from, date_to=date_to))
 
     if not rows:
         print("⚠ No logs found.")
         return
 
-    headers = ["ID", "Date", "Pillar", "Hours"]
-    print(tabulate(rows, headers, tablefmt="fancy_grid"))
+    print(tabulate(rows, HEADERS, tablefmt="fancy_grid"))
+
+@timed("view_logs.stream_logs")
+def stream_logs(page_size=LOG_PAGE_SIZE, pillar=None, date_from=None, date_to=None):
+    """Print logs page by page as they are read; memory stays at one page."""
+    print(f"{'ID':>8}  {'Date':<10}  {'Pillar':<8}  {'Hours':>6}")
+    count = 0
+    for log_id, date, p, hours in iter_logs(page_size, pillar=pillar, date_from=date_from, date_to=date_to):
+        print(f"{log_id:>8}  {date:<10}  {p:<8}  {hours:>6}")
+        count += 1
+    print(f"— {count} logs" if count else "⚠ No logs found.")
 
 if __name__ == "__main__":
-    view_logs()
+    parser = argparse.ArgumentParser(description="Show pillar logs, newest first.")
+    parser.add_argument("--stream", action="store_true", help="print page by page instead of one big table")
+    parser.add_argument("--page-size", type=int, default=LOG_PAGE_SIZE)
+    parser.add_argument("--pillar")
+    parser.add_argument("--from", dest="date_from", help="YYYY-MM-DD")
+    parser.add_argument("--to", dest="date_to", help="YYYY-MM-DD")
+    args = parser.parse_args()
+
+    filters = dict(pillar=args.pillar, date_from=args.date_from, date_to=args.date_to)
+    if args.stream:
+        stream_logs(args.page_size, **filters)
+    else:
+        view_logs(**filters)
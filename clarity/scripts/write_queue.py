@@ -0,0 +1,172 @@
+# clarity/scripts/write_queue.py
+"""
+Group-commit writer for log_hours() under concurrent load.
+
+    writer = GroupCommitWriter().start()
+    fut = writer.submit("Dev", 1.5, user="alice")   # returns at once
+    fut.result()                                    # row id, once the row is committed
+    writer.close()                                  # commits everything already submitted
+
+log_hours() commits every row on its own, so N sessions logging at once pay
+N commits queued on SQLite's single write lock. Here one background thread
+owns the writes: it takes whatever is queued (at most max_batch rows, after
+lingering max_delay_ms for more if set) and commits each user's rows in one
+transaction. Rows that arrive while a commit is running form the next group,
+so batches grow with contention without adding latency when it's quiet.
+The future of each row resolves after that commit, so callers still get
+read-your-writes; with synchronous=FULL (the default for this writer) the
+commit is also fsynced, a cost now paid once per group instead of once per row.
+
+A full queue (max_queue rows) blocks submit(): backpressure, not unbounded memory.
+Compare both paths with bench_group_commit.py.
+"""
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+
+import goal_tracker
+from goal_tracker import get_config, check_activity_type, _note_logs, _notify_log_listeners
+from day_keys import day_to_date
+from instrumentation import timed
+
+MAX_BATCH_ROWS = 500
+MAX_DELAY_MS = 0.0  # linger before committing; 0 = commit as soon as the thread is free
+MAX_QUEUE = 10_000
+SYNCHRONOUS = "FULL"  # the writer's own connections; None keeps db.PRAGMAS
+
+_STOP = object()
+
+class GroupCommitWriter:
+    def __init__(self, max_batch=MAX_BATCH_ROWS, max_delay_ms=MAX_DELAY_MS, max_queue=MAX_QUEUE,
+                 synchronous=SYNCHRONOUS):
+        self.max_batch = max_batch
+        self.max_delay = max_delay_ms / 1000
+        self.synchronous = synchronous
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._closed = False
+        self._thread = None
+        self.stats = {"submitted": 0, "rows": 0, "batches": 0, "transactions": 0, "largest_batch": 0, "errors": 0}
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="clarity-writer", daemon=True)
+            self._thread.start()
+        return self
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def submit(self, pillar, hours, user=None, at=None, activity_type="execution"):
+        """Queue one log_hours() row; returns a Future resolving to its id once committed."""
+        fut = Future()
+        item = (user, pillar, hours, time.time() if at is None else at, check_activity_type(activity_type), fut)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("writer is closed")
+            self.stats["submitted"] += 1
+            self._queue.put(item)
+        return fut
+
+    def log_hours(self, pillar, hours, user=None, at=None, activity_type="execution", timeout=None):
+        """Drop-in for goal_tracker.log_hours() that waits for the group commit."""
+        return self.submit(pillar, hours, user=user, at=at, activity_type=activity_type).result(timeout)
+
+    def close(self, timeout=None):
+        """Stop accepting rows, commit everything already queued and stop the thread."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        if self._thread is not None:
+            self._thread.join(timeout)
+        else:  # never started: nothing will commit these
+            self._fail_pending(RuntimeError("writer closed before it was started"))
+
+    def _fail_pending(self, exc):
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is not _STOP and item[-1].set_running_or_notify_cancel():
+                item[-1].set_exception(exc)
+
+    # --- writer thread ---
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True  # FIFO: everything submitted before close() is in this batch or earlier
+                    break
+                batch.append(item)
+            self._commit(batch)
+
+    @timed("write_queue.commit")
+    def _commit(self, batch):
+        by_user = {}
+        for user, pillar, hours, at, activity_type, fut in batch:
+            if fut.set_running_or_notify_cancel():  # skip rows whose caller cancelled
+                by_user.setdefault(user, []).append((pillar, hours, at, activity_type, fut))
+        self.stats["batches"] += 1
+        self.stats["largest_batch"] = max(self.stats["largest_batch"], len(batch))
+        for user, rows in by_user.items():
+            try:
+                done = self._commit_user(user, rows)
+            except Exception as e:  # noqa: BLE001 - reported through every future in the group
+                for *_, fut in rows:
+                    if not fut.done():  # rows SQLite rejected were already failed and counted
+                        self.stats["errors"] += 1
+                        fut.set_exception(e)
+                continue
+            self.stats["transactions"] += 1
+            self.stats["rows"] += len(done)
+            for fut, row_id in done:
+                fut.set_result(row_id)
+
+    def _commit_user(self, user, rows):
+        """Insert `rows` in one transaction; a row SQLite rejects fails only its own future."""
+        config = get_config(user)
+        conn = goal_tracker._conn(user)
+        if self.synchronous:
+            conn.execute(f"PRAGMA synchronous = {self.synchronous}")
+        c = conn.cursor()
+        done, applied = [], []
+        c.execute("BEGIN IMMEDIATE")
+        try:
+            for pillar, hours, at, activity_type, fut in rows:
+                day = config.day_of(at)
+                try:
+                    c.execute("""
+                        INSERT INTO pillar_logs (date, pillar, hours, logged_at, activity_type) VALUES (?, ?, ?, ?, ?)
+                    """, (day_to_date(day), pillar, hours, int(at), activity_type))
+                except sqlite3.Error as e:  # statement-level: the rest of the transaction stands
+                    self.stats["errors"] += 1
+                    fut.set_exception(e)
+                    continue
+                done.append((fut, c.lastrowid))
+                applied.append((day, pillar, hours))
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        if applied:
+            _note_logs(user, applied)
+            _notify_log_listeners(user)
+        return done
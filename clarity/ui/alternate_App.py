@@ -1,15 +1,21 @@
+import os
+import sys
 import streamlit as st
 import pandas as pd
-import sqlite3
 from datetime import datetime
 
+# shared connection manager lives in clarity/scripts
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+from db import get_conn
+from goal_tracker import get_config
+
 # =====================
 # DB FUNCTIONS
 # =====================
 DB_PATH = "clarity/data/clarity.db"
 
 def init_db():
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_conn(DB_PATH)
     c = conn.cursor()
     c.execute('''
         CREATE TABLE IF NOT EXISTS pillar_logs (
@@ -20,27 +26,21 @@ def init_db():
         )
     ''')
     conn.commit()
-    conn.close()
 
 def log_hours(pillar, hours):
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_conn(DB_PATH)
     c = conn.cursor()
     c.execute("INSERT INTO pillar_logs (date, pillar, hours) VALUES (?, ?, ?)",
               (datetime.now().strftime("%Y-%m-%d"), pillar, hours))
     conn.commit()
-    conn.close()
 
 def get_weekly_data():
-    conn = sqlite3.connect(DB_PATH)
-    df = pd.read_sql_query("SELECT * FROM pillar_logs", conn)
-    conn.close()
+    df = pd.read_sql_query("SELECT * FROM pillar_logs", get_conn(DB_PATH))
     return df
 
 # =====================
 # SUGGESTION ENGINE (Week 1 basic rule-based)
 # =====================
-TARGETS = {"Dev": 1.5, "DSA": 1, "GATE": 1}  # hours/day
-
 def generate_suggestions(df):
     suggestions = []
     if df.empty:
@@ -49,7 +49,7 @@ def generate_suggestions(df):
     last_7 = df.tail(7)
     avg_hours = last_7.groupby("pillar")["hours"].mean().to_dict()
 
-    for pillar, target in TARGETS.items():
+    for pillar, target in get_config().targets_on().items():
         if avg_hours.get(pillar, 0) < target:
             suggestions.append(f"⚠ {pillar} below target! Spend at least {target - avg_hours.get(pillar, 0):.1f} more hours today.")
         else:
@@ -70,7 +70,7 @@ def main():
 
     if choice == "Log Hours":
         st.subheader("Log Daily Hours")
-        pillar = st.selectbox("Select Pillar", list(TARGETS.keys()))
+        pillar = st.selectbox("Select Pillar", get_config().pillars)
         hours = st.number_input("Hours Spent", min_value=0.0, max_value=12.0, step=0.5)
         if st.button("Log Entry"):
             log_hours(pillar, hours)
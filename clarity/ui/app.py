@@ -1,26 +1,65 @@
 # clarity/ui/app.py
+import time
+_RUN_STARTED = time.perf_counter()  # every rerun executes this file from the top
+
+import importlib
+import json
 import os
+import sys
 import streamlit as st
-import pandas as pd
 from datetime import datetime
 
 # ensure project-root relative paths work
 BASE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)))  # clarity/
-DB_PATH = os.path.join(BASE_DIR, "data", "clarity.db")
+DB_PATH = os.environ.get("CLARITY_DB") or os.path.join(BASE_DIR, "data", "clarity.db")
 
-# add clarity/scripts to path if needed (so we can import modules)
-import sys
-sys.path.insert(0, os.path.join(BASE_DIR, "scripts"))
+# add clarity/scripts to path once per process (reruns must not keep prepending it)
+SCRIPTS_DIR = os.path.join(BASE_DIR, "scripts")
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
+
+# backend functions (stdlib + sqlite only; pandas/plotly/numpy load per page, see lazy())
+from goal_tracker import (
+    get_config, db_path_for, init_db, log_hours, get_logs_page, get_pillar_totals,
+    set_day_boundary, get_bucketed_sums, get_week_over_week, check_range_targets, auto_bucket, BUCKETS,
+)
+from report_cache import cached, cache_stats
+from precompute import PrecomputeScheduler, get_daily_results
+import instrumentation
+from instrumentation import timed
+
+# Cold start + rerun budget for the slowest page (see the Debug: startup panel)
+FIRST_PAINT_BUDGET_MS = 1500
 
-# backend functions
-from goal_tracker import init_db, log_hours, get_all_logs, get_weekly_avg, check_targets
-from suggestion_engine import generate_suggestions
-import plotly.express as px
-import plotly.graph_objects as go
+@st.cache_resource
+def startup_stats():
+    """Per-process timings shared by every session and rerun."""
+    return {"imports_ms": {}, "first_paint_ms": {}, "last_run_ms": {}}
 
-# Ensure DB exists and folder is present
-os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
-init_db()
+def lazy(module):
+    """Import `module` on first use, recording how long that first import took."""
+    mod = sys.modules.get(module)
+    if mod is None:
+        t0 = time.perf_counter()
+        mod = importlib.import_module(module)
+        startup_stats()["imports_ms"][module] = round((time.perf_counter() - t0) * 1000, 1)
+    return mod
+
+@st.cache_resource
+def init_once():
+    """Create/upgrade the default DB once per server process, not on every rerun."""
+    os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
+    init_db()
+    return True
+
+init_once()
+
+@st.cache_resource
+def precompute_scheduler():
+    """One background precompute thread per server process; log_hours() writes notify it."""
+    return PrecomputeScheduler().start()
+
+precompute_scheduler()
 
 # Streamlit page config
 st.set_page_config(page_title="Clarity — Self-Growth Copilot (MVP)", layout="centered")
@@ -45,102 +84,302 @@ st.markdown(
 st.title("🔵 Clarity — Self-Growth Copilot (MVP)")
 
 # Sidebar nav
-menu = ["Home", "Log Hours", "Weekly Report", "Suggestions", "View Logs"]
+menu = ["Home", "Log Hours", "Weekly Report", "Reports", "Trends", "Suggestions", "Journal", "View Logs", "Diagnostics"]
 choice = st.sidebar.selectbox("Navigate", menu)
 
+# Each user gets their own DB file (clarity/data/users/<id>.db); blank = the shared default DB
+user_id = st.sidebar.text_input("User ID", help="Letters, digits, '_', '-', '.'. Leave blank for the default log.").strip()
+user = user_id or None
+try:
+    db_path_for(user)
+except ValueError as e:
+    st.sidebar.error(str(e))
+    st.stop()
+
+# Which local day a log lands on: the user's time zone and the hour their day rolls over
+with st.sidebar.expander("Day boundary"):
+    day_cfg = get_config(user)
+    with st.form("day_boundary"):
+        tz_name = st.text_input("Time zone", day_cfg.timezone or "", help="IANA name, e.g. Asia/Kolkata. Blank = server time.")
+        rollover = st.number_input("New day starts at (hour)", min_value=0, max_value=23, value=day_cfg.rollover_hour)
+        if st.form_submit_button("Save"):
+            try:
+                set_day_boundary(tz_name.strip() or None, int(rollover), user=user)
+                st.success("Saved; applies to new logs.")
+            except ValueError as e:
+                st.error(str(e))
+
+# Report data is served from memory until pillar_logs changes (see report_cache.py)
+cached_logs_page = cached(get_logs_page)
+cached_pillar_totals = cached(get_pillar_totals)
+
 def df_from_db_rows(rows):
+    pd = lazy("pandas")
     if not rows:
         return pd.DataFrame(columns=["id", "date", "pillar", "hours"])
     return pd.DataFrame(rows, columns=["id", "date", "pillar", "hours"])
 
-if choice == "Home":
-    st.subheader("Welcome")
-    st.markdown(
-        """
-        **Clarity** helps you track your Dev / DSA / GATE hours and gives one simple action each day.
-        Use **Log Hours** to add today's work, then visit **Weekly Report** and **Suggestions**.
-        """
-    )
-    st.info("Built for hostel + limited time. Keep it simple, ship daily.")
-
-elif choice == "Log Hours":
-    st.subheader("Log Today's Hours")
-    with st.form("log_form"):
-        pillar = st.selectbox("Pillar", ["Dev", "DSA", "GATE"])
-        hours = st.number_input("Hours spent (0.0 - 12.0)", min_value=0.0, max_value=12.0, step=0.25)
-        submitted = st.form_submit_button("Log")
-        if submitted:
-            log_hours(pillar, float(hours))
-            st.success(f"Logged {hours} hours for {pillar} at {datetime.now().strftime('%Y-%m-%d %H:%M')}")
-
-    st.markdown("---")
-    st.caption("Tip: log honestly. Clarity uses real averages to suggest actions.")
-
-elif choice == "Weekly Report":
-    st.subheader("Weekly Averages & Target Status")
-
-    # Structured status
-    status = check_targets()  # structured dict
-    rows = []
-    for p, d in status.items():
-        rows.append({"Pillar": p, "Avg hrs/day": d["avg"], "Target hrs/day": d["target"], "Status": d["status"]})
-    df_status = pd.DataFrame(rows)
-    st.table(df_status)
-
-    # Weekly totals bar chart (last 7 days)
-    from goal_tracker import get_weekly_totals
-    totals = get_weekly_totals()  # dict {pillar: total_hours_last_7_days}
-    tot_df = pd.DataFrame(list(totals.items()), columns=["Pillar", "Hours (last 7 days)"])
-    fig = px.bar(tot_df, x="Pillar", y="Hours (last 7 days)",
-                 text="Hours (last 7 days)",
-                 title="Weekly total hours per pillar",
-                 labels={"Hours (last 7 days)": "Hours (7 days)"})
-    fig.update_traces(textposition='outside')
-    fig.update_layout(yaxis=dict(title="Hours (7-day total)"), xaxis=dict(title="Pillar"), uniformtext_minsize=8, uniformtext_mode='hide')
-    st.plotly_chart(fig, use_container_width=True)
-
-    # Percent progress toward daily target (avg/target * 100) as horizontal bars
-    percent_rows = []
-    for p, d in status.items():
-        pct = 0.0
-        if d["target"] > 0:
-            pct = min(150, round((d["avg"] / d["target"]) * 100, 1))  # cap at 150%
-        percent_rows.append({"Pillar": p, "PercentOfDailyTarget": pct})
-
-    pct_df = pd.DataFrame(percent_rows)
-    # Horizontal bar chart
-    fig2 = px.bar(pct_df, x="PercentOfDailyTarget", y="Pillar", orientation='h',
-                  text="PercentOfDailyTarget",
-                  title="Daily progress vs target (% of daily target)")
-    fig2.update_layout(xaxis=dict(title="% of daily target (100% = on target)"), yaxis=dict(categoryorder="total ascending"))
-    st.plotly_chart(fig2, use_container_width=True)
-
-    # Optional: show progress with Streamlit's progress widget too (simple)
-    st.markdown("### Quick progress bars")
-    for idx, r in pct_df.iterrows():
-        st.write(f"**{r['Pillar']}** — {r['PercentOfDailyTarget']}% of daily target")
-        st.progress(int(r['PercentOfDailyTarget'] if r['PercentOfDailyTarget'] <= 100 else 100))
-
-elif choice == "Suggestions":
-    st.subheader("Actionable Suggestions (Today)")
-    status = check_targets()
-    suggestions_out = generate_suggestions(status)
-    for line in suggestions_out["summary_lines"]:
-        st.markdown(line)
-
-    st.markdown("---")
-    st.write("Structured suggestions (debug):")
-    st.json(suggestions_out["suggestions"])
-
-elif choice == "View Logs":
-    st.subheader("View All Logs")
-    rows = get_all_logs()
-    df_logs = df_from_db_rows(rows)
-    st.dataframe(df_logs.sort_values(by="date", ascending=False))
-
-    if not df_logs.empty:
-        with st.expander("Show pretty aggregated table"):
-            st.table(df_logs.groupby("pillar")["hours"].sum().rename("Total hrs").reset_index())
+# Each page render is one span: app.page.<name> (wall time + SQL it triggered)
+with timed(f"app.page.{choice}"):
+    if choice == "Home":
+        st.subheader("Welcome")
+        st.markdown(
+            f"""
+            **Clarity** helps you track your {" / ".join(get_config(user).pillars)} hours and gives one simple action each day.
+            Use **Log Hours** to add today's work, then visit **Weekly Report** and **Suggestions**.
+            """
+        )
+        st.info("Built for hostel + limited time. Keep it simple, ship daily.")
+
+    elif choice == "Log Hours":
+        st.subheader("Log Today's Hours")
+        with st.form("log_form"):
+            pillar = st.selectbox("Pillar", get_config(user).pillars)
+            hours = st.number_input("Hours spent (0.0 - 12.0)", min_value=0.0, max_value=12.0, step=0.25)
+            activity = st.radio("Spent on", ["Execution (building, solving)", "Research (reading, tutorials)"],
+                                horizontal=True)
+            submitted = st.form_submit_button("Log")
+            if submitted:
+                activity_type = "research" if activity.startswith("Research") else "execution"
+                log_hours(pillar, float(hours), user=user, activity_type=activity_type)
+                st.success(f"Logged {hours} hours for {pillar} at {datetime.now().strftime('%Y-%m-%d %H:%M')}")
+
+        st.markdown("---")
+        st.caption("Tip: log honestly. Clarity uses real averages to suggest actions.")
+
+    elif choice == "Weekly Report":
+        st.subheader("Weekly Averages & Target Status")
+        pd, px, analytics = lazy("pandas"), lazy("plotly.express"), lazy("analytics")
+
+        # Precomputed 7-day window, status and totals (one keyed read, see precompute.py)
+        daily = get_daily_results(user)
+        window = daily["window"]
+
+        # Structured status
+        status = daily["status"]  # structured dict
+        pct_df = analytics.progress_frame(status)  # table columns + % of daily target (capped at 150%)
+        st.table(pct_df[["Pillar", "Avg hrs/day", "Target hrs/day", "Status"]])
+
+        # Weekly totals bar chart (last 7 days)
+        totals = daily["totals"]  # dict {pillar: total_hours_last_7_days}
+        tot_df = pd.DataFrame(list(totals.items()), columns=["Pillar", "Hours (last 7 days)"])
+        fig = px.bar(tot_df, x="Pillar", y="Hours (last 7 days)",
+                     text="Hours (last 7 days)",
+                     title="Weekly total hours per pillar",
+                     labels={"Hours (last 7 days)": "Hours (7 days)"})
+        fig.update_traces(textposition='outside')
+        fig.update_layout(yaxis=dict(title="Hours (7-day total)"), xaxis=dict(title="Pillar"), uniformtext_minsize=8, uniformtext_mode='hide')
+        st.plotly_chart(fig, use_container_width=True)
+
+        # Percent progress toward daily target (avg/target * 100) as horizontal bars
+        fig2 = px.bar(pct_df, x="PercentOfDailyTarget", y="Pillar", orientation='h',
+                      text="PercentOfDailyTarget",
+                      title="Daily progress vs target (% of daily target)")
+        fig2.update_layout(xaxis=dict(title="% of daily target (100% = on target)"), yaxis=dict(categoryorder="total ascending"))
+        st.plotly_chart(fig2, use_container_width=True)
+
+        # Optional: show progress with Streamlit's progress widget too (simple)
+        st.markdown("### Quick progress bars")
+        for pillar, pct in zip(pct_df["Pillar"], pct_df["PercentOfDailyTarget"]):
+            st.write(f"**{pillar}** — {pct}% of daily target")
+            st.progress(int(min(pct, 100)))
+
+    elif choice == "Reports":
+        st.subheader("Reports")
+        pd, px, analytics = lazy("pandas"), lazy("plotly.express"), lazy("analytics")
+        col1, col2 = st.columns(2)
+        days = col1.selectbox("Window", [7, 30, 90, 365], index=1, format_func=lambda d: f"Last {d} days")
+        # long ranges are summed into weeks/months by the query itself, not drawn as 365 bars
+        bucket = col2.selectbox("Group by", BUCKETS, index=BUCKETS.index(auto_bucket(days)), key=f"bucket_{days}")
+        totals_tab, calendar_tab, wow_tab = st.tabs(["Totals", "Calendar", "Week over week"])
+
+        with totals_tab:
+            report = cached(get_bucketed_sums)(days, bucket, user=user)  # one aggregated query
+            pct_df = analytics.progress_frame(check_range_targets(report, user=user))
+            st.table(pct_df[["Pillar", "Avg hrs/day", "Target hrs/day", "Status"]])
+            long = pd.DataFrame(
+                [(start, p, h) for p, hours in report["hours"].items() for start, h in zip(report["starts"], hours)],
+                columns=["start", "Pillar", "Hours"],
+            )
+            fig = px.bar(long, x="start", y="Hours", color="Pillar", barmode="group",
+                         title=f"Hours per {bucket} (last {days} days)", labels={"start": bucket.title()})
+            st.plotly_chart(fig, use_container_width=True)
+
+        with calendar_tab:
+            daily = cached(analytics.load_daily_frame)(days, user=user)  # one columnar read
+            if len(daily.columns):
+                heat_pillar = st.selectbox("Pillar", list(daily.columns), key="heatmap_pillar")
+                grid = analytics.calendar_heatmap(daily, heat_pillar)
+                fig = px.imshow(grid, color_continuous_scale="Greens", aspect="auto",
+                                labels={"x": "Week of", "y": "", "color": "Hours"},
+                                title=f"{heat_pillar}: hours per day")
+                st.plotly_chart(fig, use_container_width=True)
+
+        with wow_tab:
+            wow = cached(get_week_over_week)(user=user)  # one aggregated query (two 7-day buckets)
+            wow_df = pd.DataFrame.from_dict(wow, orient="index")
+            wow_df.index.name = "Pillar"
+            st.table(wow_df.rename(columns={"this_week": "This week", "last_week": "Last week",
+                                            "delta": "Change (hrs)", "pct_change": "Change (%)"}))
+            fig = px.bar(wow_df.reset_index().melt(id_vars="Pillar", value_vars=["last_week", "this_week"],
+                                                   var_name="Week", value_name="Hours"),
+                         x="Pillar", y="Hours", color="Week", barmode="group", title="This week vs last week")
+            st.plotly_chart(fig, use_container_width=True)
+
+    elif choice == "Trends":
+        st.subheader("Long-range Trends")
+        px, analytics = lazy("plotly.express"), lazy("analytics")
+        days = st.select_slider("History", options=[30, 90, 180, 365], value=90, format_func=lambda d: f"{d} days")
+        daily = cached(analytics.load_daily_frame)(days, user=user)  # one read of the daily rollup; everything below is vectorized
+
+        roll = analytics.rolling_averages(daily, windows=(7, 30))
+        fig = px.line(roll, x="date", y="avg_hours", color="pillar", line_dash="window",
+                      title="Rolling average hours/day (7d and 30d)")
+        st.plotly_chart(fig, use_container_width=True)
+
+        att = analytics.target_attainment(daily, window=7, user=user)
+        fig2 = px.line(att, x="date", y="pct", color="pillar", title="7-day average as % of daily target")
+        fig2.add_hline(y=100, line_dash="dot")
+        st.plotly_chart(fig2, use_container_width=True)
+
+        st.markdown("### Streaks (days at or above target)")
+        st.table(analytics.streaks(daily, user=user))
+
+        wd = analytics.weekday_distribution(daily)
+        fig3 = px.bar(wd, x="weekday", y="avg_hours", color="pillar", barmode="group",
+                      title="Average hours by weekday")
+        st.plotly_chart(fig3, use_container_width=True)
+
+    elif choice == "Suggestions":
+        st.subheader("Actionable Suggestions (Today)")
+        suggestions_out = get_daily_results(user)["suggestions"]  # precomputed; computed here only on a miss
+        for line in suggestions_out["summary_lines"]:
+            st.markdown(line)
+
+        st.markdown("---")
+        st.write("Structured suggestions (debug):")
+        st.json(suggestions_out["suggestions"])
+
+    elif choice == "Journal":
+        st.subheader("Journal")
+        journal = lazy("journal")
+        with st.form("journal_form", clear_on_submit=True):
+            entry_date = st.date_input("Date", value=None, help="Blank = today")
+            text = st.text_area("What happened today? How did it feel?")
+            if st.form_submit_button("Save entry"):
+                try:
+                    journal.add_entry(text, entry_date, user=user)
+                    st.success("Saved.")
+                except ValueError as e:
+                    st.error(str(e))
+
+        query = st.text_input("Search entries", placeholder="keywords, e.g. parser deadline")
+        if query:
+            hits = journal.search(query, user=user)
+            for hit in hits:
+                st.markdown(f"**{hit['date']}** — {hit['snippet']}")
+            if not hits:
+                st.caption("No entries match.")
+
+        # Mood and themes come from the cached per-entry analysis; only new/edited entries are analyzed here
+        pd, px = lazy("pandas"), lazy("plotly.express")
+        trend = journal.mood_trend(30, user=user)
+        mood_df = pd.DataFrame({"date": trend["dates"], "mood": trend["mood"]}).dropna()
+        if mood_df.empty:
+            st.info("Write a few entries to see your mood trend and recurring themes.")
+        else:
+            fig = px.line(mood_df, x="date", y="mood", markers=True, range_y=[-1.05, 1.05],
+                          title="Mood (last 30 days, -1 low .. 1 high)")
+            st.plotly_chart(fig, use_container_width=True)
+
+            weeks = st.select_slider("Recurring themes over", options=[2, 4, 8, 12], value=4,
+                                     format_func=lambda w: f"{w} weeks")
+            themes = journal.recurring_themes(weeks, user=user)
+            if themes:
+                st.table(pd.DataFrame(themes).rename(columns={
+                    "theme": "Theme", "weeks": "Weeks seen", "entries": "Entries", "weight": "Weight"}))
+            else:
+                st.caption("No theme has come up in more than one week yet.")
+
+    elif choice == "View Logs":
+        st.subheader("View All Logs")
+
+        # Filters; changing any of them (or the page size) starts again from the newest page
+        col1, col2, col3 = st.columns(3)
+        pillar_filter = col1.selectbox("Pillar", ["All"] + list(get_config(user).pillars))
+        date_range = col2.date_input("Date range", value=())
+        page_size = col3.selectbox("Rows per page", [25, 50, 100, 250], index=1)
+
+        filters = {
+            "pillar": None if pillar_filter == "All" else pillar_filter,
+            "date_from": date_range[0] if len(date_range) > 0 else None,
+            "date_to": date_range[1] if len(date_range) > 1 else None,
+        }
+        view_key = (user, tuple(filters.items()), page_size)
+        if st.session_state.get("logs_view_key") != view_key:
+            st.session_state.logs_view_key = view_key
+            st.session_state.logs_cursors = [None]  # keyset cursor that starts each visited page
+        cursors = st.session_state.logs_cursors
+
+        rows, next_cursor = cached_logs_page(page_size, after=cursors[-1], user=user, **filters)
+        st.dataframe(df_from_db_rows(rows), hide_index=True)
+
+        prev_col, info_col, next_col = st.columns([1, 2, 1])
+        if prev_col.button("← Newer", disabled=len(cursors) == 1):
+            cursors.pop()
+            st.rerun()
+        info_col.caption(f"Page {len(cursors)} · {len(rows)} rows")
+        if next_col.button("Older →", disabled=next_cursor is None):
+            cursors.append(next_cursor)
+            st.rerun()
+
+        if rows:
+            with st.expander("Show pretty aggregated table"):
+                totals = cached_pillar_totals(user=user)  # pre-aggregated from the daily rollup
+                st.table(lazy("pandas").DataFrame(list(totals.items()), columns=["pillar", "Total hrs"]))
+
+            # Offline dataset: built from the incrementally synced columnar snapshot (see snapshots.py)
+            if st.button("Prepare Parquet export"):
+                st.download_button("Download logs (.parquet)", lazy("snapshots").parquet_bytes(user),
+                                   "clarity-logs.parquet", "application/octet-stream")
+
+    elif choice == "Diagnostics":
+        st.subheader("Diagnostics")
+        st.caption("Per-function timings and SQL counts for this server process (see instrumentation.py).")
+        snap = instrumentation.snapshot()
+        if snap["spans"]:
+            spans_df = lazy("pandas").DataFrame.from_dict(snap["spans"], orient="index")
+            st.dataframe(spans_df.sort_values("wall_ms", ascending=False), use_container_width=True)
+        else:
+            st.info("No instrumented calls recorded yet.")
+        col1, col2 = st.columns(2)
+        col1.metric("SQL statements", snap["sqlite"]["statements"])
+        col2.metric("SQLite VM steps", snap["sqlite"]["vm_steps"])
+        st.markdown("### Caches")
+        st.json(snap["collectors"])
+        st.markdown("### Page timings")
+        st.json(startup_stats())
+
+        dl1, dl2, reset_col = st.columns(3)
+        dl1.download_button("Download JSON", json.dumps(snap, indent=2), "clarity-metrics.json", "application/json")
+        dl2.download_button("Download Prometheus", instrumentation.prometheus_text(), "clarity-metrics.prom", "text/plain")
+        if reset_col.button("Reset counters"):
+            instrumentation.reset()
+            st.rerun()
+
+# Debug panel: report cache effectiveness for this server process
+with st.sidebar.expander("Debug: report cache"):
+    st.json(cache_stats())
+
+# Page render time; the first run of each page in this process is its cold first paint
+run_ms = round((time.perf_counter() - _RUN_STARTED) * 1000, 1)
+stats = startup_stats()
+stats["first_paint_ms"].setdefault(choice, run_ms)
+stats["last_run_ms"][choice] = run_ms
+with st.sidebar.expander("Debug: startup"):
+    st.json(stats)
+    if max(stats["first_paint_ms"].values()) > FIRST_PAINT_BUDGET_MS:
+        st.warning(f"First paint over the {FIRST_PAINT_BUDGET_MS} ms budget")
 
 # Footer
 st.markdown("---")